@@ -0,0 +1,125 @@
+# backend/ann_index.py
+
+import os
+import math
+import logging
+import faiss
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# "flat" (exact), "hnsw" or "ivf"; optional "sq8" / "pq" compression of the stored vectors
+INDEX_MODE = os.environ.get("INDEX_MODE", "flat").lower()
+INDEX_QUANTIZATION = os.environ.get("INDEX_QUANTIZATION", "none").lower()
+HNSW_M = int(os.environ.get("HNSW_M", "32"))
+IVF_NLIST = int(os.environ.get("IVF_NLIST", "0"))        # 0 = derive from corpus size
+PQ_M = int(os.environ.get("PQ_M", "48"))                 # sub-quantizers; must divide the dimension
+# Search-time knobs: changing them needs no rebuild
+HNSW_EF_SEARCH = int(os.environ.get("HNSW_EF_SEARCH", "64"))
+IVF_NPROBE = int(os.environ.get("IVF_NPROBE", "16"))
+ANN_TRAIN_SAMPLE = int(os.environ.get("ANN_TRAIN_SAMPLE", "100000"))
+# Retrain IVF / quantized indexes once the corpus has grown this many times past their training size
+ANN_RETRAIN_GROWTH = float(os.environ.get("ANN_RETRAIN_GROWTH", "4"))
+# Vectors needed to train PQ codebooks (256 centroids x 39 points); SQ8 is used until then
+PQ_MIN_TRAIN = int(os.environ.get("PQ_MIN_TRAIN", str(256 * 39)))
+# FAISS's minimum training points per IVF list
+IVF_MIN_POINTS_PER_LIST = 39
+
+
+def index_config() -> dict:
+    """Build-time settings recorded in the manifest; any change forces a rebuild."""
+    return {
+        "mode": INDEX_MODE,
+        "quantization": INDEX_QUANTIZATION,
+        "hnsw_m": HNSW_M if INDEX_MODE == "hnsw" else None,
+        "ivf_nlist": IVF_NLIST if INDEX_MODE == "ivf" else None,
+        "pq_m": PQ_M if INDEX_QUANTIZATION == "pq" else None,
+    }
+
+
+def auto_nlist(n_vectors: int) -> int:
+    """~4·√n inverted lists, capped so each list gets ≥ 39 training points (FAISS's minimum)."""
+    return max(1, min(int(4 * math.sqrt(max(n_vectors, 1))), n_vectors // IVF_MIN_POINTS_PER_LIST))
+
+
+def index_plan(n_vectors: int, mode: str = INDEX_MODE, quantization: str = INDEX_QUANTIZATION,
+               nlist: int = IVF_NLIST, hnsw_m: int = HNSW_M, pq_m: int = PQ_M) -> tuple:
+    """(`faiss.index_factory` description, reduced) for an index trained on `n_vectors`.
+
+    `reduced` is True when there are too few vectors for the configured type:
+    PQ falls back to SQ8 and IVF to a plain scan until the corpus is big
+    enough to train them.
+    """
+    codes = {"none": "Flat", "sq8": "SQ8", "pq": f"PQ{pq_m}"}.get(quantization)
+    if codes is None:
+        raise ValueError(f"Unknown INDEX_QUANTIZATION: {quantization}")
+    reduced = False
+    if quantization == "pq" and n_vectors < PQ_MIN_TRAIN:
+        codes, reduced = "SQ8", True
+    if mode == "flat":
+        return codes, reduced
+    if mode == "hnsw":
+        return (f"HNSW{hnsw_m}" if codes == "Flat" else f"HNSW{hnsw_m}_{codes}"), reduced
+    if mode == "ivf":
+        nlist = nlist or auto_nlist(n_vectors)
+        if n_vectors < nlist * IVF_MIN_POINTS_PER_LIST:
+            return codes, True
+        return f"IVF{nlist},{codes}", reduced
+    raise ValueError(f"Unknown INDEX_MODE: {mode}")
+
+
+def factory_string(n_vectors: int, **kwargs) -> str:
+    """`faiss.index_factory` description for the configured index mode."""
+    return index_plan(n_vectors, **kwargs)[0]
+
+
+def needs_retrain(trained: dict, n_vectors: int) -> bool:
+    """Whether an index trained as recorded in `trained` ({"ntotal", "reduced"}) should be
+    rebuilt now that it holds `n_vectors`: IVF lists and PQ codebooks only fit the
+    corpus they were trained on, and a reduced fallback can be upgraded once it is big enough."""
+    if INDEX_MODE != "ivf" and INDEX_QUANTIZATION == "none":
+        return False
+    if trained.get("reduced") and not index_plan(n_vectors)[1]:
+        return True
+    return n_vectors >= ANN_RETRAIN_GROWTH * max(trained.get("ntotal", 0), 1)
+
+
+def build_index(vectors: np.ndarray, description: str = None) -> faiss.Index:
+    """Create an empty index for `vectors`, training it on a sample when the type needs it."""
+    description = description or factory_string(len(vectors))
+    index = faiss.index_factory(vectors.shape[1], description, faiss.METRIC_L2)
+    if not index.is_trained:
+        sample = vectors
+        if len(vectors) > ANN_TRAIN_SAMPLE:
+            rng = np.random.default_rng(0)
+            sample = vectors[rng.choice(len(vectors), ANN_TRAIN_SAMPLE, replace=False)]
+        logger.info(f"Training {description} index on {len(sample)} vectors")
+        index.train(np.ascontiguousarray(sample, dtype=np.float32))
+    configure_search(index)
+    return index
+
+
+def configure_search(index: faiss.Index, ef_search: int = HNSW_EF_SEARCH, nprobe: int = IVF_NPROBE):
+    """Apply search-time parameters; IVF also gets a direct map so vectors can be reconstructed."""
+    ivf = faiss.try_extract_index_ivf(index)
+    if ivf is not None:
+        ivf.nprobe = nprobe
+        if ivf.direct_map.type == faiss.DirectMap.NoMap:
+            ivf.make_direct_map()
+    hnsw = getattr(faiss.downcast_index(index), "hnsw", None)
+    if hnsw is not None:
+        hnsw.efSearch = ef_search
+
+
+def read_index_shared(path: str) -> faiss.Index:
+    """Open a saved index read-only with its codes memory-mapped, so processes share the pages."""
+    flags = getattr(faiss, "IO_FLAG_MMAP_IFC", faiss.IO_FLAG_MMAP) | faiss.IO_FLAG_READ_ONLY
+    index = faiss.read_index(path, flags)
+    configure_search(index)
+    return index
+
+
+def supports_sequential_remove(index: faiss.Index) -> bool:
+    """True for flat-code indexes, whose `remove_ids` renumbers the remaining vectors
+    the way LangChain's `FAISS.delete` expects. Graph and IVF indexes need a rebuild."""
+    return isinstance(faiss.downcast_index(index), faiss.IndexFlatCodes)
@@ -0,0 +1,156 @@
+# backend/answer_cache.py
+
+from collections import OrderedDict
+import os
+import re
+import time
+import threading
+import numpy as np
+
+ANSWER_CACHE_SIZE = int(os.environ.get("ANSWER_CACHE_SIZE", "1024"))
+ANSWER_CACHE_TTL = float(os.environ.get("ANSWER_CACHE_TTL", "3600"))
+# Cosine similarity above which a paraphrased query reuses a cached answer (> 1 disables)
+ANSWER_CACHE_SIMILARITY = float(os.environ.get("ANSWER_CACHE_SIMILARITY", "0.95"))
+
+
+def normalize_query(query: str) -> str:
+    """Lowercase, drop punctuation and collapse whitespace so trivial variants share a key."""
+    query = re.sub(r"[^\w\s]", " ", query.lower())
+    return " ".join(query.split())
+
+
+class AnswerCache:
+    """Two-tier LRU cache for `/chat` answers.
+
+    Exact tier: keyed on the normalized query string.
+    Semantic tier: cosine similarity between unit-length query embeddings,
+    so paraphrases of a cached question hit without calling the LLM.
+
+    Entries expire after `ttl` seconds; the whole cache is dropped whenever
+    the fingerprint (PDF corpus + prompt template) changes.
+    """
+
+    def __init__(self, max_size: int = ANSWER_CACHE_SIZE, ttl: float = ANSWER_CACHE_TTL,
+                 similarity_threshold: float = ANSWER_CACHE_SIMILARITY):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.similarity_threshold = similarity_threshold
+        self.fingerprint = None
+        self.exact_hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()   # key -> (expires_at, slot, value)
+        self._vectors = None            # (max_size, dim) matrix, one row per slot
+        self._slot_keys = [None] * max_size
+        self._free_slots = list(range(max_size))
+
+    def set_fingerprint(self, fingerprint: str):
+        """Invalidate every entry if the corpus or prompt fingerprint changed."""
+        with self._lock:
+            if fingerprint != self.fingerprint:
+                self._clear_locked()
+                self.fingerprint = fingerprint
+
+    def clear(self):
+        with self._lock:
+            self._clear_locked()
+
+    def _clear_locked(self):
+        self._entries.clear()
+        self._slot_keys = [None] * self.max_size
+        self._free_slots = list(range(self.max_size))
+
+    def _evict_locked(self, key: str):
+        _, slot, _ = self._entries.pop(key)
+        self._slot_keys[slot] = None
+        self._free_slots.append(slot)
+
+    def _get_exact_locked(self, key: str, now: float):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] < now:
+            self._evict_locked(key)
+            return None
+        self._entries.move_to_end(key)
+        return entry[2]
+
+    def _get_similar_locked(self, vector: np.ndarray, now: float):
+        if self._vectors is None or not self._entries or self.similarity_threshold > 1.0:
+            return None
+        occupied = [slot for slot, key in enumerate(self._slot_keys) if key is not None]
+        scores = self._vectors[occupied] @ vector
+        best = int(np.argmax(scores))
+        if scores[best] < self.similarity_threshold:
+            return None
+        return self._get_exact_locked(self._slot_keys[occupied[best]], now)
+
+    def get_exact(self, query: str):
+        """Exact-tier lookup; counts a hit but never a miss (the semantic tier decides that)."""
+        key = normalize_query(query)
+        with self._lock:
+            value = self._get_exact_locked(key, time.monotonic())
+            if value is None:
+                return None
+            self.exact_hits += 1
+            return dict(value)
+
+    def get_similar(self, vector):
+        """Semantic-tier lookup for a unit-length query vector."""
+        vector = np.asarray(vector, dtype=np.float32)
+        with self._lock:
+            value = self._get_similar_locked(vector, time.monotonic())
+            if value is None:
+                self.misses += 1
+                return None
+            self.semantic_hits += 1
+            return dict(value)
+
+    def lookup(self, query: str, embed_query) -> tuple:
+        """Find a cached answer for `query`.
+
+        `embed_query` is only called on an exact-tier miss. Returns
+        (value or None, query_vector or None) so callers can reuse the vector.
+        """
+        value = self.get_exact(query)
+        if value is not None:
+            return value, None
+        vector = np.asarray(embed_query(query), dtype=np.float32)
+        return self.get_similar(vector), vector
+
+    def put(self, query: str, vector, value: dict, fingerprint: str = None):
+        """Cache an answer. With `fingerprint`, answers computed against an
+        older corpus (the index was reloaded meanwhile) are dropped."""
+        if self.max_size <= 0:
+            return
+        key = normalize_query(query)
+        vector = np.asarray(vector, dtype=np.float32)
+        with self._lock:
+            if fingerprint is not None and fingerprint != self.fingerprint:
+                return
+            if key in self._entries:
+                self._evict_locked(key)
+            while not self._free_slots:
+                # Least recently used entry sits at the front
+                self._evict_locked(next(iter(self._entries)))
+
+            if self._vectors is None:
+                self._vectors = np.zeros((self.max_size, vector.shape[0]), dtype=np.float32)
+            slot = self._free_slots.pop()
+            self._vectors[slot] = vector
+            self._slot_keys[slot] = key
+            self._entries[key] = (time.monotonic() + self.ttl, slot, dict(value))
+
+    def stats(self) -> dict:
+        with self._lock:
+            hits = self.exact_hits + self.semantic_hits
+            total = hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "exact_hits": self.exact_hits,
+                "semantic_hits": self.semantic_hits,
+                "misses": self.misses,
+                "hit_ratio": round(hits / total, 4) if total else 0.0,
+            }
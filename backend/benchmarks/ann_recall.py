@@ -0,0 +1,144 @@
+# backend/benchmarks/ann_recall.py
+#
+# Recall-vs-latency report for the ANN index modes against the exact flat index.
+#
+#   python benchmarks/ann_recall.py                      # vectors from the persisted index/
+#   python benchmarks/ann_recall.py --synthetic 200000   # clustered random unit vectors
+#
+# Prints (or writes with --out) a JSON report: per configuration and search
+# parameter, recall@k against flat search, p50/p99 single-query latency,
+# build time and serialized index size.
+
+import os
+import sys
+import json
+import time
+import argparse
+import faiss
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ann_index import build_index, auto_nlist  # noqa: E402
+from index_store import INDEX_DIR, STORE_DIR_NAME  # noqa: E402
+
+DEFAULT_CONFIGS = [
+    ("HNSW32", "efSearch", [16, 32, 64, 128]),
+    ("HNSW32_SQ8", "efSearch", [32, 64, 128]),
+    ("IVF{nlist},Flat", "nprobe", [1, 4, 16, 64]),
+    ("IVF{nlist},SQ8", "nprobe", [4, 16, 64]),
+    ("IVF{nlist},PQ48", "nprobe", [4, 16, 64]),
+]
+
+
+def load_index_vectors(index_dir: str) -> np.ndarray:
+    index = faiss.read_index(os.path.join(index_dir, STORE_DIR_NAME, "index.faiss"))
+    ivf = faiss.try_extract_index_ivf(index)
+    if ivf is not None:
+        ivf.make_direct_map()
+    return index.reconstruct_n(0, index.ntotal)
+
+
+def synthetic_vectors(n: int, dim: int = 384, clusters: int = 256, seed: int = 0) -> np.ndarray:
+    """Unit vectors drawn around random centroids, roughly like sentence embeddings."""
+    rng = np.random.default_rng(seed)
+    centroids = rng.standard_normal((clusters, dim)).astype(np.float32)
+    vectors = centroids[rng.integers(0, clusters, n)] + 0.5 * rng.standard_normal((n, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def sample_queries(vectors: np.ndarray, n: int, seed: int = 1) -> np.ndarray:
+    """Perturbed copies of stored vectors, so every query has true neighbours."""
+    rng = np.random.default_rng(seed)
+    queries = vectors[rng.choice(len(vectors), n, replace=len(vectors) < n)]
+    queries = queries + 0.05 * rng.standard_normal(queries.shape).astype(np.float32)
+    return queries / np.linalg.norm(queries, axis=1, keepdims=True)
+
+
+def timed_search(index, queries: np.ndarray, k: int) -> tuple:
+    """Search one query at a time (the serving pattern); returns (ids, latencies_ms)."""
+    ids = np.empty((len(queries), k), dtype=np.int64)
+    latencies = np.empty(len(queries))
+    for i, query in enumerate(queries):
+        start = time.perf_counter()
+        _, ids[i] = index.search(query.reshape(1, -1), k)
+        latencies[i] = (time.perf_counter() - start) * 1000
+    return ids, latencies
+
+
+def recall_at_k(found: np.ndarray, truth: np.ndarray) -> float:
+    hits = sum(len(set(f) & set(t)) for f, t in zip(found, truth))
+    return hits / truth.size
+
+
+def latency_summary(latencies: np.ndarray) -> dict:
+    return {
+        "p50_ms": round(float(np.percentile(latencies, 50)), 4),
+        "p99_ms": round(float(np.percentile(latencies, 99)), 4),
+    }
+
+
+def run(vectors: np.ndarray, n_queries: int, k: int, configs: list) -> dict:
+    queries = sample_queries(vectors, n_queries)
+
+    flat = faiss.IndexFlatL2(vectors.shape[1])
+    flat.add(vectors)
+    truth, flat_latencies = timed_search(flat, queries, k)
+
+    report = {
+        "vectors": int(len(vectors)),
+        "dim": int(vectors.shape[1]),
+        "queries": int(n_queries),
+        "k": k,
+        "baseline": {
+            "index": "Flat",
+            "bytes": int(faiss.serialize_index(flat).size),
+            **latency_summary(flat_latencies),
+        },
+        "results": [],
+    }
+
+    for template, param, values in configs:
+        description = template.format(nlist=auto_nlist(len(vectors)))
+        start = time.perf_counter()
+        try:
+            index = build_index(vectors, description)
+            index.add(vectors)
+        except RuntimeError as e:
+            report["results"].append({"index": description, "error": str(e)})
+            continue
+        build_s = time.perf_counter() - start
+        size = int(faiss.serialize_index(index).size)
+
+        for value in values:
+            faiss.ParameterSpace().set_index_parameter(index, param, value)
+            found, latencies = timed_search(index, queries, k)
+            report["results"].append({
+                "index": description,
+                param: value,
+                f"recall@{k}": round(recall_at_k(found, truth), 4),
+                "build_s": round(build_s, 3),
+                "bytes": size,
+                **latency_summary(latencies),
+            })
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="ANN recall vs latency against flat search")
+    parser.add_argument("--index-dir", default=INDEX_DIR, help="Persisted index to take vectors from")
+    parser.add_argument("--synthetic", type=int, default=0, help="Use N synthetic vectors instead")
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("-k", type=int, default=5)
+    parser.add_argument("--out", help="Write the JSON report here instead of stdout")
+    args = parser.parse_args()
+
+    vectors = synthetic_vectors(args.synthetic) if args.synthetic else load_index_vectors(args.index_dir)
+    report = run(np.ascontiguousarray(vectors, dtype=np.float32), args.queries, args.k, DEFAULT_CONFIGS)
+
+    output = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(output)
+    else:
+        print(output)
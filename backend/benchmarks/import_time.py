@@ -0,0 +1,109 @@
+# backend/benchmarks/import_time.py
+#
+# Import-time and memory cost of the backend modules, each in a fresh interpreter.
+#
+#   python benchmarks/import_time.py                                   # JSON report to stdout
+#   python benchmarks/import_time.py --out imports.json
+#   python benchmarks/import_time.py --baseline imports.json --max-regression 0.25
+#
+# With --baseline, exits non-zero when a module got more than --max-regression
+# (fraction) slower, or now pulls in a heavy dependency it did not load before.
+
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_MODULES = ["specialization", "doctor_finder", "rag_service", "main"]
+# Dependencies that should only load when their capability is first used
+HEAVY_MODULES = [
+    "torch", "sentence_transformers", "transformers", "faiss",
+    "langchain", "langchain_community", "langchain_groq", "langgraph",
+    "langchain_core", "requests", "httpx",
+]
+
+PROBE = """
+import sys, time, json, resource
+start = time.perf_counter()
+import {module}
+seconds = time.perf_counter() - start
+rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({{
+    "seconds": seconds,
+    "max_rss_mb": rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024,
+    "heavy": [m for m in {heavy!r} if m in sys.modules],
+}}))
+"""
+
+
+def measure(module: str, runs: int) -> dict:
+    """Median import time over `runs` fresh interpreters; RSS and heavy deps from the last run."""
+    samples, last = [], None
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, "-c", PROBE.format(module=module, heavy=HEAVY_MODULES)],
+            cwd=BACKEND_DIR, capture_output=True, text=True,
+        )
+        if result.returncode != 0:
+            return {"error": result.stderr.strip().splitlines()[-1] if result.stderr else "import failed"}
+        last = json.loads(result.stdout.strip().splitlines()[-1])
+        samples.append(last["seconds"])
+    return {
+        "seconds_median": round(statistics.median(samples), 4),
+        "seconds_min": round(min(samples), 4),
+        "max_rss_mb": round(last["max_rss_mb"], 1),
+        "heavy_modules": last["heavy"],
+    }
+
+
+def compare(report: dict, baseline: dict, max_regression: float) -> list:
+    """Human-readable regressions of `report` against `baseline`."""
+    problems = []
+    for module, current in report["modules"].items():
+        before = baseline.get("modules", {}).get(module)
+        if not before or "error" in before or "error" in current:
+            continue
+        # Small absolute slack so millisecond-level modules don't flag on noise
+        limit = before["seconds_median"] * (1 + max_regression) + 0.01
+        if current["seconds_median"] > limit:
+            problems.append(
+                f"{module}: {current['seconds_median']:.3f}s vs baseline {before['seconds_median']:.3f}s"
+            )
+        added = sorted(set(current["heavy_modules"]) - set(before["heavy_modules"]))
+        if added:
+            problems.append(f"{module}: now imports {', '.join(added)}")
+    return problems
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure backend module import cost")
+    parser.add_argument("modules", nargs="*", default=DEFAULT_MODULES)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--out", help="Write the JSON report here instead of stdout")
+    parser.add_argument("--baseline", help="Previous report to compare against")
+    parser.add_argument("--max-regression", type=float, default=0.25)
+    args = parser.parse_args()
+
+    report = {
+        "python": sys.version.split()[0],
+        "runs": args.runs,
+        "modules": {module: measure(module, args.runs) for module in args.modules},
+    }
+
+    problems = []
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            problems = compare(report, json.load(f), args.max_regression)
+        report["regressions"] = problems
+
+    output = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(output)
+    else:
+        print(output)
+    sys.exit(1 if problems else 0)
@@ -0,0 +1,346 @@
+# backend/benchmarks/run_benchmarks.py
+#
+# Reproducible benchmark suite: ingestion, embedding, FAISS search, extraction
+# and end-to-end `RAGService.get_answer`, on a synthetic PDF corpus with a
+# deterministic stub LLM (no network, no API key).
+#
+#   python benchmarks/run_benchmarks.py --out bench.json
+#   python benchmarks/run_benchmarks.py --baseline bench.json --max-regression 0.2
+#   python benchmarks/run_benchmarks.py --embeddings hash --quick      # no model download
+#
+# Metrics ending in `_per_s` are throughputs (higher is better); metrics ending
+# in `_ms` / `_s` are latencies (lower is better). With --baseline, the exit
+# code is 1 when any metric regressed by more than --max-regression.
+
+import os
+import re
+import sys
+import json
+import time
+import hashlib
+import argparse
+import platform
+import tempfile
+import subprocess
+import numpy as np
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from langchain_core.embeddings import Embeddings  # noqa: E402
+from langchain_core.language_models.chat_models import BaseChatModel  # noqa: E402
+from langchain_core.messages import AIMessage  # noqa: E402
+from langchain_core.outputs import ChatGeneration, ChatResult  # noqa: E402
+
+from synthetic_corpus import generate_corpus  # noqa: E402
+from ann_recall import synthetic_vectors, sample_queries, timed_search, latency_summary  # noqa: E402
+from ann_index import build_index, index_config  # noqa: E402
+from formulary import get_medicine_matcher  # noqa: E402
+from specialization import detect_specialization  # noqa: E402
+
+QUERIES = [
+    "What is the dose of paracetamol for fever in adults?",
+    "Can I take ibuprofen with high blood pressure?",
+    "Side effects of metformin for diabetes",
+    "Is amoxicillin safe during pregnancy?",
+    "My child has a cough and cold, which syrup is suitable?",
+    "Warfarin interaction with aspirin",
+    "Treatment for asthma attack, salbutamol inhaler dose",
+    "Thyroid hormone replacement levothyroxine timing",
+    "Skin rash after taking an antibiotic",
+    "Migraine headache medicine and precautions",
+]
+
+
+class HashEmbeddings(Embeddings):
+    """Deterministic bag-of-words embeddings: no model download, stable across runs."""
+
+    def __init__(self, dim: int = 384):
+        self.dim = dim
+
+    def _embed(self, text: str) -> list:
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for word in re.findall(r"\w+", text.lower()):
+            vector[int(hashlib.md5(word.encode("utf-8")).hexdigest()[:8], 16) % self.dim] += 1.0
+        norm = np.linalg.norm(vector)
+        return (vector / norm if norm else vector).tolist()
+
+    def embed_documents(self, texts: list) -> list:
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text: str) -> list:
+        return self._embed(text)
+
+
+class StubChatModel(BaseChatModel):
+    """Deterministic stand-in for ChatGroq.
+
+    Answers in the prompt's structured format, listing the formulary medicines
+    found in the retrieved context, after an optional fixed `latency_s`.
+    """
+
+    latency_s: float = 0.0
+
+    @property
+    def _llm_type(self) -> str:
+        return "benchmark-stub"
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        prompt = messages[-1].content
+        context = prompt.split("### Retrieved Context:")[-1].split("### Query:")[0]
+        medicines = []
+        for _, _, _, canonical in get_medicine_matcher().finditer(context):
+            if canonical not in medicines:
+                medicines.append(canonical)
+        lines = [
+            "🔍 **Risk Level**: Low",
+            "",
+            "📋 **Condition Analysis**: Based on the retrieved sources.",
+            "",
+            "💊 **Suggested Medicines**:",
+        ]
+        lines += [f"- **{name.title()}** — as listed in the retrieved formulary" for name in medicines[:5]]
+        lines += ["", "📌 **Recommendation**: Consult a doctor."]
+        if self.latency_s:
+            time.sleep(self.latency_s)
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content="\n".join(lines)))])
+
+
+def percentiles(samples_ms: list) -> dict:
+    samples = np.asarray(samples_ms)
+    return {
+        "p50_ms": round(float(np.percentile(samples, 50)), 3),
+        "p99_ms": round(float(np.percentile(samples, 99)), 3),
+        "mean_ms": round(float(samples.mean()), 3),
+    }
+
+
+def throughput(func, items: list, min_seconds: float = 0.5) -> dict:
+    """Call `func` on every item, repeating the pass until `min_seconds` have elapsed."""
+    calls = 0
+    start = time.perf_counter()
+    while True:
+        for item in items:
+            func(item)
+        calls += len(items)
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_seconds:
+            return {"calls": calls, "calls_per_s": round(calls / elapsed, 1)}
+
+
+def bench_ingestion(pdf_paths: list, workers: int) -> tuple:
+    from index_store import parse_pdfs
+    start = time.perf_counter()
+    parsed = parse_pdfs(pdf_paths, workers=workers)
+    seconds = time.perf_counter() - start
+    pages = sum(page_count for page_count, _, _ in parsed)
+    chunks = [doc for _, docs, _ in parsed for doc in docs]
+    return {
+        "pdfs": len(pdf_paths),
+        "pages": pages,
+        "chunks": len(chunks),
+        "workers": workers,
+        "seconds_s": round(seconds, 3),
+        "pages_per_s": round(pages / seconds, 1),
+        "chunks_per_s": round(len(chunks) / seconds, 1),
+    }, chunks
+
+
+def bench_embedding(embeddings, texts: list) -> dict:
+    from index_store import EMBED_BATCH_SIZE
+    embeddings.embed_documents(texts[:8])  # warm-up
+    start = time.perf_counter()
+    for i in range(0, len(texts), EMBED_BATCH_SIZE):
+        embeddings.embed_documents(texts[i:i + EMBED_BATCH_SIZE])
+    seconds = time.perf_counter() - start
+    query_ms = []
+    for query in QUERIES * 3:
+        started = time.perf_counter()
+        embeddings.embed_query(query)
+        query_ms.append((time.perf_counter() - started) * 1000)
+    return {
+        "chunks": len(texts),
+        "batch_size": EMBED_BATCH_SIZE,
+        "chunks_per_s": round(len(texts) / seconds, 1),
+        "query": percentiles(query_ms),
+    }
+
+
+def bench_faiss(dim: int, sizes: list, k: int, n_queries: int) -> dict:
+    results = {}
+    for n in sizes:
+        vectors = synthetic_vectors(n, dim=dim)
+        start = time.perf_counter()
+        index = build_index(vectors)
+        index.add(vectors)
+        build_s = time.perf_counter() - start
+        _, latencies = timed_search(index, sample_queries(vectors, n_queries), k)
+        results[str(n)] = {"build_s": round(build_s, 3), **latency_summary(latencies)}
+    return results
+
+
+def bench_extraction(service, chunks: list, answers: list) -> dict:
+    sources = [
+        [{"content": doc.page_content[:300], "metadata": doc.metadata} for doc in chunks[i:i + 5]]
+        for i in range(0, min(len(chunks), 200), 5)
+    ]
+    return {
+        "extract_medicines": throughput(service._extract_medicines, answers),
+        "extract_medicines_from_sources": throughput(service._extract_medicines_from_sources, sources),
+        "detect_specialization": throughput(detect_specialization, QUERIES),
+    }
+
+
+def bench_get_answer(service, runs: int) -> dict:
+    uncached = []
+    for i in range(runs):
+        service.answer_cache.clear()
+        start = time.perf_counter()
+        service.get_answer(QUERIES[i % len(QUERIES)])
+        uncached.append((time.perf_counter() - start) * 1000)
+    for query in QUERIES:
+        service.get_answer(query)   # warm the answer cache
+    cached = []
+    for i in range(runs):
+        start = time.perf_counter()
+        service.get_answer(QUERIES[i % len(QUERIES)])
+        cached.append((time.perf_counter() - start) * 1000)
+    return {"runs": runs, "uncached": percentiles(uncached), "cached": percentiles(cached)}
+
+
+def flatten(results: dict, prefix: str = "") -> dict:
+    flat = {}
+    for key, value in results.items():
+        path = f"{prefix}.{key}" if prefix else key
+        if isinstance(value, dict):
+            flat.update(flatten(value, path))
+        elif isinstance(value, (int, float)) and (key.endswith("_per_s") or key.endswith("_ms") or key.endswith("_s")):
+            flat[path] = value
+    return flat
+
+
+def compare(results: dict, baseline: dict, max_regression: float, min_delta_ms: float = 0.1) -> dict:
+    """Relative change per metric (positive = better) and the metrics that regressed.
+
+    Latency regressions smaller than `min_delta_ms` in absolute terms are ignored,
+    so sub-millisecond timings (cache hits, small FAISS searches) don't flap.
+    """
+    current, before = flatten(results), flatten(baseline.get("results", {}))
+    changes, regressions = {}, []
+    for path, value in current.items():
+        old = before.get(path)
+        if not old:
+            continue
+        higher_is_better = path.endswith("_per_s")
+        change = (value - old) / old if higher_is_better else (old - value) / old
+        changes[path] = round(change, 4)
+        if path.endswith("_s") and not path.endswith("_per_s"):
+            noise = (value - old) * 1000 < min_delta_ms
+        elif path.endswith("_ms"):
+            noise = value - old < min_delta_ms
+        else:
+            noise = False
+        if change < -max_regression and not noise:
+            regressions.append(path)
+    return {"changes": changes, "regressions": regressions}
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, capture_output=True, text=True
+        ).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="TruthTriage benchmark suite")
+    parser.add_argument("--workdir", help="Corpus and index directory (default: a temp dir)")
+    parser.add_argument("--docs", type=int, default=20)
+    parser.add_argument("--pages", type=int, default=30)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--embeddings", choices=["torch", "onnx", "hash"], default="torch",
+                        help="MiniLM on sentence-transformers or ONNX Runtime int8, or a hash stub")
+    parser.add_argument("--faiss-sizes", default="1000,10000,100000")
+    parser.add_argument("--faiss-queries", type=int, default=200)
+    parser.add_argument("--answer-runs", type=int, default=50)
+    parser.add_argument("--llm-latency-ms", type=float, default=0.0, help="Simulated LLM latency per call")
+    parser.add_argument("--quick", action="store_true", help="Small corpus and sizes for a smoke run")
+    parser.add_argument("--out", help="Write the JSON report here instead of stdout")
+    parser.add_argument("--baseline", help="Previous report to compare against")
+    parser.add_argument("--max-regression", type=float, default=0.2)
+    parser.add_argument("--min-delta-ms", type=float, default=0.1, help="Ignore smaller latency regressions")
+    args = parser.parse_args()
+    if args.quick:
+        args.docs, args.pages, args.faiss_sizes, args.answer_runs = 4, 10, "1000,10000", 20
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix="truthtriage-bench-")
+    data_dir, index_dir = os.path.join(workdir, "data"), os.path.join(workdir, "index")
+    pdf_paths = generate_corpus(data_dir, args.docs, args.pages, args.seed)
+
+    if args.embeddings == "hash":
+        embeddings, model_name = HashEmbeddings(), "hash-384"
+    else:
+        from embedding_backend import load_embeddings
+        from rag_service import EMBEDDING_MODEL
+        embeddings, model_name, _ = load_embeddings(EMBEDDING_MODEL, backend=args.embeddings)
+
+    results = {}
+    results["ingestion"], chunks = bench_ingestion(pdf_paths, args.workers)
+    results["embedding"] = bench_embedding(embeddings, [doc.page_content for doc in chunks])
+
+    from index_store import IndexStore
+    from rag_service import RAGService, RETRIEVAL_K, HYBRID_CANDIDATE_FACTOR
+    service = RAGService()
+    start = time.perf_counter()
+    service.initialize_vectorstore(
+        embeddings=embeddings,
+        llm=StubChatModel(latency_s=args.llm_latency_ms / 1000.0),
+        index_store=IndexStore(data_dir, index_dir, embedding_model=model_name),
+    )
+    results["index_build"] = {
+        "chunks": service.vectorstore.index.ntotal,
+        "duplicates": service.index_store.duplicate_count,
+        "seconds_s": round(time.perf_counter() - start, 3),
+    }
+
+    dim = service.vectorstore.index.d
+    sizes = [int(n) for n in args.faiss_sizes.split(",") if n]
+    results["faiss_search"] = bench_faiss(dim, sizes, RETRIEVAL_K * HYBRID_CANDIDATE_FACTOR, args.faiss_queries)
+
+    answers = [service.get_answer(query)["answer"] for query in QUERIES]
+    results["extraction"] = bench_extraction(service, chunks, answers)
+    results["get_answer"] = bench_get_answer(service, args.answer_runs)
+
+    report = {
+        "meta": {
+            "git_revision": git_revision(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "embeddings": model_name,
+            "index": index_config(),
+            "corpus": {"docs": args.docs, "pages": args.pages, "seed": args.seed},
+            "llm_latency_ms": args.llm_latency_ms,
+        },
+        "results": results,
+    }
+    regressions = []
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            report["comparison"] = compare(results, json.load(f), args.max_regression, args.min_delta_ms)
+        regressions = report["comparison"]["regressions"]
+
+    output = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(output)
+    else:
+        print(output)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,124 @@
+# backend/benchmarks/synthetic_corpus.py
+#
+# Deterministic synthetic corpus of formulary-style PDFs for the benchmarks.
+#
+#   python benchmarks/synthetic_corpus.py /tmp/bench_data --docs 20 --pages 30
+#
+# Pages mix monograph entries (medicine, dose, indication, warnings) with the
+# repeated boilerplate real WHO / CDSCO / NLEM lists contain, so splitting,
+# deduplication, retrieval and extraction all see realistic text.
+
+import os
+import sys
+import random
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from formulary import KNOWN_MEDICINES  # noqa: E402
+from specialization import SPECIALIZATION_MAP  # noqa: E402
+
+DOSAGE_FORMS = ["tablet", "capsule", "oral solution", "injection", "syrup", "cream"]
+UNITS = ["mg", "mg", "mg", "mcg", "ml", "IU"]
+BOILERPLATE = (
+    "This list is provided for reference only and does not replace clinical judgement. "
+    "Doses are for adults unless stated otherwise. Consult the national formulary for "
+    "current availability and pricing."
+)
+LINES_PER_PAGE = 48
+CHARS_PER_LINE = 95
+
+
+def monograph(rng: random.Random) -> str:
+    medicine = rng.choice(KNOWN_MEDICINES).title()
+    condition = rng.choice(list(SPECIALIZATION_MAP))
+    dose = rng.choice([5, 10, 25, 50, 100, 250, 400, 500, 1000])
+    return (
+        f"{medicine} {dose} {rng.choice(UNITS)} {rng.choice(DOSAGE_FORMS)}. "
+        f"Indication: treatment of {condition} related conditions. "
+        f"Usual dose: {dose} {rng.choice(UNITS)} every {rng.choice([6, 8, 12, 24])} hours. "
+        f"Caution in renal impairment, pregnancy and in children under {rng.choice([2, 6, 12])} years. "
+        f"Adverse effects include nausea, rash and dizziness."
+    )
+
+
+def page_text(rng: random.Random) -> str:
+    paragraphs = [BOILERPLATE] if rng.random() < 0.3 else []
+    while sum(len(p) for p in paragraphs) < LINES_PER_PAGE * CHARS_PER_LINE * 0.8:
+        paragraphs.append(monograph(rng))
+    return "\n".join(paragraphs)
+
+
+def wrap(text: str, width: int = CHARS_PER_LINE) -> list:
+    lines = []
+    for paragraph in text.split("\n"):
+        line = ""
+        for word in paragraph.split():
+            if line and len(line) + 1 + len(word) > width:
+                lines.append(line)
+                line = word
+            else:
+                line = f"{line} {word}" if line else word
+        lines.append(line)
+    return lines
+
+
+def write_pdf(path: str, pages: list):
+    """Write a minimal uncompressed PDF with one Helvetica text stream per page."""
+    objects = [b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]   # object 1
+    pages_id = 2 + 2 * len(pages)
+    page_ids = []
+    for text in pages:
+        ops = []
+        y = 780
+        for line in wrap(text)[:LINES_PER_PAGE + 10]:
+            escaped = line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+            ops.append(f"BT /F1 9 Tf 36 {y} Td ({escaped}) Tj ET")
+            y -= 12
+        stream = "\n".join(ops).encode("latin-1", "replace")
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+        content_id = len(objects)
+        objects.append(
+            f"<< /Type /Page /Parent {pages_id} 0 R /MediaBox [0 0 612 792] "
+            f"/Contents {content_id} 0 R /Resources << /Font << /F1 1 0 R >> >> >>".encode()
+        )
+        page_ids.append(len(objects))
+    kids = " ".join(f"{i} 0 R" for i in page_ids)
+    objects.append(f"<< /Type /Pages /Kids [{kids}] /Count {len(page_ids)} >>".encode())
+    objects.append(f"<< /Type /Catalog /Pages {pages_id} 0 R >>".encode())
+    catalog_id = len(objects)
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n".encode() + body + b"\nendobj\n"
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    out += b"".join(f"{offset:010d} 00000 n \n".encode() for offset in offsets)
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root {catalog_id} 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    with open(path, "wb") as f:
+        f.write(out)
+
+
+def generate_corpus(out_dir: str, docs: int = 10, pages: int = 20, seed: int = 0) -> list:
+    """Write `docs` PDFs of `pages` pages each; the same seed gives byte-identical files."""
+    os.makedirs(out_dir, exist_ok=True)
+    rng = random.Random(seed)
+    paths = []
+    for i in range(docs):
+        path = os.path.join(out_dir, f"synthetic_{i:03d}.pdf")
+        write_pdf(path, [page_text(rng) for _ in range(pages)])
+        paths.append(path)
+    return paths
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a synthetic PDF corpus")
+    parser.add_argument("out_dir")
+    parser.add_argument("--docs", type=int, default=10)
+    parser.add_argument("--pages", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    for path in generate_corpus(args.out_dir, args.docs, args.pages, args.seed):
+        print(path)
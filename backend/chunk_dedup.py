@@ -0,0 +1,170 @@
+# backend/chunk_dedup.py
+
+import os
+import re
+import zlib
+import pickle
+import hashlib
+import numpy as np
+
+DEDUP_CHUNKS = os.environ.get("DEDUP_CHUNKS", "1") == "1"
+# Estimated Jaccard similarity of word shingles above which two chunks are one;
+# 0 (default) merges exact duplicates only. Near duplicates are never merged
+# when their numbers (doses, ages, strengths) differ.
+DEDUP_THRESHOLD = float(os.environ.get("DEDUP_THRESHOLD", "0"))
+SHINGLE_SIZE = int(os.environ.get("SHINGLE_SIZE", "5"))
+MINHASH_PERMUTATIONS = int(os.environ.get("MINHASH_PERMUTATIONS", "64"))
+MINHASH_BANDS = int(os.environ.get("MINHASH_BANDS", "16"))
+
+WORD_PATTERN = re.compile(r"\w+")
+# Prime just below 2**32: (a * x + b) stays inside uint64 for 31-bit a, b and 32-bit x
+HASH_PRIME = np.uint64(4294967291)
+
+
+def dedup_config() -> dict:
+    """Settings recorded in the manifest; any change forces a rebuild."""
+    if not DEDUP_CHUNKS:
+        return {"enabled": False}
+    return {
+        "enabled": True,
+        "threshold": DEDUP_THRESHOLD,
+        "numbers_must_match": True,
+        "shingle_size": SHINGLE_SIZE,
+        "permutations": MINHASH_PERMUTATIONS,
+        "bands": MINHASH_BANDS,
+    }
+
+
+def normalize_text(text: str) -> list:
+    """Lowercase word tokens, so spacing, line breaks and punctuation don't matter."""
+    return WORD_PATTERN.findall(text.lower())
+
+
+def numeric_tokens(words: list) -> tuple:
+    """Sorted tokens containing a digit, e.g. `500`, `5mg`, `12`; chunks differing here are never merged."""
+    return tuple(sorted(w for w in words if any(c.isdigit() for c in w)))
+
+
+def provenance(doc, chunk_id: str) -> dict:
+    """Where a chunk came from, as merged into its canonical chunk's metadata."""
+    return {"source": doc.metadata.get("source"), "page": doc.metadata.get("page"), "chunk_id": chunk_id}
+
+
+class ChunkDeduplicator:
+    """Exact and near-duplicate detection for chunks across all indexed PDFs.
+
+    Exact duplicates share the hash of their normalized words. Near duplicates
+    are found with MinHash over word shingles: signatures are split into bands
+    and only chunks colliding in at least one band are compared, so each new
+    chunk is checked against the whole index in roughly constant time. A near
+    duplicate must also contain exactly the same numbers, so chunks differing
+    only in a dose or age band both stay indexed. Only canonical (kept) chunks
+    are registered.
+    """
+
+    def __init__(self, threshold: float = DEDUP_THRESHOLD, shingle_size: int = SHINGLE_SIZE,
+                 permutations: int = MINHASH_PERMUTATIONS, bands: int = MINHASH_BANDS):
+        if permutations % bands:
+            raise ValueError("MINHASH_PERMUTATIONS must be a multiple of MINHASH_BANDS")
+        self.threshold = threshold
+        self.shingle_size = shingle_size
+        self.bands = bands
+        self.rows = permutations // bands
+        rng = np.random.default_rng(0)
+        self.a = rng.integers(1, 2 ** 31, permutations, dtype=np.uint64)
+        self.b = rng.integers(0, 2 ** 31, permutations, dtype=np.uint64)
+
+        self.exact = {}        # normalized-text hash -> chunk id
+        self.signatures = {}   # chunk id -> MinHash signature
+        self.numbers = {}      # chunk id -> numeric tokens
+        self.buckets = {}      # (band, band bytes) -> set of chunk ids
+
+    def __len__(self):
+        return len(self.signatures)
+
+    def _signature(self, words: list) -> np.ndarray:
+        n = self.shingle_size
+        if len(words) <= n:
+            shingles = {" ".join(words)}
+        else:
+            shingles = {" ".join(words[i:i + n]) for i in range(len(words) - n + 1)}
+        hashes = np.fromiter(
+            (zlib.crc32(s.encode("utf-8")) for s in shingles), dtype=np.uint64, count=len(shingles)
+        )
+        # One row per permutation, minimum over shingles
+        return ((np.outer(self.a, hashes) + self.b[:, None]) % HASH_PRIME).min(axis=1)
+
+    def _bands(self, signature: np.ndarray):
+        for band in range(self.bands):
+            yield band, signature[band * self.rows:(band + 1) * self.rows].tobytes()
+
+    def match(self, text: str) -> tuple:
+        """Return (canonical chunk id or None, exact_hash, signature, numbers) for a chunk's text."""
+        words = normalize_text(text)
+        exact_hash = hashlib.sha1(" ".join(words).encode("utf-8")).hexdigest()
+        canonical = self.exact.get(exact_hash)
+        signature = self._signature(words)
+        numbers = numeric_tokens(words)
+        if canonical is not None or self.threshold <= 0:
+            return canonical, exact_hash, signature, numbers
+
+        candidates = set()
+        for band_key in self._bands(signature):
+            candidates.update(self.buckets.get(band_key, ()))
+        best, best_similarity = None, self.threshold
+        for chunk_id in candidates:
+            if self.numbers[chunk_id] != numbers:
+                continue
+            similarity = float(np.mean(self.signatures[chunk_id] == signature))
+            if similarity >= best_similarity:
+                best, best_similarity = chunk_id, similarity
+        return best, exact_hash, signature, numbers
+
+    def add(self, chunk_id: str, exact_hash: str, signature: np.ndarray, numbers: tuple):
+        """Register a canonical chunk."""
+        self.exact.setdefault(exact_hash, chunk_id)
+        self.signatures[chunk_id] = signature
+        self.numbers[chunk_id] = numbers
+        for band_key in self._bands(signature):
+            self.buckets.setdefault(band_key, set()).add(chunk_id)
+
+    def remove(self, chunk_ids: list):
+        removed = set(chunk_ids)
+        for chunk_id in removed:
+            signature = self.signatures.pop(chunk_id, None)
+            self.numbers.pop(chunk_id, None)
+            if signature is None:
+                continue
+            for band_key in self._bands(signature):
+                bucket = self.buckets.get(band_key)
+                if bucket is not None:
+                    bucket.discard(chunk_id)
+                    if not bucket:
+                        del self.buckets[band_key]
+        self.exact = {h: chunk_id for h, chunk_id in self.exact.items() if chunk_id not in removed}
+
+    def deduplicate(self, docs: list, ids: list) -> tuple:
+        """Split new chunks into canonical ones and duplicates of indexed or earlier chunks.
+
+        Returns (kept_docs, kept_ids, duplicates) where `duplicates` maps each
+        dropped chunk id to (canonical id, exact). Kept chunks are registered.
+        """
+        kept_docs, kept_ids, duplicates = [], [], {}
+        for doc, chunk_id in zip(docs, ids):
+            canonical, exact_hash, signature, numbers = self.match(doc.page_content)
+            if canonical is None:
+                self.add(chunk_id, exact_hash, signature, numbers)
+                kept_docs.append(doc)
+                kept_ids.append(chunk_id)
+            else:
+                duplicates[chunk_id] = (canonical, self.exact.get(exact_hash) == canonical)
+        return kept_docs, kept_ids, duplicates
+
+    def save(self, path: str):
+        with open(path, "wb") as f:
+            pickle.dump(self, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @staticmethod
+    def load(path: str):
+        with open(path, "rb") as f:
+            return pickle.load(f)
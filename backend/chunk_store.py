@@ -0,0 +1,70 @@
+# backend/chunk_store.py
+
+from collections.abc import Mapping
+import os
+import json
+import mmap
+import numpy as np
+
+
+class ChunkStore:
+    """Read-only chunk texts and metadata in one memory-mapped file.
+
+    Chunk `i` is FAISS vector `i`. Records are JSON (`id`, `text`, `metadata`)
+    located through an offsets array, and a record is only decoded when a search
+    returns it, so worker processes share the file through the page cache
+    instead of each unpickling a docstore. Serves as the LangChain FAISS
+    docstore with `PositionIds` as its id mapping.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.offsets = np.load(path + ".offsets.npy", mmap_mode="r")
+        with open(path, "rb") as f:
+            self._data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    @staticmethod
+    def write(path: str, docs: list):
+        """Write Documents (in FAISS id order) and their offsets."""
+        offsets = np.zeros(len(docs) + 1, dtype=np.int64)
+        with open(path, "wb") as f:
+            for i, doc in enumerate(docs):
+                record = json.dumps(
+                    {"id": doc.id, "text": doc.page_content, "metadata": doc.metadata}, ensure_ascii=False
+                ).encode("utf-8")
+                f.write(record)
+                offsets[i + 1] = offsets[i] + len(record)
+        np.save(path + ".offsets.npy", offsets)
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def document(self, i: int):
+        from langchain_core.documents import Document
+        record = json.loads(self._data[int(self.offsets[i]):int(self.offsets[i + 1])])
+        return Document(id=record["id"], page_content=record["text"], metadata=record["metadata"])
+
+    def search(self, search: int):
+        """Docstore lookup; ids are FAISS positions (see `PositionIds`)."""
+        return self.document(search)
+
+    def close(self):
+        self._data.close()
+
+
+class PositionIds(Mapping):
+    """`index_to_docstore_id` for a `ChunkStore`: FAISS id `i` maps to docstore id `i`."""
+
+    def __init__(self, size: int):
+        self.size = size
+
+    def __getitem__(self, i: int) -> int:
+        if not 0 <= i < self.size:
+            raise KeyError(i)
+        return i
+
+    def __iter__(self):
+        return iter(range(self.size))
+
+    def __len__(self) -> int:
+        return self.size
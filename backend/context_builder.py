@@ -0,0 +1,106 @@
+# backend/context_builder.py
+
+import os
+import re
+import numpy as np
+from lexical_index import tokenize
+
+# Approximate tokens of retrieved text sent to the LLM; 0 (default) sends the chunks unchanged
+CONTEXT_TOKEN_BUDGET = int(os.environ.get("CONTEXT_TOKEN_BUDGET", "0"))
+# Sentences sharing at least this fraction of their words with an already selected one are dropped
+CONTEXT_REDUNDANCY = float(os.environ.get("CONTEXT_REDUNDANCY", "0.8"))
+# Weight of IDF-weighted query-term coverage next to the chunk's retrieval similarity
+CONTEXT_LEXICAL_WEIGHT = float(os.environ.get("CONTEXT_LEXICAL_WEIGHT", "0.5"))
+MIN_SENTENCE_CHARS = 20
+
+# Terminal punctuation only: PyPDF breaks lines mid-sentence, so newlines are not boundaries
+SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?])\s+")
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token for English with Llama tokenizers)."""
+    return (len(text) + 3) // 4
+
+
+def split_sentences(text: str) -> list:
+    """Split chunk text into sentences, joining wrapped lines; short fragments join the next piece."""
+    sentences, carry = [], ""
+    for piece in SENTENCE_BOUNDARY.split(text):
+        piece = " ".join(piece.split())
+        if not piece:
+            continue
+        piece = f"{carry} {piece}" if carry else piece
+        if len(piece) < MIN_SENTENCE_CHARS:
+            carry = piece
+        else:
+            sentences.append(piece)
+            carry = ""
+    if carry:
+        if sentences:
+            sentences[-1] = f"{sentences[-1]} {carry}"
+        else:
+            sentences.append(carry)
+    return sentences
+
+
+def build_context(query: str, hits: list, lexical_index=None,
+                  token_budget: int = CONTEXT_TOKEN_BUDGET) -> tuple:
+    """Compress retrieved chunks to the sentences most relevant to the query.
+
+    `hits` are the retrieval (Document, similarity_score) pairs. Nothing is
+    embedded here: a sentence scores its chunk's similarity (computed from the
+    stored chunk vector) plus its coverage of the query terms, weighted by the
+    BM25 index's IDF when given. Sentences are taken best first while they fit
+    the token budget, skipping near-repeats of sentences already taken. Kept
+    sentences stay in their chunk, in document order, so the prompt still reads
+    as excerpts. Returns (docs, usage) where usage holds the estimated token counts.
+    """
+    docs = [doc for doc, _ in hits]
+    retrieved_tokens = sum(estimate_tokens(doc.page_content) for doc in docs)
+    if token_budget <= 0 or retrieved_tokens <= token_budget:
+        return docs, {"retrieved_tokens": retrieved_tokens, "context_tokens": retrieved_tokens}
+
+    query_terms = set(tokenize(query))
+    weights = {term: lexical_index.idf(term) if lexical_index is not None else 1.0 for term in query_terms}
+    total_weight = sum(weights.values())
+
+    sentences, owners, token_sets, scores = [], [], [], []
+    for doc_index, (doc, similarity) in enumerate(hits):
+        for sentence in split_sentences(doc.page_content):
+            tokens = set(tokenize(sentence))
+            coverage = sum(weights[t] for t in query_terms & tokens) / total_weight if total_weight else 0.0
+            sentences.append(sentence)
+            owners.append(doc_index)
+            token_sets.append(tokens)
+            scores.append((similarity or 0.0) + CONTEXT_LEXICAL_WEIGHT * coverage)
+    scores = np.asarray(scores, dtype=np.float32)
+
+    selected, used = [], 0
+    for i in np.argsort(-scores, kind="stable"):
+        cost = estimate_tokens(sentences[i])
+        if used + cost > token_budget:
+            continue
+        if any(jaccard(token_sets[i], token_sets[j]) >= CONTEXT_REDUNDANCY for j in selected):
+            continue
+        selected.append(int(i))
+        used += cost
+    if not selected:
+        # Even the best sentence exceeds the budget: send it alone rather than nothing
+        selected = [int(np.argmax(scores))]
+
+    kept = {}
+    for i in sorted(selected):
+        kept.setdefault(owners[i], []).append(sentences[i])
+    # Copies keep the chunk's id and metadata; only the text is shortened
+    compressed = [
+        docs[doc_index].model_copy(update={"page_content": " ".join(kept[doc_index])})
+        for doc_index in sorted(kept)
+    ]
+    return compressed, {
+        "retrieved_tokens": retrieved_tokens,
+        "context_tokens": sum(estimate_tokens(doc.page_content) for doc in compressed),
+    }
+
+
+def jaccard(a: set, b: set) -> float:
+    return len(a & b) / len(a | b) if a or b else 1.0
@@ -0,0 +1,232 @@
+# backend/doctor_finder.py
+
+from facility_index import get_facility_index, facility_index_loaded
+from metrics import timed, STAGE_SECONDS, STAGE_ERRORS
+from geo_cache import (
+    GeoCache, normalize_location, facility_key,
+    GEOCODE_TTL, GEOCODE_STALE_TTL, GEOCODE_NEGATIVE_TTL,
+    FACILITY_TTL, FACILITY_STALE_TTL, FACILITY_NEGATIVE_TTL
+)
+import os
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+OVERPASS_URL = "https://overpass-api.de/api/interpreter"
+NOMINATIM_URL = "https://nominatim.openstreetmap.org/search"
+GEO_HEADERS = {"User-Agent": "TruthTriageHealthApp/1.0"}
+# "auto": local facility index, Overpass when it has no results; "local": never call Overpass; "overpass": live only
+FACILITY_BACKEND = os.environ.get("FACILITY_BACKEND", "auto").lower()
+
+# Nominatim / Overpass results, in memory and on disk
+geo_cache = GeoCache()
+
+# Shared async HTTP client for geo lookups (created lazily on the running event loop)
+_async_client = None
+
+
+def get_async_client() -> "httpx.AsyncClient":
+    """Return the shared httpx client used by the async geo helpers."""
+    import httpx
+    global _async_client
+    if _async_client is None or _async_client.is_closed:
+        _async_client = httpx.AsyncClient(headers=GEO_HEADERS)
+    return _async_client
+
+
+async def close_async_client():
+    """Close the shared httpx client (called on app shutdown)."""
+    global _async_client
+    if _async_client is not None:
+        await _async_client.aclose()
+        _async_client = None
+
+
+def _build_overpass_query(latitude: float, longitude: float, radius_m: int) -> str:
+    # Overpass QL: search for nodes/ways tagged as healthcare providers
+    return f"""
+    [out:json][timeout:15];
+    (
+      node["amenity"="doctors"](around:{radius_m},{latitude},{longitude});
+      node["amenity"="clinic"](around:{radius_m},{latitude},{longitude});
+      node["amenity"="hospital"](around:{radius_m},{latitude},{longitude});
+      node["healthcare"="doctor"](around:{radius_m},{latitude},{longitude});
+      node["healthcare"="clinic"](around:{radius_m},{latitude},{longitude});
+      way["amenity"="hospital"](around:{radius_m},{latitude},{longitude});
+      way["amenity"="clinic"](around:{radius_m},{latitude},{longitude});
+    );
+    out center body 15;
+    """
+
+
+def _parse_overpass_elements(elements: list, specialization: str) -> list:
+    """Convert Overpass elements into `Doctor` dicts."""
+    spec_lower = specialization.lower()
+    
+    doctors = []
+    for el in elements:
+        tags = el.get("tags", {})
+        name = tags.get("name", tags.get("operator", "Healthcare Facility"))
+        
+        # Get coordinates (center for ways)
+        lat = el.get("lat") or el.get("center", {}).get("lat")
+        lon = el.get("lon") or el.get("center", {}).get("lon")
+        
+        if not lat or not lon:
+            continue
+        
+        # Check if specialization matches any tags
+        healthcare_spec = tags.get("healthcare:speciality", "").lower()
+        tag_spec = tags.get("medical_system:speciality", "").lower()
+        
+        # Determine displayed specialization
+        if spec_lower in healthcare_spec or spec_lower in tag_spec:
+            displayed_spec = specialization
+        elif healthcare_spec:
+            displayed_spec = healthcare_spec.replace(";", ", ").title()
+        else:
+            displayed_spec = specialization
+        
+        address_parts = [
+            tags.get("addr:street", ""),
+            tags.get("addr:city", ""),
+            tags.get("addr:postcode", ""),
+        ]
+        address = ", ".join(p for p in address_parts if p) or tags.get("addr:full", "")
+        
+        doctors.append({
+            "name": name,
+            "specialization": displayed_spec,
+            "latitude": float(lat),
+            "longitude": float(lon),
+            "address": address or None,
+            "phone": tags.get("phone") or tags.get("contact:phone") or None,
+        })
+    
+    return doctors[:15]  # Limit results
+
+
+def _fetch_overpass(latitude: float, longitude: float, specialization: str, radius_m: int) -> list:
+    import requests
+    overpass_query = _build_overpass_query(latitude, longitude, radius_m)
+    response = requests.post(OVERPASS_URL, data={"data": overpass_query}, timeout=20)
+    if response.status_code != 200:
+        raise RuntimeError(f"Overpass API error: {response.status_code}")
+    return _parse_overpass_elements(response.json().get("elements", []), specialization)
+
+
+async def _afetch_overpass(latitude: float, longitude: float, specialization: str, radius_m: int) -> list:
+    overpass_query = _build_overpass_query(latitude, longitude, radius_m)
+    response = await get_async_client().post(OVERPASS_URL, data={"data": overpass_query}, timeout=20)
+    if response.status_code != 200:
+        raise RuntimeError(f"Overpass API error: {response.status_code}")
+    return _parse_overpass_elements(response.json().get("elements", []), specialization)
+
+
+@timed("local_facilities")
+def _find_doctors_local(latitude: float, longitude: float, specialization: str, radius_m: int) -> list:
+    """Search the imported offline facility index; empty if none was imported."""
+    index = get_facility_index()
+    if index is None:
+        return []
+    return _parse_overpass_elements(index.search(latitude, longitude, specialization, radius_m), specialization)
+
+
+def find_doctors_overpass(latitude: float, longitude: float, specialization: str, radius_m: int = 5000) -> list:
+    """Find doctors/clinics/hospitals near coordinates.
+    
+    Uses the local facility index when available and falls back to the
+    (cached) Overpass API, depending on FACILITY_BACKEND.
+    """
+    if FACILITY_BACKEND != "overpass":
+        doctors = _find_doctors_local(latitude, longitude, specialization, radius_m)
+        if doctors or FACILITY_BACKEND == "local":
+            return doctors
+    try:
+        with STAGE_SECONDS.labels("overpass").time():
+            return geo_cache.get_or_fetch(
+                "overpass", facility_key(latitude, longitude, radius_m, specialization),
+                lambda: _fetch_overpass(latitude, longitude, specialization, radius_m),
+                FACILITY_TTL, FACILITY_STALE_TTL, FACILITY_NEGATIVE_TTL
+            )
+    except Exception as e:
+        STAGE_ERRORS.labels("overpass").inc()
+        logger.error(f"Overpass API exception: {e}")
+        return []
+
+
+async def afind_doctors_overpass(latitude: float, longitude: float, specialization: str, radius_m: int = 5000) -> list:
+    """Async variant of `find_doctors_overpass` that does not block the event loop."""
+    if FACILITY_BACKEND != "overpass":
+        if facility_index_loaded():
+            # In-process grid lookup: fast enough to run on the event loop
+            doctors = _find_doctors_local(latitude, longitude, specialization, radius_m)
+        else:
+            # First use parses the facility file; keep that off the event loop
+            doctors = await asyncio.to_thread(_find_doctors_local, latitude, longitude, specialization, radius_m)
+        if doctors or FACILITY_BACKEND == "local":
+            return doctors
+    try:
+        with STAGE_SECONDS.labels("overpass").time():
+            return await geo_cache.aget_or_fetch(
+                "overpass", facility_key(latitude, longitude, radius_m, specialization),
+                lambda: _afetch_overpass(latitude, longitude, specialization, radius_m),
+                FACILITY_TTL, FACILITY_STALE_TTL, FACILITY_NEGATIVE_TTL
+            )
+    except Exception as e:
+        STAGE_ERRORS.labels("overpass").inc()
+        logger.error(f"Overpass API exception: {e}")
+        return []
+
+
+def _fetch_geocode(location: str):
+    import requests
+    params = {"q": location, "format": "json", "limit": 1}
+    response = requests.get(NOMINATIM_URL, params=params, headers=GEO_HEADERS, timeout=10)
+    if response.status_code != 200:
+        raise RuntimeError(f"Nominatim error: {response.status_code}")
+    data = response.json()
+    # Unknown places are cached briefly ([None, None], GEOCODE_NEGATIVE_TTL) so typos don't re-hit Nominatim
+    return [float(data[0]["lat"]), float(data[0]["lon"])] if data else [None, None]
+
+
+async def _afetch_geocode(location: str):
+    params = {"q": location, "format": "json", "limit": 1}
+    response = await get_async_client().get(NOMINATIM_URL, params=params, timeout=10)
+    if response.status_code != 200:
+        raise RuntimeError(f"Nominatim error: {response.status_code}")
+    data = response.json()
+    return [float(data[0]["lat"]), float(data[0]["lon"])] if data else [None, None]
+
+
+@timed("geocode")
+def geocode_location(location: str) -> tuple:
+    """Geocode a location name to (lat, lng) using Nominatim (cached)."""
+    try:
+        lat, lon = geo_cache.get_or_fetch(
+            "geocode", normalize_location(location),
+            lambda: _fetch_geocode(location),
+            GEOCODE_TTL, GEOCODE_STALE_TTL, GEOCODE_NEGATIVE_TTL
+        )
+        return lat, lon
+    except Exception as e:
+        STAGE_ERRORS.labels("geocode").inc()
+        logger.error(f"Geocoding error: {e}")
+    return None, None
+
+
+@timed("geocode")
+async def ageocode_location(location: str) -> tuple:
+    """Async variant of `geocode_location`."""
+    try:
+        lat, lon = await geo_cache.aget_or_fetch(
+            "geocode", normalize_location(location),
+            lambda: _afetch_geocode(location),
+            GEOCODE_TTL, GEOCODE_STALE_TTL, GEOCODE_NEGATIVE_TTL
+        )
+        return lat, lon
+    except Exception as e:
+        STAGE_ERRORS.labels("geocode").inc()
+        logger.error(f"Geocoding error: {e}")
+    return None, None
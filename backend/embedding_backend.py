@@ -0,0 +1,252 @@
+# backend/embedding_backend.py
+
+# Selectable embedding backend. "torch" is sentence-transformers via
+# HuggingFaceEmbeddings; "onnx" (experimental) runs an exported, int8-quantized
+# copy of the same model through ONNX Runtime, without importing torch. Its
+# parity and speed against torch have not been measured yet; run the export
+# (which writes parity.json) and `benchmarks/run_benchmarks.py --embeddings onnx`
+# before relying on it.
+#
+# Export the ONNX model once, with torch / transformers / onnx installed:
+#   python embedding_backend.py export          # writes models/all-MiniLM-L6-v2-onnx/
+#
+# The export checks the int8 vectors against the torch ones. If the parity check
+# passed, an index built with either backend is reused by the other; if it did
+# not, the ONNX backend gets its own index key and the index is rebuilt.
+
+import os
+import json
+import logging
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# "torch" (sentence-transformers) or "onnx" (ONNX Runtime, int8)
+EMBEDDING_BACKEND = os.environ.get("EMBEDDING_BACKEND", "torch").lower()
+ONNX_MODEL_DIR = os.path.abspath(os.environ.get(
+    "ONNX_MODEL_DIR", os.path.join(BASE_DIR, "..", "models", "all-MiniLM-L6-v2-onnx")
+))
+# Intra-op threads per inference; 0 lets ONNX Runtime use every physical core
+ONNX_THREADS = int(os.environ.get("ONNX_THREADS", "0"))
+ONNX_BATCH_SIZE = int(os.environ.get("ONNX_BATCH_SIZE", "64"))
+# Minimum cosine between ONNX and torch vectors for the two to share an index
+EMBEDDING_PARITY_MIN = float(os.environ.get("EMBEDDING_PARITY_MIN", "0.99"))
+# all-MiniLM-L6-v2's sentence-transformers max_seq_length
+MAX_SEQ_LENGTH = 256
+
+MODEL_FILE = "model_int8.onnx"
+TOKENIZER_FILE = "tokenizer.json"
+PARITY_FILE = "parity.json"
+
+PARITY_QUERIES = [
+    "What is paracetamol used for?",
+    "Side effects of ibuprofen",
+    "Can I take amoxicillin during pregnancy?",
+    "Metformin dose for type 2 diabetes",
+    "Warfarin interaction with aspirin",
+    "Salbutamol inhaler for asthma attack",
+]
+
+
+def hub_name(model_name: str) -> str:
+    return model_name if "/" in model_name else f"sentence-transformers/{model_name}"
+
+
+class OnnxEmbeddings(Embeddings):
+    """LangChain-compatible embeddings from an int8 ONNX export of a sentence-transformers model.
+
+    Mean-pools the last hidden state over the attention mask and L2-normalizes,
+    matching `HuggingFaceEmbeddings(encode_kwargs={"normalize_embeddings": True})`.
+    Texts are sorted by length before batching so short queries aren't padded
+    to the longest chunk.
+    """
+
+    def __init__(self, model_dir: str = ONNX_MODEL_DIR, threads: int = ONNX_THREADS,
+                 batch_size: int = ONNX_BATCH_SIZE, max_length: int = MAX_SEQ_LENGTH):
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        model_path = os.path.join(model_dir, MODEL_FILE)
+        if not os.path.exists(model_path):
+            raise FileNotFoundError(
+                f"ONNX model not found at {model_path}; run `python embedding_backend.py export`"
+            )
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = threads
+        options.inter_op_num_threads = 1
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        # InferenceSession.run is thread-safe, so one session serves every executor thread
+        self.session = ort.InferenceSession(model_path, options, providers=["CPUExecutionProvider"])
+        self.input_names = {i.name for i in self.session.get_inputs()}
+
+        self.tokenizer = Tokenizer.from_file(os.path.join(model_dir, TOKENIZER_FILE))
+        self.tokenizer.enable_truncation(max_length=max_length)
+        self.tokenizer.enable_padding(pad_id=0, pad_token="[PAD]")
+        self.batch_size = batch_size
+        self.model_dir = model_dir
+        self.threads = threads
+
+    def _embed_batch(self, texts: list) -> np.ndarray:
+        encodings = self.tokenizer.encode_batch(texts)
+        input_ids = np.array([e.ids for e in encodings], dtype=np.int64)
+        attention_mask = np.array([e.attention_mask for e in encodings], dtype=np.int64)
+        feeds = {"input_ids": input_ids, "attention_mask": attention_mask}
+        if "token_type_ids" in self.input_names:
+            feeds["token_type_ids"] = np.array([e.type_ids for e in encodings], dtype=np.int64)
+
+        hidden = self.session.run(None, feeds)[0]
+        mask = attention_mask[:, :, None].astype(np.float32)
+        pooled = (hidden * mask).sum(axis=1) / np.maximum(mask.sum(axis=1), 1e-9)
+        return pooled / np.maximum(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12)
+
+    def embed_array(self, texts: list) -> np.ndarray:
+        """Embed texts into a (len(texts), dim) float32 array, in input order."""
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        vectors = None
+        for start in range(0, len(order), self.batch_size):
+            batch = order[start:start + self.batch_size]
+            embedded = self._embed_batch([texts[i] for i in batch])
+            if vectors is None:
+                vectors = np.empty((len(texts), embedded.shape[1]), dtype=np.float32)
+            vectors[batch] = embedded
+        return vectors if vectors is not None else np.empty((0, 0), dtype=np.float32)
+
+    def embed_documents(self, texts: list) -> list:
+        return self.embed_array(list(texts)).tolist()
+
+    def embed_query(self, text: str) -> list:
+        return self._embed_batch([text])[0].tolist()
+
+
+def read_parity(model_dir: str = ONNX_MODEL_DIR) -> dict:
+    """Parity report written by `export`, or None if the model was never checked."""
+    try:
+        with open(os.path.join(model_dir, PARITY_FILE), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def load_embeddings(model_name: str, backend: str = EMBEDDING_BACKEND) -> tuple:
+    """Create the configured embeddings.
+
+    Returns (embeddings, index_key, info): `index_key` is the manifest's
+    `embedding_model`, which decides whether a persisted index can be reused,
+    and `info` (backend, threads, parity) is recorded in the manifest.
+    """
+    if backend == "onnx":
+        embeddings = OnnxEmbeddings()
+        parity = read_parity()
+        compatible = (
+            parity is not None
+            and parity.get("model") == hub_name(model_name)
+            and parity.get("min_cosine", 0.0) >= EMBEDDING_PARITY_MIN
+        )
+        if compatible:
+            index_key = model_name
+        else:
+            index_key = f"{model_name}+onnx-int8"
+            logger.warning(
+                f"ONNX embeddings have no passing parity check against {model_name} "
+                f"(min cosine >= {EMBEDDING_PARITY_MIN}); they get a separate index, which is rebuilt"
+            )
+        logger.info(f"Loaded ONNX embeddings from {embeddings.model_dir} ({ONNX_THREADS or 'all'} threads)")
+        return embeddings, index_key, {"backend": "onnx", "threads": ONNX_THREADS, "parity": parity}
+
+    if backend != "torch":
+        raise ValueError(f"Unknown EMBEDDING_BACKEND: {backend}")
+    from langchain_community.embeddings import HuggingFaceEmbeddings
+    embeddings = HuggingFaceEmbeddings(model_name=model_name, encode_kwargs={"normalize_embeddings": True})
+    return embeddings, model_name, {"backend": "torch"}
+
+
+# ─── Export + Parity Check ────────────────────────────────────────────────────
+
+def export_model(model_name: str, out_dir: str = ONNX_MODEL_DIR, opset: int = 14) -> str:
+    """Export the transformer to ONNX and quantize its weights to int8 (dynamic quantization)."""
+    import torch
+    from transformers import AutoModel, AutoTokenizer
+    from onnxruntime.quantization import quantize_dynamic, QuantType
+
+    os.makedirs(out_dir, exist_ok=True)
+    tokenizer = AutoTokenizer.from_pretrained(hub_name(model_name))
+    model = AutoModel.from_pretrained(hub_name(model_name)).eval()
+    tokenizer.save_pretrained(out_dir)   # writes tokenizer.json for the `tokenizers` runtime
+
+    sample = tokenizer(["export sample"], return_tensors="pt")
+    fp32_path = os.path.join(out_dir, "model_fp32.onnx")
+    dynamic = {0: "batch", 1: "sequence"}
+    with torch.no_grad():
+        torch.onnx.export(
+            model,
+            (sample["input_ids"], sample["attention_mask"], sample["token_type_ids"]),
+            fp32_path,
+            input_names=["input_ids", "attention_mask", "token_type_ids"],
+            output_names=["last_hidden_state"],
+            dynamic_axes={"input_ids": dynamic, "attention_mask": dynamic,
+                          "token_type_ids": dynamic, "last_hidden_state": dynamic},
+            opset_version=opset,
+        )
+    int8_path = os.path.join(out_dir, MODEL_FILE)
+    quantize_dynamic(fp32_path, int8_path, weight_type=QuantType.QInt8)
+    os.remove(fp32_path)
+    logger.info(f"Exported {hub_name(model_name)} to {int8_path}")
+    return int8_path
+
+
+def parity_sentences(limit: int = 256) -> list:
+    """Chunks from the indexed PDFs (plus typical queries) to compare vectors on."""
+    import glob
+    from index_store import DATA_DIR, load_and_split_pdf
+    sentences = list(PARITY_QUERIES)
+    for pdf_path in sorted(glob.glob(os.path.join(DATA_DIR, "*.pdf"))):
+        try:
+            _, docs = load_and_split_pdf(pdf_path)
+        except Exception as e:
+            logger.warning(f"Skipping {pdf_path} for parity check: {e}")
+            continue
+        step = max(1, len(docs) // 64)
+        sentences.extend(doc.page_content for doc in docs[::step])
+        if len(sentences) >= limit:
+            break
+    return sentences[:limit]
+
+
+def check_parity(model_name: str, model_dir: str = ONNX_MODEL_DIR, sentences: list = None) -> dict:
+    """Compare ONNX vectors with sentence-transformers vectors and write `parity.json`."""
+    from sentence_transformers import SentenceTransformer
+
+    sentences = sentences or parity_sentences()
+    reference = SentenceTransformer(model_name, device="cpu").encode(
+        sentences, normalize_embeddings=True, convert_to_numpy=True
+    )
+    candidate = OnnxEmbeddings(model_dir).embed_array(sentences)
+    cosines = (reference * candidate).sum(axis=1)
+    report = {
+        "model": hub_name(model_name),
+        "quantization": "int8-dynamic",
+        "samples": len(sentences),
+        "min_cosine": round(float(cosines.min()), 5),
+        "mean_cosine": round(float(cosines.mean()), 5),
+        "threshold": EMBEDDING_PARITY_MIN,
+        "passed": bool(cosines.min() >= EMBEDDING_PARITY_MIN),
+    }
+    with open(os.path.join(model_dir, PARITY_FILE), "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    return report
+
+
+if __name__ == "__main__":
+    import argparse
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Export and check the ONNX embedding model")
+    parser.add_argument("command", choices=["export", "parity"])
+    parser.add_argument("--model", default="all-MiniLM-L6-v2")
+    parser.add_argument("--out", default=ONNX_MODEL_DIR)
+    args = parser.parse_args()
+    if args.command == "export":
+        export_model(args.model, args.out)
+    print(json.dumps(check_parity(args.model, args.out), indent=2))
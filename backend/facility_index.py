@@ -0,0 +1,251 @@
+# backend/facility_index.py
+
+import os
+import bz2
+import csv
+import gzip
+import math
+import argparse
+import threading
+import logging
+import xml.etree.ElementTree as ET
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+FACILITY_INDEX_PATH = os.path.abspath(os.environ.get(
+    "FACILITY_INDEX_PATH", os.path.join(BASE_DIR, "..", "data", "facilities.csv")
+))
+
+# OSM tags kept per facility; the same tags the Overpass parser reads
+FACILITY_TAGS = [
+    "name", "operator", "amenity", "healthcare",
+    "healthcare:speciality", "medical_system:speciality",
+    "addr:street", "addr:city", "addr:postcode", "addr:full",
+    "phone", "contact:phone",
+]
+HEALTHCARE_AMENITIES = {"doctors", "clinic", "hospital"}
+HEALTHCARE_TYPES = {"doctor", "clinic", "hospital"}
+
+EARTH_RADIUS_M = 6371000.0
+METERS_PER_DEGREE = 111320.0
+# Grid cell edge in degrees (~5.5 km at the equator), sized for the default 5 km radius
+GRID_CELL_DEG = 0.05
+
+
+def is_healthcare(tags: dict) -> bool:
+    return tags.get("amenity") in HEALTHCARE_AMENITIES or tags.get("healthcare") in HEALTHCARE_TYPES
+
+
+def _open_extract(path: str):
+    if path.endswith(".bz2"):
+        return bz2.open(path, "rb")
+    if path.endswith(".gz"):
+        return gzip.open(path, "rb")
+    return open(path, "rb")
+
+
+def _iter_osm_elements(path: str):
+    """Stream the top-level node / way / relation elements of an OSM XML extract.
+
+    Each element is detached from the document root once the caller has
+    processed it; `elem.clear()` alone would leave an empty element per node
+    attached to the root, which grows with the extract.
+    """
+    with _open_extract(path) as f:
+        root = None
+        for event, elem in ET.iterparse(f, events=("start", "end")):
+            if root is None:
+                root = elem
+            elif event == "end" and elem.tag in ("node", "way", "relation"):
+                yield elem
+                root.clear()
+
+
+def _iter_osm_xml(path: str):
+    """Yield (lat, lon, tags) for healthcare nodes and ways in an OSM XML extract.
+
+    Two streaming passes: the first collects healthcare nodes and the node ids
+    referenced by healthcare ways, the second resolves those ids so each way
+    can be placed at the centre of its nodes (like Overpass `out center`).
+    """
+    way_refs = {}
+    wanted_nodes = set()
+    for elem in _iter_osm_elements(path):
+        if elem.tag == "node":
+            tags = {t.get("k"): t.get("v") for t in elem.iter("tag")}
+            if tags and is_healthcare(tags):
+                yield float(elem.get("lat")), float(elem.get("lon")), tags
+        elif elem.tag == "way":
+            tags = {t.get("k"): t.get("v") for t in elem.iter("tag")}
+            if is_healthcare(tags):
+                refs = [nd.get("ref") for nd in elem.iter("nd")]
+                way_refs[elem.get("id")] = (refs, tags)
+                wanted_nodes.update(refs)
+
+    if not way_refs:
+        return
+
+    coords = {}
+    for elem in _iter_osm_elements(path):
+        if elem.tag == "node" and elem.get("id") in wanted_nodes:
+            coords[elem.get("id")] = (float(elem.get("lat")), float(elem.get("lon")))
+
+    for refs, tags in way_refs.values():
+        points = [coords[ref] for ref in refs if ref in coords]
+        if points:
+            yield (sum(p[0] for p in points) / len(points),
+                   sum(p[1] for p in points) / len(points), tags)
+
+
+def _iter_csv(path: str):
+    """Yield (lat, lon, tags) from a CSV with lat/lon (or latitude/longitude) columns."""
+    with open(path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            lat = row.get("lat") or row.get("latitude")
+            lon = row.get("lon") or row.get("longitude")
+            if not lat or not lon:
+                continue
+            tags = {k: v for k, v in row.items() if k in FACILITY_TAGS and v}
+            yield float(lat), float(lon), tags
+
+
+def import_facilities(source_path: str, out_path: str = FACILITY_INDEX_PATH) -> int:
+    """Convert an OSM XML extract (.osm, .osm.bz2, .osm.gz) or CSV into the local facility file."""
+    if source_path.endswith(".csv"):
+        rows = _iter_csv(source_path)
+    else:
+        rows = _iter_osm_xml(source_path)
+
+    os.makedirs(os.path.dirname(os.path.abspath(out_path)), exist_ok=True)
+    tmp_path = out_path + ".tmp"
+    count = 0
+    with open(tmp_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["lat", "lon"] + FACILITY_TAGS)
+        for lat, lon, tags in rows:
+            writer.writerow([lat, lon] + [tags.get(tag, "") for tag in FACILITY_TAGS])
+            count += 1
+    os.replace(tmp_path, out_path)
+    logger.info(f"Imported {count} healthcare facilities into {out_path}")
+    return count
+
+
+class FacilityIndex:
+    """In-memory spatial index over imported facilities.
+
+    Facilities are bucketed into a lat/lon grid; a radius query only visits the
+    cells overlapping the search box and computes haversine distances for
+    those candidates in one vectorized pass.
+    """
+
+    def __init__(self, lats: np.ndarray, lons: np.ndarray, tags: list, cell_deg: float = GRID_CELL_DEG):
+        self.lats = lats
+        self.lons = lons
+        self.tags = tags
+        self.cell_deg = cell_deg
+        cells = {}
+        for i, (lat, lon) in enumerate(zip(lats, lons)):
+            cells.setdefault(self._cell(lat, lon), []).append(i)
+        self.cells = {cell: np.array(ids, dtype=np.int64) for cell, ids in cells.items()}
+
+    def __len__(self):
+        return len(self.tags)
+
+    def _cell(self, lat: float, lon: float) -> tuple:
+        return int(math.floor(lat / self.cell_deg)), int(math.floor(lon / self.cell_deg))
+
+    @classmethod
+    def load(cls, path: str = FACILITY_INDEX_PATH):
+        lats, lons, tags = [], [], []
+        for lat, lon, row_tags in _iter_csv(path):
+            lats.append(lat)
+            lons.append(lon)
+            tags.append(row_tags)
+        logger.info(f"Loaded {len(tags)} facilities from {path}")
+        return cls(np.array(lats, dtype=np.float64), np.array(lons, dtype=np.float64), tags)
+
+    def search(self, latitude: float, longitude: float, specialization: str,
+               radius_m: int = 5000, limit: int = 15) -> list:
+        """Facilities within `radius_m`, specialization matches first, then nearest.
+
+        Returns Overpass-shaped elements (`lat`, `lon`, `tags`, `distance_m`).
+        """
+        lat_span = radius_m / METERS_PER_DEGREE
+        lon_span = radius_m / (METERS_PER_DEGREE * max(math.cos(math.radians(latitude)), 1e-6))
+        min_cell = self._cell(latitude - lat_span, longitude - lon_span)
+        max_cell = self._cell(latitude + lat_span, longitude + lon_span)
+
+        buckets = [
+            self.cells[(i, j)]
+            for i in range(min_cell[0], max_cell[0] + 1)
+            for j in range(min_cell[1], max_cell[1] + 1)
+            if (i, j) in self.cells
+        ]
+        if not buckets:
+            return []
+        candidates = np.concatenate(buckets)
+
+        # Haversine distance to every candidate at once
+        lat1, lon1 = math.radians(latitude), math.radians(longitude)
+        lat2, lon2 = np.radians(self.lats[candidates]), np.radians(self.lons[candidates])
+        a = (np.sin((lat2 - lat1) / 2) ** 2
+             + math.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2)
+        distances = 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(a))
+
+        within = distances <= radius_m
+        candidates, distances = candidates[within], distances[within]
+
+        spec_lower = specialization.lower()
+        ranked = sorted(
+            zip(candidates.tolist(), distances.tolist()),
+            key=lambda item: (not self._matches(item[0], spec_lower), item[1])
+        )
+        return [
+            {"lat": float(self.lats[i]), "lon": float(self.lons[i]), "tags": self.tags[i], "distance_m": round(d)}
+            for i, d in ranked[:limit]
+        ]
+
+    def _matches(self, i: int, spec_lower: str) -> bool:
+        tags = self.tags[i]
+        return (spec_lower in tags.get("healthcare:speciality", "").lower()
+                or spec_lower in tags.get("medical_system:speciality", "").lower())
+
+
+_facility_index = None
+_facility_index_loaded = False
+_facility_index_lock = threading.Lock()
+
+
+def get_facility_index():
+    """Lazily load the local facility index; None when no facilities were imported.
+
+    The first call parses the whole facility file; call it off the event loop
+    (see `facility_index_loaded`).
+    """
+    global _facility_index, _facility_index_loaded
+    if not _facility_index_loaded:
+        with _facility_index_lock:
+            if not _facility_index_loaded:
+                if os.path.exists(FACILITY_INDEX_PATH):
+                    try:
+                        _facility_index = FacilityIndex.load(FACILITY_INDEX_PATH)
+                    except Exception as e:
+                        logger.error(f"Failed to load facility index: {e}")
+                _facility_index_loaded = True
+    return _facility_index
+
+
+def facility_index_loaded() -> bool:
+    """Whether `get_facility_index` has already loaded (or ruled out) the index, so it won't block."""
+    return _facility_index_loaded
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Import healthcare facilities for offline doctor search")
+    parser.add_argument("source", help="OSM XML extract (.osm/.osm.bz2/.osm.gz) or CSV with lat/lon columns")
+    parser.add_argument("--out", default=FACILITY_INDEX_PATH, help="Output facility file")
+    args = parser.parse_args()
+    import_facilities(args.source, args.out)
@@ -0,0 +1,76 @@
+# backend/formulary.py
+
+from keyword_matcher import KeywordMatcher
+import os
+import csv
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+# Optional CSV with `name` and `canonical` columns (brand names / synonyms -> generic name)
+FORMULARY_PATH = os.path.abspath(os.environ.get(
+    "FORMULARY_PATH", os.path.join(BASE_DIR, "..", "data", "formulary.csv")
+))
+
+# Known common medicine names to look for in source text
+KNOWN_MEDICINES = [
+    'paracetamol', 'acetaminophen', 'aspirin', 'ibuprofen', 'naproxen',
+    'diclofenac', 'warfarin', 'heparin', 'metformin', 'insulin',
+    'amoxicillin', 'azithromycin', 'ciprofloxacin', 'doxycycline',
+    'metronidazole', 'cephalexin', 'penicillin', 'erythromycin',
+    'omeprazole', 'pantoprazole', 'ranitidine', 'famotidine',
+    'atorvastatin', 'rosuvastatin', 'simvastatin', 'losartan',
+    'amlodipine', 'enalapril', 'lisinopril', 'ramipril', 'metoprolol',
+    'atenolol', 'propranolol', 'carvedilol', 'hydrochlorothiazide',
+    'furosemide', 'spironolactone', 'prednisolone', 'prednisone',
+    'dexamethasone', 'hydrocortisone', 'salbutamol', 'albuterol',
+    'montelukast', 'fluticasone', 'cetirizine', 'loratadine',
+    'fexofenadine', 'chlorpheniramine', 'morphine', 'codeine', 'tramadol',
+    'fentanyl', 'diazepam', 'lorazepam', 'alprazolam', 'clonazepam',
+    'sertraline', 'fluoxetine', 'escitalopram', 'paroxetine', 'gabapentin',
+    'pregabalin', 'carbamazepine', 'valproate', 'phenytoin',
+    'levetiracetam', 'lamotrigine', 'levothyroxine', 'carbimazole',
+    'propylthiouracil', 'clopidogrel', 'ticagrelor', 'rivaroxaban',
+    'apixaban', 'enoxaparin', 'dabigatran', 'methotrexate',
+    'hydroxychloroquine', 'sulfasalazine', 'cyclophosphamide',
+    'azathioprine', 'tacrolimus', 'cyclosporine', 'mycophenolate',
+    'levofloxacin', 'moxifloxacin', 'fluconazole', 'ketoconazole',
+    'clotrimazole', 'acyclovir', 'oseltamivir', 'tenofovir', 'zidovudine',
+    'artemether', 'lumefantrine', 'chloroquine', 'quinine', 'albendazole',
+    'mebendazole', 'ivermectin', 'praziquantel', 'ondansetron',
+    'domperidone', 'metoclopramide', 'loperamide', 'digoxin', 'amiodarone',
+    'verapamil', 'diltiazem', 'nitroglycerin', 'isosorbide', 'nifedipine',
+    'telmisartan', 'glimepiride', 'glipizide', 'gliclazide',
+    'pioglitazone', 'sitagliptin', 'vildagliptin', 'empagliflozin',
+    'dapagliflozin', 'vitamin', 'calcium', 'iron', 'folic acid', 'zinc',
+]
+
+
+def load_formulary(path: str = FORMULARY_PATH) -> dict:
+    """Map every known drug name / synonym (lowercase) to its canonical name."""
+    names = {name: name for name in KNOWN_MEDICINES}
+    if not os.path.exists(path):
+        return names
+    with open(path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            name = (row.get("name") or "").strip().lower()
+            if name:
+                names[name] = (row.get("canonical") or name).strip().lower()
+    logger.info(f"Loaded formulary with {len(names)} names from {path}")
+    return names
+
+
+_medicine_matcher = None
+_medicine_matcher_lock = threading.Lock()
+
+
+def get_medicine_matcher() -> KeywordMatcher:
+    """Formulary compiled into a single matcher, built once on first use."""
+    global _medicine_matcher
+    if _medicine_matcher is None:
+        with _medicine_matcher_lock:
+            if _medicine_matcher is None:
+                _medicine_matcher = KeywordMatcher(load_formulary(), plurals=True)
+    return _medicine_matcher
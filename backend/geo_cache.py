@@ -0,0 +1,198 @@
+# backend/geo_cache.py
+
+from collections import OrderedDict
+import os
+import json
+import time
+import sqlite3
+import asyncio
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+GEO_CACHE_PATH = os.environ.get("GEO_CACHE_PATH", os.path.join(BASE_DIR, "..", "cache", "geo_cache.sqlite"))
+GEO_CACHE_SIZE = int(os.environ.get("GEO_CACHE_SIZE", "512"))
+
+# Fresh lifetime, then how much longer a stale value may be served while it is refreshed
+GEOCODE_TTL = float(os.environ.get("GEOCODE_TTL", str(30 * 86400)))
+GEOCODE_STALE_TTL = float(os.environ.get("GEOCODE_STALE_TTL", str(90 * 86400)))
+FACILITY_TTL = float(os.environ.get("FACILITY_TTL", str(86400)))
+FACILITY_STALE_TTL = float(os.environ.get("FACILITY_STALE_TTL", str(7 * 86400)))
+# Unknown places and empty facility results: short-lived and never served stale,
+# so a transient empty answer or a newly mapped place is retried soon
+GEOCODE_NEGATIVE_TTL = float(os.environ.get("GEOCODE_NEGATIVE_TTL", str(3600)))
+FACILITY_NEGATIVE_TTL = float(os.environ.get("FACILITY_NEGATIVE_TTL", str(3600)))
+
+FRESH = "fresh"
+STALE = "stale"
+
+
+def normalize_location(location: str) -> str:
+    """Cache key for a free-text location: case- and whitespace-insensitive."""
+    return " ".join(location.lower().replace(",", " ").split())
+
+
+def is_negative(value) -> bool:
+    """Empty results: no facilities ([]) or an unknown place ([None, None])."""
+    return value is None or (isinstance(value, list) and all(v is None for v in value))
+
+
+def facility_key(latitude: float, longitude: float, radius_m: int, specialization: str) -> str:
+    """Cache key for a facility search; ~110 m grid so nearby geocodes share results."""
+    return f"{round(latitude, 3)}:{round(longitude, 3)}:{radius_m}:{specialization.lower()}"
+
+
+class GeoCache:
+    """Two-level cache for Nominatim / Overpass results.
+
+    Level 1 is an in-process LRU, level 2 a SQLite file shared by workers and
+    restarts. Values past their TTL but within the stale window are returned
+    immediately while a single background refresh replaces them.
+    """
+
+    def __init__(self, path: str = GEO_CACHE_PATH, max_size: int = GEO_CACHE_SIZE):
+        self.path = path
+        self.max_size = max_size
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self._memory = OrderedDict()   # (namespace, key) -> (fresh_until, stale_until, value)
+        self._lock = threading.Lock()
+        self._refreshing = set()
+        self._tasks = set()
+        self._db = None
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS geo_cache ("
+                "namespace TEXT, key TEXT, value TEXT, fresh_until REAL, stale_until REAL, "
+                "PRIMARY KEY (namespace, key))"
+            )
+        except sqlite3.Error as e:
+            logger.warning(f"Geo cache disk store unavailable, using memory only: {e}")
+            self._db = None
+
+    def _remember_locked(self, cache_key: tuple, entry: tuple):
+        self._memory[cache_key] = entry
+        self._memory.move_to_end(cache_key)
+        while len(self._memory) > self.max_size:
+            self._memory.popitem(last=False)
+
+    def get(self, namespace: str, key: str) -> tuple:
+        """Return (value, FRESH | STALE | None)."""
+        now = time.time()
+        cache_key = (namespace, key)
+        with self._lock:
+            entry = self._memory.get(cache_key)
+            if entry is None and self._db is not None:
+                row = self._db.execute(
+                    "SELECT fresh_until, stale_until, value FROM geo_cache WHERE namespace = ? AND key = ?",
+                    cache_key,
+                ).fetchone()
+                if row is not None:
+                    entry = (row[0], row[1], json.loads(row[2]))
+                    self._remember_locked(cache_key, entry)
+            elif entry is not None:
+                self._memory.move_to_end(cache_key)
+
+            if entry is None or entry[1] < now:
+                self.misses += 1
+                return None, None
+            if entry[0] < now:
+                self.stale_hits += 1
+                return entry[2], STALE
+            self.hits += 1
+            return entry[2], FRESH
+
+    def set(self, namespace: str, key: str, value, ttl: float, stale_ttl: float):
+        now = time.time()
+        entry = (now + ttl, now + ttl + stale_ttl, value)
+        with self._lock:
+            self._remember_locked((namespace, key), entry)
+            if self._db is not None:
+                try:
+                    self._db.execute(
+                        "INSERT OR REPLACE INTO geo_cache VALUES (?, ?, ?, ?, ?)",
+                        (namespace, key, json.dumps(value), entry[0], entry[1]),
+                    )
+                except sqlite3.Error as e:
+                    logger.warning(f"Geo cache write failed: {e}")
+
+    def _store(self, namespace: str, key: str, value, ttl: float, stale_ttl: float, negative_ttl: float):
+        """`set` with the negative TTL (and no stale window) for empty results."""
+        if negative_ttl is not None and is_negative(value):
+            ttl, stale_ttl = negative_ttl, 0.0
+        self.set(namespace, key, value, ttl, stale_ttl)
+
+    def _claim_refresh(self, cache_key: tuple) -> bool:
+        with self._lock:
+            if cache_key in self._refreshing:
+                return False
+            self._refreshing.add(cache_key)
+            return True
+
+    def _refresh(self, namespace: str, key: str, fetch, ttl: float, stale_ttl: float, negative_ttl: float):
+        try:
+            self._store(namespace, key, fetch(), ttl, stale_ttl, negative_ttl)
+        except Exception as e:
+            logger.warning(f"Background refresh of {namespace}:{key} failed: {e}")
+        finally:
+            with self._lock:
+                self._refreshing.discard((namespace, key))
+
+    async def _arefresh(self, namespace: str, key: str, afetch, ttl: float, stale_ttl: float, negative_ttl: float):
+        try:
+            self._store(namespace, key, await afetch(), ttl, stale_ttl, negative_ttl)
+        except Exception as e:
+            logger.warning(f"Background refresh of {namespace}:{key} failed: {e}")
+        finally:
+            with self._lock:
+                self._refreshing.discard((namespace, key))
+
+    def get_or_fetch(self, namespace: str, key: str, fetch, ttl: float, stale_ttl: float,
+                     negative_ttl: float = None):
+        """Cached `fetch()`; errors from `fetch` propagate and are never cached.
+        Empty results are kept for `negative_ttl` instead, when given."""
+        value, state = self.get(namespace, key)
+        if state == STALE and self._claim_refresh((namespace, key)):
+            threading.Thread(
+                target=self._refresh, args=(namespace, key, fetch, ttl, stale_ttl, negative_ttl), daemon=True
+            ).start()
+        if state is not None:
+            return value
+
+        value = fetch()
+        self._store(namespace, key, value, ttl, stale_ttl, negative_ttl)
+        return value
+
+    async def aget_or_fetch(self, namespace: str, key: str, afetch, ttl: float, stale_ttl: float,
+                            negative_ttl: float = None):
+        """Async `get_or_fetch`; stale values are refreshed in a background task."""
+        value, state = self.get(namespace, key)
+        if state == STALE and self._claim_refresh((namespace, key)):
+            task = asyncio.get_running_loop().create_task(
+                self._arefresh(namespace, key, afetch, ttl, stale_ttl, negative_ttl)
+            )
+            # Keep a reference so the task isn't garbage-collected mid-flight
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        if state is not None:
+            return value
+
+        value = await afetch()
+        self._store(namespace, key, value, ttl, stale_ttl, negative_ttl)
+        return value
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "size": len(self._memory),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "stale_hits": self.stale_hits,
+                "misses": self.misses,
+            }
@@ -0,0 +1,554 @@
+# backend/index_store.py
+
+from langchain_community.document_loaders import PyPDFLoader
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+from langchain_community.vectorstores import FAISS
+from langchain_community.docstore.in_memory import InMemoryDocstore
+import os
+import glob
+import json
+import hashlib
+import shutil
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from lexical_index import BM25Index
+from ann_index import (
+    index_config, index_plan, needs_retrain, build_index, configure_search, supports_sequential_remove
+)
+from chunk_dedup import DEDUP_CHUNKS, ChunkDeduplicator, dedup_config, provenance
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.abspath(os.environ.get("DATA_DIR", os.path.join(BASE_DIR, "..", "data")))
+INDEX_DIR = os.path.abspath(os.environ.get("INDEX_DIR", os.path.join(BASE_DIR, "..", "index")))
+
+MANIFEST_VERSION = 1
+# FAISS index, pickles and manifest live together in <INDEX_DIR>/store/, replaced as a unit
+STORE_DIR_NAME = "store"
+MANIFEST_NAME = "manifest.json"
+LEXICAL_INDEX_NAME = "bm25.pkl"
+DEDUP_INDEX_NAME = "dedup.pkl"
+CHUNK_SIZE = 1000
+CHUNK_OVERLAP = 100
+# Processes used to parse/split PDFs, and chunks embedded per model call
+INGEST_WORKERS = int(os.environ.get("INGEST_WORKERS", str(os.cpu_count() or 1)))
+EMBED_BATCH_SIZE = int(os.environ.get("EMBED_BATCH_SIZE", "256"))
+
+
+def file_sha256(path: str) -> str:
+    """Hash a file's contents in 1 MB blocks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def load_and_split_pdf(pdf_path: str) -> tuple:
+    """Parse one PDF and split its pages into chunks. Returns (page_count, chunks)."""
+    pages = PyPDFLoader(pdf_path).load()
+    text_splitter = RecursiveCharacterTextSplitter(
+        chunk_size=CHUNK_SIZE,
+        chunk_overlap=CHUNK_OVERLAP
+    )
+    return len(pages), text_splitter.split_documents(pages)
+
+
+def _load_and_split_safely(pdf_path: str) -> tuple:
+    """Process-pool entry point: never raises, so one bad PDF can't fail the batch.
+    Returns (page_count, chunks, error)."""
+    try:
+        page_count, docs = load_and_split_pdf(pdf_path)
+        return page_count, docs, None
+    except Exception as e:
+        return 0, [], str(e)
+
+
+def parse_pdfs(pdf_paths: list, workers: int = INGEST_WORKERS, on_parsed=None) -> list:
+    """Load and split PDFs across a process pool, returning results in input order.
+    `on_parsed` is called after each PDF, for progress reporting."""
+    workers = min(workers, len(pdf_paths))
+    results = []
+    if workers <= 1:
+        for path in pdf_paths:
+            results.append(_load_and_split_safely(path))
+            if on_parsed:
+                on_parsed()
+        return results
+    # Spawn, not fork: the caller is a background thread of a process that already
+    # holds torch / FAISS threads and locks, which a forked child would inherit mid-use
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+        # map() yields in submission order, so chunk order is deterministic
+        for result in executor.map(_load_and_split_safely, pdf_paths):
+            results.append(result)
+            if on_parsed:
+                on_parsed()
+    return results
+
+
+def build_lexical_index(vectorstore) -> BM25Index:
+    """BM25 over the vectorstore's chunks, in FAISS id order."""
+    texts = [
+        vectorstore.docstore.search(vectorstore.index_to_docstore_id[i]).page_content
+        for i in range(vectorstore.index.ntotal)
+    ]
+    return BM25Index(texts)
+
+
+class IndexStore:
+    """FAISS index persisted to disk alongside a manifest of the PDFs it contains.
+
+    The manifest maps each PDF (relative to the data directory) to its size,
+    mtime, content hash and the ids of its chunks, so a restart only
+    re-embeds PDFs that were added or changed and drops vectors of PDFs
+    that were removed.
+
+    Chunks that duplicate an already indexed chunk are not embedded; their
+    provenance is merged into the canonical chunk's `duplicate_sources`
+    metadata and the manifest records which canonical chunk each maps to.
+    """
+
+    def __init__(self, data_dir: str = DATA_DIR, index_dir: str = INDEX_DIR, embedding_model: str = "",
+                 embedding_backend: dict = None):
+        self.data_dir = data_dir
+        self.index_dir = index_dir
+        self.embedding_model = embedding_model
+        # Informational (backend, threads, ONNX parity); only `embedding_model` decides reuse
+        self.embedding_backend = embedding_backend
+        self.manifest = self._empty_manifest()
+        self.lexical_index = None
+        self.deduplicator = None
+        # Read by /ready while load_or_build runs on the init thread
+        self.progress = {
+            "pdfs_total": 0,
+            "pdfs_to_parse": 0,
+            "pdfs_parsed": 0,
+            "chunks_to_embed": 0,
+            "chunks_embedded": 0,
+            "index_ready": False,
+        }
+
+    def _empty_manifest(self) -> dict:
+        return {
+            "version": MANIFEST_VERSION,
+            "embedding_model": self.embedding_model,
+            "embedding_backend": self.embedding_backend,
+            "chunk_size": CHUNK_SIZE,
+            "chunk_overlap": CHUNK_OVERLAP,
+            "index": index_config(),
+            "dedup": dedup_config(),
+            "files": {},
+        }
+
+    @property
+    def store_dir(self) -> str:
+        return os.path.join(self.index_dir, STORE_DIR_NAME)
+
+    @property
+    def manifest_path(self) -> str:
+        return os.path.join(self.store_dir, MANIFEST_NAME)
+
+    @property
+    def lexical_index_path(self) -> str:
+        return os.path.join(self.store_dir, LEXICAL_INDEX_NAME)
+
+    @property
+    def dedup_index_path(self) -> str:
+        return os.path.join(self.store_dir, DEDUP_INDEX_NAME)
+
+    @property
+    def duplicate_count(self) -> int:
+        """Chunks dropped as duplicates across the indexed PDFs."""
+        return sum(len(entry.get("duplicates", {})) for entry in self.manifest["files"].values())
+
+    def list_pdfs(self) -> list:
+        """Return the PDFs currently in the data directory, sorted for stable ordering."""
+        if not os.path.isdir(self.data_dir):
+            raise FileNotFoundError(f"Data directory not found: {self.data_dir}")
+        return sorted(glob.glob(os.path.join(self.data_dir, "*.pdf")))
+
+    def source_signature(self) -> tuple:
+        """Cheap (name, size, mtime) listing of the data directory, polled to detect corpus changes."""
+        signature = []
+        for pdf_path in self.list_pdfs():
+            stat = os.stat(pdf_path)
+            signature.append((os.path.basename(pdf_path), stat.st_size, stat.st_mtime_ns))
+        return tuple(signature)
+
+    def corpus_fingerprint(self) -> str:
+        """Hash of the indexed PDFs' contents; changes whenever the corpus does."""
+        digest = hashlib.sha256()
+        for rel_path, entry in sorted(self.manifest["files"].items()):
+            digest.update(f"{rel_path}:{entry['sha256']}\n".encode("utf-8"))
+        return digest.hexdigest()
+
+    def _read_manifest(self) -> dict:
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable index manifest: {e}")
+            return None
+
+        # Any change to how chunks are produced invalidates every stored vector
+        expected = self._empty_manifest()
+        for key in ("version", "embedding_model", "chunk_size", "chunk_overlap", "index", "dedup"):
+            if manifest.get(key) != expected[key]:
+                logger.info(f"Index manifest {key} changed, rebuilding index from scratch")
+                return None
+        return manifest
+
+    def _recover_store(self):
+        """Finish a `_save` interrupted between moving the old store aside and renaming the new one in."""
+        old_dir = self.store_dir + ".old"
+        if not os.path.isdir(self.store_dir) and os.path.isdir(old_dir):
+            os.rename(old_dir, self.store_dir)
+        shutil.rmtree(old_dir, ignore_errors=True)
+        shutil.rmtree(self.store_dir + ".tmp", ignore_errors=True)
+
+    def _load_persisted(self, embeddings):
+        self._recover_store()
+        manifest = self._read_manifest()
+        if manifest is None:
+            return None
+        try:
+            vectorstore = FAISS.load_local(
+                self.store_dir, embeddings, allow_dangerous_deserialization=True
+            )
+        except Exception as e:
+            logger.warning(f"Failed to load persisted index, rebuilding: {e}")
+            return None
+
+        # The manifest must describe exactly the stored chunks, or deletes would hit missing ids
+        manifest_ids = {chunk_id for entry in manifest["files"].values() for chunk_id in entry["chunk_ids"]}
+        if manifest_ids != set(vectorstore.index_to_docstore_id.values()):
+            logger.warning("Index manifest does not match the stored chunks, rebuilding index from scratch")
+            return None
+        configure_search(vectorstore.index)
+        self.manifest = manifest
+        return vectorstore
+
+    def _save(self, vectorstore):
+        """Write index, pickles and manifest to a fresh directory, then swap it in for the old one."""
+        tmp_dir = self.store_dir + ".tmp"
+        old_dir = self.store_dir + ".old"
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        os.makedirs(tmp_dir)
+        vectorstore.save_local(tmp_dir)
+        self.lexical_index.save(os.path.join(tmp_dir, LEXICAL_INDEX_NAME))
+        if self.deduplicator is not None:
+            self.deduplicator.save(os.path.join(tmp_dir, DEDUP_INDEX_NAME))
+        with open(os.path.join(tmp_dir, MANIFEST_NAME), "w", encoding="utf-8") as f:
+            json.dump(self.manifest, f, indent=2)
+
+        # A crash between the two renames leaves only store.old, restored by `_recover_store`
+        if os.path.isdir(self.store_dir):
+            os.rename(self.store_dir, old_dir)
+        os.rename(tmp_dir, self.store_dir)
+        shutil.rmtree(old_dir, ignore_errors=True)
+
+    def _write_manifest(self):
+        """Replace just the manifest (stat / backend refresh; the stored chunks are unchanged)."""
+        os.makedirs(self.store_dir, exist_ok=True)
+        tmp_path = self.manifest_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.manifest, f, indent=2)
+        os.replace(tmp_path, self.manifest_path)
+
+    def _diff(self, pdf_files: list):
+        """Split current PDFs into unchanged, touched (same hash, new stat) and changed,
+        and find manifest entries whose PDF was deleted."""
+        known = self.manifest["files"]
+        unchanged, touched, changed = [], [], []
+
+        for pdf_path in pdf_files:
+            rel_path = os.path.relpath(pdf_path, self.data_dir)
+            stat = os.stat(pdf_path)
+            entry = known.get(rel_path)
+
+            if entry and entry["size"] == stat.st_size and entry["mtime"] == stat.st_mtime:
+                unchanged.append(rel_path)
+                continue
+
+            sha256 = file_sha256(pdf_path)
+            if entry and entry["sha256"] == sha256:
+                # Touched but not modified: refresh the stat fields only
+                entry["size"], entry["mtime"] = stat.st_size, stat.st_mtime
+                touched.append(rel_path)
+                continue
+
+            changed.append((rel_path, pdf_path, stat, sha256))
+
+        current = {os.path.relpath(p, self.data_dir) for p in pdf_files}
+        deleted = [rel_path for rel_path in known if rel_path not in current]
+        return unchanged, touched, changed, deleted
+
+    def _load_lexical(self, vectorstore):
+        try:
+            lexical_index = BM25Index.load(self.lexical_index_path)
+        except Exception:
+            return None
+        # Positions must line up one-to-one with the FAISS vectors
+        return lexical_index if lexical_index.doc_count == vectorstore.index.ntotal else None
+
+    def _load_deduplicator(self, vectorstore) -> ChunkDeduplicator:
+        """The persisted deduplicator, or one rebuilt from the indexed chunks."""
+        if vectorstore is None:
+            return ChunkDeduplicator()
+        try:
+            deduplicator = ChunkDeduplicator.load(self.dedup_index_path)
+            if len(deduplicator) == vectorstore.index.ntotal:
+                return deduplicator
+        except Exception:
+            pass
+        logger.info("Rebuilding chunk dedup index from the vectorstore")
+        deduplicator = ChunkDeduplicator()
+        for doc_id in vectorstore.index_to_docstore_id.values():
+            _, *fingerprint = deduplicator.match(vectorstore.docstore.search(doc_id).page_content)
+            deduplicator.add(doc_id, *fingerprint)
+        return deduplicator
+
+    def _dependent_files(self, dropped: set) -> list:
+        """Unchanged PDFs whose duplicate chunks point at chunks of `dropped` PDFs.
+
+        Those chunks were never embedded, so the PDFs must be re-ingested once
+        their canonical chunks go away. Applied until no new PDFs are pulled in.
+        """
+        files = self.manifest["files"]
+        removed_ids = {chunk_id for rel_path in dropped for chunk_id in files[rel_path]["chunk_ids"]}
+        dependents = []
+        while True:
+            found = [
+                rel_path for rel_path, entry in files.items()
+                if rel_path not in dropped
+                and any(canonical in removed_ids for canonical in entry.get("duplicates", {}).values())
+            ]
+            if not found:
+                return dependents
+            for rel_path in found:
+                dropped.add(rel_path)
+                removed_ids.update(files[rel_path]["chunk_ids"])
+            dependents.extend(found)
+
+    @staticmethod
+    def _strip_provenance(vectorstore, duplicates: dict, removed_ids: set):
+        """Remove dropped duplicates from the `duplicate_sources` of surviving chunks."""
+        for dup_id, canonical in duplicates.items():
+            if canonical in removed_ids:
+                continue
+            doc = vectorstore.docstore.search(canonical)
+            if isinstance(doc, str):
+                continue
+            sources = [s for s in doc.metadata.get("duplicate_sources", []) if s["chunk_id"] != dup_id]
+            if sources:
+                doc.metadata["duplicate_sources"] = sources
+            else:
+                doc.metadata.pop("duplicate_sources", None)
+
+    def _merge_duplicates(self, vectorstore, new_docs: list, new_ids: list, file_docs: dict, duplicates: dict):
+        """Record each duplicate's provenance on its canonical chunk, new or already indexed."""
+        pending = dict(zip(new_ids, new_docs))
+        for dup_id, (canonical, _) in duplicates.items():
+            doc = pending.get(canonical)
+            if doc is None:
+                doc = vectorstore.docstore.search(canonical)
+            doc.metadata.setdefault("duplicate_sources", []).append(provenance(file_docs[dup_id], dup_id))
+
+    def _embed_into(self, vectorstore, embeddings, docs: list, ids: list):
+        """Embed chunks in large batches and add them to the vectorstore (created if None)."""
+        if not docs:
+            return vectorstore
+
+        texts = [doc.page_content for doc in docs]
+        batches = []
+        self.progress["chunks_to_embed"] = len(texts)
+        for start in range(0, len(texts), EMBED_BATCH_SIZE):
+            batches.append(np.asarray(embeddings.embed_documents(texts[start:start + EMBED_BATCH_SIZE]), dtype=np.float32))
+            self.progress["chunks_embedded"] = min(start + EMBED_BATCH_SIZE, len(texts))
+            logger.info(f"Embedded {self.progress['chunks_embedded']}/{len(texts)} chunks")
+        vectors = np.vstack(batches)
+
+        if vectorstore is None:
+            # ANN index types are trained on the vectors they will hold
+            vectorstore = self._new_vectorstore(embeddings, vectors)
+        vectorstore.add_embeddings(
+            list(zip(texts, vectors)), metadatas=[doc.metadata for doc in docs], ids=ids
+        )
+        return vectorstore
+
+    def _new_vectorstore(self, embeddings, vectors: np.ndarray):
+        """Empty vectorstore whose index is trained on `vectors`; the training size is
+        recorded in the manifest so later syncs know when to retrain."""
+        description, reduced = index_plan(len(vectors))
+        self.manifest["trained"] = {"description": description, "ntotal": len(vectors), "reduced": reduced}
+        return FAISS(
+            embedding_function=embeddings,
+            index=build_index(vectors, description),
+            docstore=InMemoryDocstore(),
+            index_to_docstore_id={},
+        )
+
+    def _rebuild(self, vectorstore, embeddings, keep: list):
+        """A freshly trained vectorstore holding the chunks at FAISS positions `keep`."""
+        keep_ids = [vectorstore.index_to_docstore_id[i] for i in keep]
+        docs = [vectorstore.docstore.search(doc_id) for doc_id in keep_ids]
+        if "PQ" in self.manifest.get("trained", {}).get("description", ""):
+            # PQ codes are too lossy to re-encode: embed the chunk texts again
+            texts = [doc.page_content for doc in docs]
+            vectors = np.vstack([
+                np.asarray(embeddings.embed_documents(texts[start:start + EMBED_BATCH_SIZE]), dtype=np.float32)
+                for start in range(0, len(texts), EMBED_BATCH_SIZE)
+            ])
+        else:
+            vectors = vectorstore.index.reconstruct_n(0, vectorstore.index.ntotal)[keep]
+
+        rebuilt = self._new_vectorstore(embeddings, vectors)
+        rebuilt.add_embeddings(
+            [(doc.page_content, vector) for doc, vector in zip(docs, vectors)],
+            metadatas=[doc.metadata for doc in docs], ids=keep_ids
+        )
+        return rebuilt
+
+    def _remove_chunks(self, vectorstore, embeddings, ids: list):
+        """Delete chunks by id, returning the vectorstore to use from now on."""
+        if supports_sequential_remove(vectorstore.index):
+            vectorstore.delete(ids)
+            return vectorstore
+
+        # HNSW / IVF keep their own ids and graph: rebuild from the surviving stored vectors
+        removed = set(ids)
+        keep = [i for i in range(vectorstore.index.ntotal)
+                if vectorstore.index_to_docstore_id[i] not in removed]
+        if not keep:
+            return None
+        return self._rebuild(vectorstore, embeddings, keep)
+
+    def _retrain_if_grown(self, vectorstore, embeddings):
+        """Retrain IVF lists / PQ codebooks trained on a much smaller corpus. Returns (vectorstore, retrained)."""
+        ntotal = vectorstore.index.ntotal
+        # Indexes saved before training was recorded count as trained on their current size
+        trained = self.manifest.setdefault("trained", {"ntotal": ntotal, "reduced": index_plan(ntotal)[1]})
+        if not needs_retrain(trained, ntotal):
+            return vectorstore, False
+        logger.info(f"Index trained on {trained['ntotal']} vectors now holds {ntotal}: retraining")
+        return self._rebuild(vectorstore, embeddings, list(range(ntotal))), True
+
+    def load_or_build(self, embeddings):
+        """Load the persisted index and bring it in sync with the data directory."""
+        pdf_files = self.list_pdfs()
+        if not pdf_files:
+            raise FileNotFoundError(f"No PDF files found in: {self.data_dir}")
+        self.progress["pdfs_total"] = len(pdf_files)
+
+        vectorstore = self._load_persisted(embeddings)
+        if vectorstore is None:
+            self.manifest = self._empty_manifest()
+        backend_changed = self.manifest.get("embedding_backend") != self.embedding_backend
+        self.manifest["embedding_backend"] = self.embedding_backend
+
+        unchanged, touched, changed, deleted = self._diff(pdf_files)
+        logger.info(
+            f"Index sync: {len(unchanged) + len(touched)} unchanged, {len(changed)} new/changed, "
+            f"{len(deleted)} deleted PDFs"
+        )
+
+        self.deduplicator = self._load_deduplicator(vectorstore) if DEDUP_CHUNKS else None
+        dropped = set(deleted) | {rel_path for rel_path, _, _, _ in changed}
+        if self.deduplicator is not None and vectorstore is not None:
+            dependents = self._dependent_files({p for p in dropped if p in self.manifest["files"]})
+            if dependents:
+                logger.info(f"Re-ingesting {len(dependents)} PDFs whose duplicate chunks lost their canonical chunk")
+            for rel_path in dependents:
+                entry = self.manifest["files"][rel_path]
+                pdf_path = os.path.join(self.data_dir, rel_path)
+                changed.append((rel_path, pdf_path, os.stat(pdf_path), entry["sha256"]))
+                dropped.add(rel_path)
+
+        # Drop vectors belonging to removed or modified files
+        stale_ids, stale_duplicates = [], {}
+        for rel_path in dropped:
+            entry = self.manifest["files"].pop(rel_path, None)
+            if entry:
+                stale_ids.extend(entry["chunk_ids"])
+                stale_duplicates.update(entry.get("duplicates", {}))
+        if self.deduplicator is not None:
+            self.deduplicator.remove(stale_ids)
+            if vectorstore is not None:
+                self._strip_provenance(vectorstore, stale_duplicates, set(stale_ids))
+        if stale_ids and vectorstore is not None:
+            vectorstore = self._remove_chunks(vectorstore, embeddings, stale_ids)
+            logger.info(f"Removed {len(stale_ids)} stale chunks from index")
+
+        # Parse and split only new or modified files, in parallel
+        self.progress["pdfs_to_parse"] = len(changed)
+
+        def count_parsed():
+            self.progress["pdfs_parsed"] += 1
+
+        parsed = parse_pdfs([pdf_path for _, pdf_path, _, _ in changed], on_parsed=count_parsed)
+
+        new_docs, new_ids = [], []
+        exact_count = near_count = 0
+        for (rel_path, _, stat, sha256), (page_count, docs, error) in zip(changed, parsed):
+            if error:
+                logger.warning(f"  -> Failed to load {rel_path}: {error}")
+                continue
+
+            chunk_ids = [f"{rel_path}:{sha256[:12]}:{i}" for i in range(len(docs))]
+            duplicates = {}
+            if self.deduplicator is not None:
+                file_docs = dict(zip(chunk_ids, docs))
+                docs, chunk_ids, found = self.deduplicator.deduplicate(docs, chunk_ids)
+                self._merge_duplicates(vectorstore, new_docs + docs, new_ids + chunk_ids, file_docs, found)
+                duplicates = {dup_id: canonical for dup_id, (canonical, _) in found.items()}
+                exact = sum(1 for _, is_exact in found.values() if is_exact)
+                exact_count += exact
+                near_count += len(found) - exact
+            logger.info(
+                f"  -> Loaded {page_count} pages, {len(docs) + len(duplicates)} chunks from {rel_path}"
+                f" ({len(duplicates)} duplicates)"
+            )
+            new_docs.extend(docs)
+            new_ids.extend(chunk_ids)
+
+            self.manifest["files"][rel_path] = {
+                "size": stat.st_size,
+                "mtime": stat.st_mtime,
+                "sha256": sha256,
+                "pages": page_count,
+                "chunk_ids": chunk_ids,
+                "duplicates": duplicates,
+            }
+
+        if exact_count or near_count:
+            logger.info(f"Dropped {exact_count + near_count} duplicate chunks ({exact_count} exact, {near_count} near)")
+
+        vectorstore = self._embed_into(vectorstore, embeddings, new_docs, new_ids)
+
+        if vectorstore is None or vectorstore.index.ntotal == 0:
+            raise RuntimeError("No documents were successfully loaded from PDFs")
+        vectorstore, retrained = self._retrain_if_grown(vectorstore, embeddings)
+
+        index_changed = bool(changed or deleted or stale_ids or retrained)
+        self.lexical_index = None if index_changed else self._load_lexical(vectorstore)
+        if self.lexical_index is None:
+            self.lexical_index = build_lexical_index(vectorstore)
+            index_changed = True
+
+        if index_changed:
+            self._save(vectorstore)
+        elif touched or backend_changed:
+            # Persist refreshed stat fields (so the next boot can skip re-hashing) and backend info
+            self._write_manifest()
+
+        self.progress["index_ready"] = True
+        logger.info(
+            f"Index ready: {vectorstore.index.ntotal} chunks from {len(self.manifest['files'])} PDFs, "
+            f"{self.duplicate_count} duplicates merged"
+        )
+        return vectorstore
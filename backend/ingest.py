@@ -0,0 +1,33 @@
+# backend/ingest.py
+#
+# Build (or incrementally sync) the index once and publish a read-only snapshot
+# for workers started with SHARED_INDEX=1:
+#
+#   python ingest.py
+#   SHARED_INDEX=1 uvicorn main:app --workers 4 --port 8000
+#
+# Re-run after changing the PDFs in data/; workers pick up the new snapshot by
+# polling (RELOAD_POLL_SECONDS) or on restart. POST /admin/reload reaches only
+# one of several workers.
+
+import logging
+
+
+def ingest(embeddings=None, index_store=None) -> str:
+    """Sync the index with the data directory and publish it; returns the snapshot directory."""
+    from rag_service import EMBEDDING_MODEL
+    from embedding_backend import load_embeddings
+    from index_store import IndexStore
+    from snapshot_store import write_snapshot
+
+    index_key, embedding_info = EMBEDDING_MODEL, None
+    if embeddings is None:
+        embeddings, index_key, embedding_info = load_embeddings(EMBEDDING_MODEL)
+    index_store = index_store or IndexStore(embedding_model=index_key, embedding_backend=embedding_info)
+    vectorstore = index_store.load_or_build(embeddings)
+    return write_snapshot(index_store, vectorstore, index_store.index_dir)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    print(ingest())
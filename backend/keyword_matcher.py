@@ -0,0 +1,68 @@
+# backend/keyword_matcher.py
+
+import re
+
+
+def normalize_keyword(text: str) -> str:
+    """Lowercase and collapse whitespace, so `Chest  Pain` and `chest pain` are one key."""
+    return " ".join(text.lower().split())
+
+
+class KeywordMatcher:
+    """Match many keywords against text in a single left-to-right pass.
+
+    The keywords are compiled once into one trie-shaped regex, so the cost of a
+    scan grows with the text length rather than with the number of keywords.
+    Matches respect word boundaries ("ear" does not fire inside "year"),
+    prefer the longest keyword at each position ("chest pain" over "pain"),
+    and whitespace inside a keyword matches any run of whitespace.
+    """
+
+    def __init__(self, keywords: dict, plurals: bool = False):
+        """`keywords` maps keyword -> value; `plurals` also accepts a trailing s/es."""
+        self.values = {}
+        for keyword, value in keywords.items():
+            key = normalize_keyword(keyword)
+            if key:
+                self.values.setdefault(key, value)
+
+        trie = {}
+        for key in self.values:
+            node = trie
+            for ch in key:
+                node = node.setdefault(ch, {})
+            node[""] = True  # end-of-keyword marker
+
+        suffix = r"(?:e?s)?" if plurals else ""
+        body = self._trie_to_regex(trie) if trie else r"(?!x)x"
+        self.pattern = re.compile(rf"(?<!\w)({body}){suffix}(?!\w)", re.IGNORECASE)
+
+    @classmethod
+    def _trie_to_regex(cls, node: dict) -> str:
+        terminal = "" in node
+        branches = []
+        for ch in sorted(k for k in node if k):
+            atom = r"\s+" if ch == " " else re.escape(ch)
+            branches.append(atom + cls._trie_to_regex(node[ch]))
+
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if terminal:
+            # Greedy optional: try the longer keyword first, backtrack to this one
+            body = "(?:" + body + ")?"
+        return body
+
+    def finditer(self, text: str):
+        """Yield (start, end, keyword, value) for non-overlapping matches, left to right."""
+        for match in self.pattern.finditer(text):
+            keyword = normalize_keyword(match.group(1))
+            yield match.start(), match.end(), keyword, self.values[keyword]
+
+    def findall(self, text: str) -> list:
+        return list(self.finditer(text))
+
+    def lookup(self, text: str):
+        """Value of the keyword `text` is exactly (plurals and spacing allowed), else None."""
+        match = self.pattern.fullmatch(text.strip())
+        return self.values[normalize_keyword(match.group(1))] if match else None
@@ -0,0 +1,143 @@
+# backend/lexical_index.py
+
+import os
+import re
+import math
+import json
+import pickle
+import logging
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+
+def tokenize(text: str) -> list:
+    """Lowercase word tokens; digits are kept so doses like `500` stay searchable."""
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+class BM25Index:
+    """Okapi BM25 over the same chunks as the FAISS index.
+
+    Document `i` here is FAISS vector `i`, so lexical hits map straight back
+    to the vector index and docstore.
+    """
+
+    def __init__(self, texts: list, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.doc_count = len(texts)
+
+        doc_lens = np.zeros(self.doc_count, dtype=np.float32)
+        term_docs = {}
+        for i, text in enumerate(texts):
+            tokens = tokenize(text)
+            doc_lens[i] = len(tokens)
+            counts = {}
+            for token in tokens:
+                counts[token] = counts.get(token, 0) + 1
+            for token, tf in counts.items():
+                term_docs.setdefault(token, []).append((i, tf))
+
+        avg_len = float(doc_lens.mean()) if self.doc_count else 0.0
+        # Length normalization only depends on the document, so precompute it
+        self.norms = (k1 * (1 - b + b * doc_lens / (avg_len or 1.0))).astype(np.float32)
+
+        self.postings = {}
+        for token, docs in term_docs.items():
+            df = len(docs)
+            idf = math.log(1 + (self.doc_count - df + 0.5) / (df + 0.5))
+            ids = np.fromiter((d for d, _ in docs), dtype=np.int64, count=df)
+            tfs = np.fromiter((tf for _, tf in docs), dtype=np.float32, count=df)
+            self.postings[token] = (ids, tfs, idf)
+
+    def search(self, query: str, k: int) -> list:
+        """Return up to k (doc_index, score) pairs, best first."""
+        if not self.doc_count:
+            return []
+        scores = np.zeros(self.doc_count, dtype=np.float32)
+        for token in set(tokenize(query)):
+            posting = self._posting(token)
+            if posting is None:
+                continue
+            ids, tfs, idf = posting
+            scores[ids] += idf * tfs * (self.k1 + 1) / (tfs + self.norms[ids])
+
+        matched = np.flatnonzero(scores)
+        if not matched.size:
+            return []
+        if matched.size > k:
+            matched = matched[np.argpartition(-scores[matched], k - 1)[:k]]
+        matched = matched[np.argsort(-scores[matched], kind="stable")]
+        return [(int(i), float(scores[i])) for i in matched]
+
+    def _posting(self, token: str):
+        """(doc ids, term frequencies, idf) for a token, or None."""
+        return self.postings.get(token)
+
+    def idf(self, token: str) -> float:
+        """Inverse document frequency of a token; 0 for tokens not in the corpus."""
+        posting = self._posting(token)
+        return posting[2] if posting is not None else 0.0
+
+    def save(self, path: str):
+        with open(path, "wb") as f:
+            pickle.dump(self, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @staticmethod
+    def load(path: str):
+        with open(path, "rb") as f:
+            return pickle.load(f)
+
+    def save_packed(self, directory: str):
+        """Write the postings as flat .npy arrays (sorted terms + offsets) for `PackedBM25Index`."""
+        os.makedirs(directory, exist_ok=True)
+        terms = sorted(self.postings)
+        offsets = np.zeros(len(terms) + 1, dtype=np.int64)
+        for i, term in enumerate(terms):
+            offsets[i + 1] = offsets[i] + len(self.postings[term][0])
+        arrays = {
+            "terms": np.array(terms, dtype=str) if terms else np.array([], dtype="<U1"),
+            "offsets": offsets,
+            "ids": np.concatenate([self.postings[t][0] for t in terms]) if terms else np.array([], dtype=np.int64),
+            "tfs": np.concatenate([self.postings[t][1] for t in terms]) if terms else np.array([], dtype=np.float32),
+            "idfs": np.array([self.postings[t][2] for t in terms], dtype=np.float32),
+            "norms": self.norms,
+        }
+        for name, array in arrays.items():
+            np.save(os.path.join(directory, f"{name}.npy"), array)
+        with open(os.path.join(directory, "bm25.json"), "w", encoding="utf-8") as f:
+            json.dump({"k1": self.k1, "b": self.b, "doc_count": self.doc_count}, f)
+
+
+class PackedBM25Index(BM25Index):
+    """BM25 over arrays written by `BM25Index.save_packed`, memory-mapped read-only.
+
+    Terms are found by binary search in the sorted term array, so nothing is
+    unpacked onto the heap and processes opening the same files share their pages.
+    """
+
+    def __init__(self, directory: str):
+        with open(os.path.join(directory, "bm25.json"), encoding="utf-8") as f:
+            params = json.load(f)
+        self.k1, self.b, self.doc_count = params["k1"], params["b"], params["doc_count"]
+        for name in ("terms", "offsets", "ids", "tfs", "idfs", "norms"):
+            setattr(self, name, np.load(os.path.join(directory, f"{name}.npy"), mmap_mode="r"))
+
+    def _posting(self, token: str):
+        i = int(np.searchsorted(self.terms, token))
+        if i == len(self.terms) or self.terms[i] != token:
+            return None
+        start, end = self.offsets[i], self.offsets[i + 1]
+        return self.ids[start:end], self.tfs[start:end], float(self.idfs[i])
+
+
+def reciprocal_rank_fusion(ranked_lists: list, k: int, rrf_k: int = 60) -> list:
+    """Fuse ranked lists of ids: score(id) = Σ 1 / (rrf_k + rank). Returns top-k ids."""
+    scores = {}
+    for ranked in ranked_lists:
+        for rank, item in enumerate(ranked):
+            scores[item] = scores.get(item, 0.0) + 1.0 / (rrf_k + rank + 1)
+    return sorted(scores, key=lambda item: -scores[item])[:k]
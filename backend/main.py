@@ -1,19 +1,52 @@
-from fastapi import FastAPI, HTTPException, Query
+from fastapi import FastAPI, HTTPException, Query, Header
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse, JSONResponse, Response
 from models import (
     ChatRequest, ChatResponse, HealthResponse,
-    DoctorRequest, DoctorResponse
+    DoctorRequest, DoctorResponse,
+    BatchChatRequest, BatchChatResponse, AgentChatResponse
 )
 from rag_service import rag_service
+from doctor_finder import close_async_client, geo_cache
+from metrics import REGISTRY, CONTENT_TYPE, MetricsMiddleware, render_cache_stats
+from contextlib import asynccontextmanager
+import os
+import hmac
+import json
 import logging
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+BATCH_MAX_QUERIES = int(os.environ.get("BATCH_MAX_QUERIES", "1000"))
+
+# Seconds clients should wait before retrying while the service is starting
+READY_RETRY_AFTER = os.environ.get("READY_RETRY_AFTER", "5")
+
+# Shared secret for /admin endpoints (X-Admin-Token header); unset disables them
+ADMIN_TOKEN = os.environ.get("ADMIN_TOKEN", "")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Load models and the index in the background so the port binds immediately
+    rag_service.start_background_init()
+    yield
+    await close_async_client()
+
+def require_ready():
+    """Fail fast with 503 while the RAG service is still initializing (or failed to)"""
+    if not rag_service.is_ready:
+        raise HTTPException(
+            status_code=503,
+            detail=f"Service not ready: {rag_service.init_error or rag_service.stage or rag_service.state}",
+            headers={"Retry-After": READY_RETRY_AFTER}
+        )
+
 app = FastAPI(
     title="TruthTriage API",
     description="Medical AI Assistant Backend",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # CORS - Allow React frontend
@@ -25,47 +58,125 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Request latency / status / in-flight metrics for every endpoint, served on /metrics
+app.add_middleware(MetricsMiddleware)
+
 @app.get("/health", response_model=HealthResponse)
 async def health_check():
-    """Check if API is running"""
+    """Liveness: the process is up, even while the index is still loading"""
+    if rag_service.state == "failed":
+        return JSONResponse(status_code=503, content={
+            "status": "unhealthy",
+            "message": f"Initialization failed: {rag_service.init_error}"
+        })
     return {
         "status": "healthy",
         "message": "TruthTriage API is running"
     }
 
+@app.get("/ready")
+async def readiness_check():
+    """Readiness: 200 once the index and LLM are loaded, else 503 with init progress"""
+    body = rag_service.readiness()
+    if not rag_service.is_ready:
+        return JSONResponse(status_code=503, content=body, headers={"Retry-After": READY_RETRY_AFTER})
+    return body
+
 @app.post("/chat", response_model=ChatResponse)
 async def chat(request: ChatRequest):
     """Send medical query and get answer with sources"""
+    require_ready()
     try:
         logger.info(f"Received query: {request.query}")
-        result = rag_service.get_answer(request.query)
+        result = await rag_service.aget_answer(request.query)
         logger.info("Generated answer successfully")
         return result
     except Exception as e:
         logger.error(f"Error: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/chat/stream")
+async def chat_stream(request: ChatRequest):
+    """Stream the answer as NDJSON: sources first, then tokens, then medicines"""
+    require_ready()
+    logger.info(f"Received streaming query: {request.query}")
+    
+    async def events():
+        async for event in rag_service.astream_answer(request.query):
+            yield json.dumps(event, default=str) + "\n"
+    
+    return StreamingResponse(events(), media_type="application/x-ndjson")
+
+@app.post("/chat/agent", response_model=AgentChatResponse)
+async def chat_agent(request: ChatRequest):
+    """Answer with the tool-using agent (retrieval + doctor search in parallel), with step timings"""
+    require_ready()
+    try:
+        logger.info(f"Received agent query: {request.query}")
+        result = await rag_service.aget_agent_answer(request.query)
+        logger.info(f"Agent finished in {len(result['steps'])} steps")
+        return result
+    except Exception as e:
+        logger.error(f"Agent error: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/chat/batch", response_model=BatchChatResponse)
+async def chat_batch(request: BatchChatRequest):
+    """Answer many queries in one call; per-query errors are reported, not raised"""
+    if len(request.queries) > BATCH_MAX_QUERIES:
+        raise HTTPException(status_code=400, detail=f"At most {BATCH_MAX_QUERIES} queries per batch")
+    require_ready()
+    try:
+        logger.info(f"Received batch of {len(request.queries)} queries")
+        results = await rag_service.aget_answers(request.queries)
+        return {"results": results}
+    except Exception as e:
+        logger.error(f"Batch error: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.post("/doctors", response_model=DoctorResponse)
 async def find_doctors(request: DoctorRequest):
     """Find specialist doctors near a location based on medical query"""
     try:
         logger.info(f"Doctor search: query='{request.query}', location='{request.location}'")
-        result = rag_service.find_doctors(request.query, request.location)
+        result = await rag_service.afind_doctors(request.query, request.location)
         logger.info(f"Found {len(result['doctors'])} doctors")
         return result
     except Exception as e:
         logger.error(f"Doctor search error: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/cache/stats")
+async def cache_stats():
+    """Answer and geo cache hit/miss counters"""
+    return {
+        "answers": rag_service.answer_cache.stats(),
+        "geo": geo_cache.stats(),
+        "rerank": rag_service.reranker.stats() if rag_service.reranker else None
+    }
+
+@app.get("/metrics")
+async def metrics():
+    """Prometheus metrics: per-stage latency histograms, HTTP requests, LLM tokens, cache hit ratios"""
+    caches = {
+        "answers": rag_service.answer_cache.stats(),
+        "geo": geo_cache.stats(),
+        "rerank": rag_service.reranker.stats() if rag_service.reranker else None
+    }
+    return Response(REGISTRY.render() + render_cache_stats(caches), media_type=CONTENT_TYPE)
+
 @app.get("/documents")
 async def get_documents():
-    """Get loaded documents"""
-    import os, glob
-    base_dir = os.path.dirname(os.path.abspath(__file__))
-    data_dir = os.path.abspath(os.path.join(base_dir, "..", "data"))
-    pdf_files = glob.glob(os.path.join(data_dir, "*.pdf"))
-    docs = [{"name": os.path.basename(f), "status": "loaded"} for f in pdf_files]
-    return {"documents": docs}
+    """Documents in the index currently being served (changes only once a reload has swapped in)"""
+    return {"documents": rag_service.documents()}
+
+@app.post("/admin/reload", status_code=202)
+async def reload_index(x_admin_token: str = Header(default="")):
+    """Rebuild the index from data/ (or open the newest snapshot) in the background, then swap it in"""
+    if not ADMIN_TOKEN or not hmac.compare_digest(x_admin_token, ADMIN_TOKEN):
+        raise HTTPException(status_code=403, detail="Forbidden")
+    require_ready()
+    return rag_service.request_reload()
 
 @app.get("/")
 async def root():
@@ -73,5 +184,6 @@ async def root():
     return {
         "message": "Welcome to TruthTriage API",
         "docs": "/docs",
-        "health": "/health"
+        "health": "/health",
+        "ready": "/ready"
     }
\ No newline at end of file
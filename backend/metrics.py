@@ -0,0 +1,322 @@
+# backend/metrics.py
+
+# Minimal Prometheus instrumentation (text exposition format 0.0.4) with no extra
+# dependency: counters, gauges and histograms kept in-process and rendered by
+# `/metrics`. Recording is a lock, a bisect and a few additions, so it is safe
+# on the hot path.
+
+from bisect import bisect_left
+from functools import wraps
+import inspect
+import threading
+import time
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds; spans regex extraction (~100 µs) to slow LLM calls (tens of seconds)
+DEFAULT_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0,
+)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names: tuple, values: tuple, extra: tuple = ()) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in list(zip(names, values)) + list(extra)]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    """A metric family: one child per combination of label values."""
+
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children = {}
+        self._lock = threading.Lock()
+        REGISTRY.register(self)
+
+    def labels(self, *values):
+        """Child for these label values; hold on to it to skip the lookup on hot paths."""
+        if len(values) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {values}")
+        values = tuple(str(value) for value in values)
+        child = self._children.get(values)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(values, self._new_child())
+        return child
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for values, child in sorted(self._children.items()):
+            lines.extend(child.render(self.name, self.labelnames, values))
+        return lines
+
+
+class _ValueChild:
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount: float = 1.0):
+        with self._lock:
+            self.value -= amount
+
+    def set(self, value: float):
+        self.value = value
+
+    def render(self, name: str, labelnames: tuple, values: tuple) -> list:
+        return [f"{name}{_labels(labelnames, values)} {_number(self.value)}"]
+
+
+class Counter(_Metric):
+    """Monotonic count; the name should end in `_total`."""
+
+    kind = "counter"
+
+    def _new_child(self):
+        return _ValueChild()
+
+
+class Gauge(_Metric):
+    """Value that goes up and down, e.g. requests in flight."""
+
+    kind = "gauge"
+
+    def _new_child(self):
+        return _ValueChild()
+
+
+class _HistogramChild:
+    def __init__(self, buckets: tuple):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)   # last slot: above the largest bucket
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        i = bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[i] += 1
+            self.sum += value
+
+    def time(self):
+        return _Timer(self)
+
+    def render(self, name: str, labelnames: tuple, values: tuple) -> list:
+        with self._lock:
+            counts, total = list(self.counts), self.sum
+        lines, cumulative = [], 0
+        for bound, count in zip(self.buckets + (float("inf"),), counts):
+            cumulative += count
+            lines.append(f"{name}_bucket{_labels(labelnames, values, (('le', _number(bound)),))} {cumulative}")
+        lines.append(f"{name}_sum{_labels(labelnames, values)} {_number(total)}")
+        lines.append(f"{name}_count{_labels(labelnames, values)} {cumulative}")
+        return lines
+
+
+class _Timer:
+    """Context manager observing the elapsed seconds of its block."""
+
+    __slots__ = ("child", "started")
+
+    def __init__(self, child: _HistogramChild):
+        self.child = child
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.child.observe(time.perf_counter() - self.started)
+        return False
+
+
+class Histogram(_Metric):
+    """Distribution of observed values (seconds) in cumulative buckets."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = (), buckets: tuple = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames)
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric):
+        with self._lock:
+            if any(existing.name == metric.name for existing in self._metrics):
+                raise ValueError(f"Metric {metric.name} already registered")
+            self._metrics.append(metric)
+
+    def render(self) -> str:
+        lines = []
+        for metric in list(self._metrics):
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+# ─── TruthTriage Metrics ──────────────────────────────────────────────────────
+
+STAGE_SECONDS = Histogram(
+    "truthtriage_stage_seconds",
+    "Time spent in one stage of answering a query or finding doctors.",
+    ("stage",),
+)
+STAGE_ERRORS = Counter(
+    "truthtriage_stage_errors_total",
+    "Stages that raised an exception.",
+    ("stage",),
+)
+REQUEST_SECONDS = Histogram(
+    "truthtriage_http_request_seconds",
+    "HTTP request latency until the response body is complete.",
+    ("method", "path"),
+)
+REQUESTS = Counter(
+    "truthtriage_http_requests_total",
+    "HTTP requests by response status.",
+    ("method", "path", "status"),
+)
+IN_FLIGHT = Gauge(
+    "truthtriage_http_requests_in_flight",
+    "HTTP requests currently being handled.",
+    ("path",),
+)
+LLM_TOKENS = Counter(
+    "truthtriage_llm_tokens_total",
+    "Estimated tokens (~4 characters each): retrieved, context (after budgeting), prompt and completion.",
+    ("kind",),
+)
+
+
+def timed(stage: str):
+    """Decorator recording a function's duration (and failures) under `stage`."""
+    seconds, errors = STAGE_SECONDS.labels(stage), STAGE_ERRORS.labels(stage)
+
+    def decorator(func):
+        if inspect.iscoroutinefunction(func):
+            @wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                started = time.perf_counter()
+                try:
+                    return await func(*args, **kwargs)
+                except Exception:
+                    errors.inc()
+                    raise
+                finally:
+                    seconds.observe(time.perf_counter() - started)
+            return async_wrapper
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            except Exception:
+                errors.inc()
+                raise
+            finally:
+                seconds.observe(time.perf_counter() - started)
+        return wrapper
+    return decorator
+
+
+def render_cache_stats(caches: dict) -> str:
+    """Cache hit/miss counters and hit ratios from the caches' `stats()` dicts."""
+    hits, misses, ratios, sizes = [], [], [], []
+    for cache, stats in caches.items():
+        if not stats:
+            continue
+        tiers = {
+            tier: stats[key]
+            for tier, key in (("exact", "exact_hits"), ("semantic", "semantic_hits"),
+                              ("fresh" if "stale_hits" in stats else "hit", "hits"), ("stale", "stale_hits"))
+            if key in stats
+        }
+        for tier, value in tiers.items():
+            hits.append(f"truthtriage_cache_hits_total{_labels(('cache', 'tier'), (cache, tier))} {value}")
+        misses.append(f"truthtriage_cache_misses_total{_labels(('cache',), (cache,))} {stats['misses']}")
+        total = sum(tiers.values()) + stats["misses"]
+        ratio = sum(tiers.values()) / total if total else 0.0
+        ratios.append(f"truthtriage_cache_hit_ratio{_labels(('cache',), (cache,))} {_number(ratio)}")
+        sizes.append(f"truthtriage_cache_entries{_labels(('cache',), (cache,))} {stats['size']}")
+    lines = [
+        "# HELP truthtriage_cache_hits_total Cache hits by tier.",
+        "# TYPE truthtriage_cache_hits_total counter", *hits,
+        "# HELP truthtriage_cache_misses_total Cache misses.",
+        "# TYPE truthtriage_cache_misses_total counter", *misses,
+        "# HELP truthtriage_cache_hit_ratio Hits / lookups since start.",
+        "# TYPE truthtriage_cache_hit_ratio gauge", *ratios,
+        "# HELP truthtriage_cache_entries Entries currently cached.",
+        "# TYPE truthtriage_cache_entries gauge", *sizes,
+    ]
+    return "\n".join(lines) + "\n"
+
+
+class MetricsMiddleware:
+    """ASGI middleware timing every HTTP request and tracking requests in flight.
+
+    Paths are labelled by route template; unknown paths share the label
+    "other" so scanners can't blow up the number of series.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._paths = None
+
+    def _path_label(self, scope) -> str:
+        if self._paths is None:
+            self._paths = {getattr(route, "path", None) for route in scope["app"].routes}
+        return scope["path"] if scope["path"] in self._paths else "other"
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        path = self._path_label(scope)
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        in_flight = IN_FLIGHT.labels(path)
+        in_flight.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            in_flight.dec()
+            REQUEST_SECONDS.labels(scope["method"], path).observe(time.perf_counter() - started)
+            REQUESTS.labels(scope["method"], path, status["code"]).inc()
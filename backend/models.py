@@ -32,6 +32,8 @@ class ChatResponse(BaseModel):
     sources: List[Source]
     medicines: Optional[List[MedicineInfo]] = None
     specialist_type: Optional[str] = None
+    # Estimated tokens: retrieved_tokens, context_tokens (after budgeting), prompt_tokens
+    usage: Optional[Dict[str, int]] = None
     
     class Config:
         json_schema_extra = {
@@ -54,6 +56,27 @@ class ChatResponse(BaseModel):
             }
         }
 
+class BatchChatRequest(BaseModel):
+    """Request model for batch chat endpoint"""
+    queries: List[str]
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "queries": ["What is paracetamol used for?", "Side effects of ibuprofen"]
+            }
+        }
+
+class BatchChatItem(BaseModel):
+    """Result for a single query in a batch"""
+    query: str
+    result: Optional[ChatResponse] = None
+    error: Optional[str] = None
+
+class BatchChatResponse(BaseModel):
+    """Response model for batch chat endpoint (results in request order)"""
+    results: List[BatchChatItem]
+
 class HealthResponse(BaseModel):
     """Health check response"""
     status: str
@@ -85,4 +108,18 @@ class DoctorResponse(BaseModel):
     """Response model for doctor finder endpoint"""
     doctors: List[Doctor]
     location: str
-    specialization: str
\ No newline at end of file
+    specialization: str
+
+class AgentStep(BaseModel):
+    """One timed step of an agent run: a model turn, a tool round or a single tool call"""
+    type: str
+    name: str
+    seconds: float
+    tool_calls: Optional[List[str]] = None
+
+class AgentChatResponse(ChatResponse):
+    """Response model for agent chat endpoint"""
+    steps: List[AgentStep] = []
+    doctors: Optional[List[Doctor]] = None
+    # "max_steps" or "timeout" when the agent was cut off
+    stopped: Optional[str] = None
@@ -1,255 +1,267 @@
 # backend/rag_service.py
 
-from langchain_community.document_loaders import PyPDFLoader
-from langchain_community.embeddings import HuggingFaceEmbeddings
-from langchain_text_splitters import RecursiveCharacterTextSplitter
-from langchain_community.vectorstores import FAISS
-from langchain.chains import RetrievalQA
-from langchain_groq import ChatGroq
-from langchain.prompts import PromptTemplate
-from langchain_core.tools import tool
-from langgraph.prebuilt import create_react_agent
+# LangChain, LangGraph, torch and FAISS are imported where first used (model
+# loading, index sync, agent construction), so importing this module — e.g. for
+# `detect_specialization` or the geo helpers re-exported below — stays cheap.
+from lexical_index import reciprocal_rank_fusion
+from answer_cache import AnswerCache
+from context_builder import build_context, estimate_tokens, CONTEXT_TOKEN_BUDGET
+from reranker import CrossEncoderReranker, RERANK, RERANK_CANDIDATES
+from formulary import get_medicine_matcher
+from metrics import timed, STAGE_SECONDS, STAGE_ERRORS, LLM_TOKENS
+from specialization import (
+    SPECIALIZATION_MAP, GENERAL_SPECIALIZATION, detect_specialization, detect_specializations
+)
+from doctor_finder import (
+    NOMINATIM_URL, GEO_HEADERS, geo_cache, close_async_client, get_async_client,
+    geocode_location, ageocode_location, find_doctors_overpass, afind_doctors_overpass, FACILITY_BACKEND
+)
+from facility_index import get_facility_index
 import os
-import glob
 import json
+import hashlib
 import re
 import numpy as np
-import requests
+import time
+import asyncio
+import threading
+from contextvars import ContextVar
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 import logging
 
 logger = logging.getLogger(__name__)
 load_dotenv()
 
-# ─── Specialization Mapping ────────────────────────────────────────────────────
-SPECIALIZATION_MAP = {
-    "heart": "cardiologist",
-    "cardiac": "cardiologist",
-    "chest pain": "cardiologist",
-    "blood pressure": "cardiologist",
-    "hypertension": "cardiologist",
-    "skin": "dermatologist",
-    "rash": "dermatologist",
-    "acne": "dermatologist",
-    "bone": "orthopedic",
-    "joint": "orthopedic",
-    "fracture": "orthopedic",
-    "arthritis": "orthopedic",
-    "brain": "neurologist",
-    "nerve": "neurologist",
-    "headache": "neurologist",
-    "migraine": "neurologist",
-    "seizure": "neurologist",
-    "eye": "ophthalmologist",
-    "vision": "ophthalmologist",
-    "ear": "ent",
-    "nose": "ent",
-    "throat": "ent",
-    "child": "pediatrician",
-    "infant": "pediatrician",
-    "baby": "pediatrician",
-    "kidney": "nephrologist",
-    "urine": "urologist",
-    "diabetes": "endocrinologist",
-    "thyroid": "endocrinologist",
-    "hormone": "endocrinologist",
-    "cancer": "oncologist",
-    "tumor": "oncologist",
-    "lung": "pulmonologist",
-    "breathing": "pulmonologist",
-    "asthma": "pulmonologist",
-    "stomach": "gastroenterologist",
-    "liver": "hepatologist",
-    "digestion": "gastroenterologist",
-    "teeth": "dentist",
-    "dental": "dentist",
-    "tooth": "dentist",
-    "mental": "psychiatrist",
-    "depression": "psychiatrist",
-    "anxiety": "psychiatrist",
-    "pregnancy": "gynecologist",
-    "woman": "gynecologist",
-    "menstrual": "gynecologist",
-    "allergy": "allergist",
-    "fever": "general physician",
-    "cold": "general physician",
-    "cough": "general physician",
-    "infection": "general physician",
-    "pain": "general physician",
-    "medicine": "general physician",
-    "drug": "general physician",
+EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+# Chunks sent to the LLM per query
+RETRIEVAL_K = int(os.environ.get("RETRIEVAL_K", "5"))
+# Hybrid retrieval: BM25 + FAISS candidates (k × factor each) fused with reciprocal-rank fusion
+HYBRID_SEARCH = os.environ.get("HYBRID_SEARCH", "1") != "0"
+HYBRID_CANDIDATE_FACTOR = int(os.environ.get("HYBRID_CANDIDATE_FACTOR", "4"))
+RRF_K = int(os.environ.get("RRF_K", "60"))
+# Threads for CPU-bound embedding / FAISS work offloaded from the event loop
+EMBEDDING_WORKERS = int(os.environ.get("EMBEDDING_WORKERS", "4"))
+# Max concurrent LLM calls per /chat/batch request
+BATCH_LLM_CONCURRENCY = int(os.environ.get("BATCH_LLM_CONCURRENCY", "8"))
+# /chat/agent caps: LangGraph steps (model turns + tool rounds) and wall-clock seconds
+AGENT_MAX_STEPS = int(os.environ.get("AGENT_MAX_STEPS", "8"))
+AGENT_TIMEOUT = float(os.environ.get("AGENT_TIMEOUT", "60"))
+# Seconds between checks of data/ (or the published snapshot) for changes; 0 disables the watcher
+RELOAD_POLL_SECONDS = float(os.environ.get("RELOAD_POLL_SECONDS", "0"))
+
+# ─── Medicine Extraction Patterns (compiled once) ─────────────────────────────
+
+# Section headers to filter out
+ANSWER_SECTION_HEADERS = {
+    'risk level', 'condition analysis', 'recommended specialist',
+    'suggested medicines', 'precautions', 'recommendation',
+    'medicine name', 'note', 'important', 'warning', 'low',
+    'moderate', 'high', 'query', 'response', 'retrieved context'
 }
 
+ANSWER_MEDICINE_PATTERNS = [
+    # Pattern 1: **MedicineName** — usage
+    re.compile(r'\*\*([A-Za-z][A-Za-z\s\-\/\(\)0-9]+?)\*\*\s*[—\-–:]+\s*(.+?)(?:\n|$)'),
+    # Pattern 2: - MedicineName: usage or - MedicineName (usage)
+    re.compile(r'[-•\*]\s+([A-Z][A-Za-z\s\-\/]+?)\s*[:\(]\s*(.+?)(?:\)|\n|$)'),
+    # Pattern 3: numbered list: 1. MedicineName - usage
+    re.compile(r'\d+\.\s+\*?\*?([A-Z][A-Za-z\s\-\/]+?)\*?\*?\s*[-–—:]\s*(.+?)(?:\n|$)'),
+]
+
+# Patterns like "word 500mg" or "word 250 mg" in source text
+DOSAGE_PATTERN = re.compile(r'\b([A-Z][a-z]{3,20})\s*\d+\s*(?:mg|mcg|ml|g|IU)\b')
+
+# Skip dosage forms and generic words
+DOSAGE_FORM_SKIP = frozenset({
+    'tablet', 'tablets', 'capsule', 'capsules', 'injection', 'injections',
+    'syrup', 'solution', 'suspension', 'cream', 'ointment', 'drops',
+    'oral', 'topical', 'each', 'dose', 'maximum', 'minimum',
+    'adult', 'child', 'children', 'body', 'weight', 'daily',
+    'every', 'once', 'twice', 'three', 'four', 'times',
+    'contains', 'approximately', 'about', 'less', 'more', 'than',
+})
 
-def detect_specialization(query: str) -> str:
-    """Map a medical query to a doctor specialization."""
-    query_lower = query.lower()
-    for keyword, spec in SPECIALIZATION_MAP.items():
-        if keyword in query_lower:
-            return spec
-    return "general physician"
-
-
-def find_doctors_overpass(latitude: float, longitude: float, specialization: str, radius_m: int = 5000) -> list:
-    """Use Overpass API to find doctors/clinics/hospitals near coordinates."""
-    # Build Overpass query for healthcare facilities
-    overpass_url = "https://overpass-api.de/api/interpreter"
-    
-    spec_lower = specialization.lower()
-    
-    # Overpass QL: search for nodes/ways tagged as healthcare providers
-    overpass_query = f"""
-    [out:json][timeout:15];
-    (
-      node["amenity"="doctors"](around:{radius_m},{latitude},{longitude});
-      node["amenity"="clinic"](around:{radius_m},{latitude},{longitude});
-      node["amenity"="hospital"](around:{radius_m},{latitude},{longitude});
-      node["healthcare"="doctor"](around:{radius_m},{latitude},{longitude});
-      node["healthcare"="clinic"](around:{radius_m},{latitude},{longitude});
-      way["amenity"="hospital"](around:{radius_m},{latitude},{longitude});
-      way["amenity"="clinic"](around:{radius_m},{latitude},{longitude});
-    );
-    out center body 15;
+
+def similarity_from_distance(distance: float, distance_strategy) -> float:
+    """Convert a FAISS distance for unit-length vectors into a 0–1 cosine similarity."""
+    from langchain_community.vectorstores.utils import DistanceStrategy
+    if distance_strategy == DistanceStrategy.MAX_INNER_PRODUCT:
+        cos_sim = float(distance)
+    else:
+        # Squared L2 between unit vectors: ||a - b||² = 2 - 2·cos(a, b)
+        cos_sim = 1.0 - float(distance) / 2.0
+    return round(max(0.0, min(1.0, cos_sim)), 4)
+
+
+class RetrievalContext:
+    """Retrieval state for a single request.
+    
+    Created per call and passed explicitly (or via `current_retrieval_context`
+    for tools), so concurrent requests never share sources through the
+    module-level `rag_service` singleton.
     """
     
-    try:
-        response = requests.post(overpass_url, data={"data": overpass_query}, timeout=20)
-        if response.status_code != 200:
-            logger.error(f"Overpass API error: {response.status_code}")
-            return []
-        
-        data = response.json()
-        elements = data.get("elements", [])
-        
-        doctors = []
-        for el in elements:
-            tags = el.get("tags", {})
-            name = tags.get("name", tags.get("operator", "Healthcare Facility"))
-            
-            # Get coordinates (center for ways)
-            lat = el.get("lat") or el.get("center", {}).get("lat")
-            lon = el.get("lon") or el.get("center", {}).get("lon")
-            
-            if not lat or not lon:
-                continue
-            
-            # Check if specialization matches any tags
-            healthcare_spec = tags.get("healthcare:speciality", "").lower()
-            tag_spec = tags.get("medical_system:speciality", "").lower()
-            
-            # Determine displayed specialization
-            if spec_lower in healthcare_spec or spec_lower in tag_spec:
-                displayed_spec = specialization
-            elif healthcare_spec:
-                displayed_spec = healthcare_spec.replace(";", ", ").title()
-            else:
-                displayed_spec = specialization
-            
-            address_parts = [
-                tags.get("addr:street", ""),
-                tags.get("addr:city", ""),
-                tags.get("addr:postcode", ""),
-            ]
-            address = ", ".join(p for p in address_parts if p) or tags.get("addr:full", "")
-            
-            doctors.append({
-                "name": name,
-                "specialization": displayed_spec,
-                "latitude": float(lat),
-                "longitude": float(lon),
-                "address": address or None,
-                "phone": tags.get("phone") or tags.get("contact:phone") or None,
-            })
-        
-        return doctors[:15]  # Limit results
-        
-    except Exception as e:
-        logger.error(f"Overpass API exception: {e}")
-        return []
-
-
-def geocode_location(location: str) -> tuple:
-    """Geocode a location name to (lat, lng) using Nominatim."""
-    try:
-        url = "https://nominatim.openstreetmap.org/search"
-        params = {"q": location, "format": "json", "limit": 1}
-        headers = {"User-Agent": "TruthTriageHealthApp/1.0"}
-        response = requests.get(url, params=params, headers=headers, timeout=10)
-        if response.status_code == 200 and response.json():
-            data = response.json()[0]
-            return float(data["lat"]), float(data["lon"])
-    except Exception as e:
-        logger.error(f"Geocoding error: {e}")
-    return None, None
+    def __init__(self, query: str, snapshot: "IndexSnapshot" = None):
+        self.query = query
+        # Index generation the request searches, even if a reload swaps in a newer one meanwhile
+        self.snapshot = snapshot
+        self.query_embedding = None
+        self.sources = []
+        self.usage = None
+        # Agent mode only: timed graph steps / tool calls and doctors found by tools
+        self.steps = []
+        self.doctors = None
+
+
+class IndexSnapshot:
+    """One generation of the searchable corpus: vectors, chunks and BM25 index.
+    
+    Swapped as a whole on reload. Requests hold on to the snapshot they started
+    with, so FAISS ids are never resolved against another generation's chunks.
+    """
+    
+    def __init__(self, vectorstore, index_store, cache_fingerprint: str, generation: int):
+        self.vectorstore = vectorstore
+        self.index_store = index_store
+        self.lexical_index = index_store.lexical_index
+        # Answer-cache fingerprint (corpus + prompt + budget) of answers produced from this snapshot
+        self.cache_fingerprint = cache_fingerprint
+        self.generation = generation
+
+
+# Context of the request currently running tools; contextvars are per-task and per-thread
+current_retrieval_context = ContextVar("current_retrieval_context", default=None)
+
+
+def record_step(step_type: str, name: str, started: float, tool_calls: list = None):
+    """Append a timed agent step to the current request's context, if there is one."""
+    context = current_retrieval_context.get()
+    if context is None:
+        return
+    step = {"type": step_type, "name": name, "seconds": round(time.perf_counter() - started, 4)}
+    if tool_calls:
+        step["tool_calls"] = tool_calls
+    context.steps.append(step)
 
 
 class RAGService:
     def __init__(self):
         self.vectorstore = None
         self.qa_chain = None
+        self.llm = None
+        self.prompt = None
         self.embeddings = None
-        self.agent = None
-        self.last_retrieved_sources = []
-        self.initialize_vectorstore()
+        self.index_store = None
+        self.answer_cache = AnswerCache()
+        self.reranker = CrossEncoderReranker() if RERANK else None
+        self._executor = ThreadPoolExecutor(max_workers=EMBEDDING_WORKERS, thread_name_prefix="rag-cpu")
+        self._agent = None
+        self._agent_lock = threading.Lock()
+        # Lifecycle for readiness: not_started -> initializing -> ready | failed
+        self.state = "not_started"
+        self.stage = None
+        self.init_error = None
+        self._init_thread = None
+        # Current IndexSnapshot; `vectorstore` / `index_store` mirror it
+        self.snapshot = None
+        self._source_signature = None
+        self.reload_status = {"status": "idle", "generation": 0, "started": None, "finished": None, "error": None}
+        self._reload_store = None
+        self._reload_thread = None
+        self._reload_pending = False
+        self._reload_lock = threading.Lock()
+        self._watcher_thread = None
     
-    def initialize_vectorstore(self):
-        """Load all PDFs and create vectorstore (runs once when server starts)"""
-        
-        # Resolve data directory relative to this file
-        base_dir = os.path.dirname(os.path.abspath(__file__))
-        data_dir = os.path.join(base_dir, "..", "data")
-        data_dir = os.path.abspath(data_dir)
-        
-        if not os.path.isdir(data_dir):
-            raise FileNotFoundError(f"Data directory not found: {data_dir}")
-        
-        # Load ALL PDFs from the data directory
-        pdf_files = glob.glob(os.path.join(data_dir, "*.pdf"))
-        if not pdf_files:
-            raise FileNotFoundError(f"No PDF files found in: {data_dir}")
-        
-        all_documents = []
-        for pdf_path in pdf_files:
-            try:
-                logger.info(f"Loading PDF: {os.path.basename(pdf_path)}")
-                loader = PyPDFLoader(pdf_path)
-                documents = loader.load()
-                all_documents.extend(documents)
-                logger.info(f"  -> Loaded {len(documents)} pages from {os.path.basename(pdf_path)}")
-            except Exception as e:
-                logger.warning(f"  -> Failed to load {os.path.basename(pdf_path)}: {e}")
-        
-        if not all_documents:
-            raise RuntimeError("No documents were successfully loaded from PDFs")
+    @property
+    def is_ready(self) -> bool:
+        return self.state == "ready"
+    
+    def start_background_init(self):
+        """Initialize on a daemon thread so the server can bind its port immediately."""
+        if self._init_thread is not None:
+            return
+        self.state = "initializing"
+        self._init_thread = threading.Thread(target=self._initialize_safely, name="rag-init", daemon=True)
+        self._init_thread.start()
+    
+    def _initialize_safely(self):
+        if FACILITY_BACKEND != "overpass":
+            # Parse the offline facility file here rather than on the first /doctors request
+            get_facility_index()
+        try:
+            self.initialize_vectorstore()
+            self.stage = None
+            self.state = "ready"
+        except Exception as e:
+            logger.error(f"RAG Service initialization failed: {str(e)}")
+            self.init_error = str(e)
+            self.state = "failed"
+            return
+        if RELOAD_POLL_SECONDS > 0:
+            self.start_reload_watcher()
+    
+    def readiness(self) -> dict:
+        """Initialization state and index progress for `/ready`."""
+        return {
+            "status": self.state,
+            "stage": self.stage,
+            "error": self.init_error,
+            "index": self.index_store.progress if self.index_store else None,
+            "reload": self.reload_status_view(),
+        }
+    
+    def initialize_vectorstore(self, embeddings=None, llm=None, index_store=None):
+        """Load the persisted vectorstore, embedding only new or changed PDFs (runs once when server starts)
         
-        logger.info(f"Total pages loaded: {len(all_documents)}")
+        `embeddings`, `llm` and `index_store` replace the defaults (MiniLM on
+        `EMBEDDING_BACKEND`, Groq, the configured data/index directories); used by
+        the benchmarks.
+        """
+        from embedding_backend import load_embeddings
+        from langchain.chains import RetrievalQA
+        from langchain.prompts import PromptTemplate
+        from langchain_groq import ChatGroq
+        from index_store import IndexStore
+        from snapshot_store import SnapshotStore, SHARED_INDEX
         
-        # Split into chunks
-        text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=1000,
-            chunk_overlap=100
-        )
-        docs = text_splitter.split_documents(all_documents)
-        logger.info(f"Total chunks created: {len(docs)}")
+        # Create embeddings (unit-length, so FAISS distances map directly to cosine similarity)
+        self.stage = "loading_embedding_model"
+        index_key, embedding_info = EMBEDDING_MODEL, None
+        if embeddings is None:
+            embeddings, index_key, embedding_info = load_embeddings(EMBEDDING_MODEL)
+        self.embeddings = embeddings
+        if index_store is None:
+            # SHARED_INDEX: open the snapshot published by ingest.py read-only (mmap) instead of syncing
+            index_store = (
+                SnapshotStore(embedding_model=index_key) if SHARED_INDEX
+                else IndexStore(embedding_model=index_key, embedding_backend=embedding_info)
+            )
+        self.index_store = index_store
         
-        # Create embeddings
-        self.embeddings = HuggingFaceEmbeddings(
-            model_name="all-MiniLM-L6-v2"
-        )
+        # Load the cross-encoder up front so the first request stays inside the rerank budget
+        if self.reranker is not None:
+            self.stage = "loading_reranker"
+            self.reranker.load()
         
-        # Create vectorstore
-        self.vectorstore = FAISS.from_documents(docs, self.embeddings)
+        # Load vectorstore from disk and sync it with the data directory
+        self.stage = "syncing_index"
+        signature = index_store.source_signature()
+        vectorstore = index_store.load_or_build(self.embeddings)
         
         # Initialize LLM
-        groq_key = os.environ.get("GROQ_API_KEY")
-        if not groq_key:
-            raise RuntimeError("GROQ_API_KEY not found in environment variables")
-        
-        custom_llm = ChatGroq(
-            groq_api_key=groq_key,
-            model_name="llama-3.1-8b-instant",
-            temperature=0.0
-        )
+        self.stage = "initializing_llm"
+        custom_llm = llm
+        if custom_llm is None:
+            groq_key = os.environ.get("GROQ_API_KEY")
+            if not groq_key:
+                raise RuntimeError("GROQ_API_KEY not found in environment variables")
+            
+            custom_llm = ChatGroq(
+                groq_api_key=groq_key,
+                model_name="llama-3.1-8b-instant",
+                temperature=0.0
+            )
         
         # Define strict prompt
         prompt_template = """Below is a pharmaceutical safety query submitted to TruthTriage.
@@ -297,88 +309,211 @@ You MUST list ALL medicine names found in the retrieved context. If a medicine n
         PROMPT = PromptTemplate(
             template=prompt_template, input_variables=["context", "question"]
         )
-
+        
+        self.llm = custom_llm
+        self.prompt = PROMPT
+        
         # Create QA chain
-        self.qa_chain = RetrievalQA.from_chain_type(
+        qa_chain = RetrievalQA.from_chain_type(
             llm=custom_llm,
             chain_type='stuff',
-            retriever=self.vectorstore.as_retriever(search_kwargs={"k": 5}),
+            retriever=vectorstore.as_retriever(search_kwargs={"k": RETRIEVAL_K}),
             return_source_documents=True,
             chain_type_kwargs={"prompt": PROMPT}
         )
+        self._swap_snapshot(vectorstore, index_store, signature, qa_chain)
+        self.qa_chain = qa_chain
+        logger.info("RAG Service initialized successfully.")
+    
+    # ─── Hot Reload ───────────────────────────────────────────────────────────
+    
+    def _swap_snapshot(self, vectorstore, index_store, signature, qa_chain=None):
+        """Make a freshly loaded index the one new requests search."""
+        generation = self.snapshot.generation + 1 if self.snapshot else 1
+        # Cached answers are only valid for this exact corpus + prompt + context budget
+        fingerprint = hashlib.sha256(
+            f"{index_store.corpus_fingerprint()}\n{self.prompt.template}\n{CONTEXT_TOKEN_BUDGET}".encode("utf-8")
+        ).hexdigest()
+        snapshot = IndexSnapshot(vectorstore, index_store, fingerprint, generation)
+        
+        # One reference assignment: a request sees either the old snapshot or the new one
+        self.snapshot = snapshot
+        self.vectorstore = vectorstore
+        self.index_store = index_store
+        self._source_signature = signature
+        (qa_chain or self.qa_chain).retriever = vectorstore.as_retriever(search_kwargs={"k": RETRIEVAL_K})
+        self.answer_cache.set_fingerprint(fingerprint)
+        self.reload_status["generation"] = generation
+    
+    def _new_index_store(self):
+        """An empty store of the same kind and configuration as the current one."""
+        from snapshot_store import SnapshotStore
+        current = self.index_store
+        if isinstance(current, SnapshotStore):
+            return SnapshotStore(current.index_dir, current.embedding_model, current.data_dir)
+        return type(current)(current.data_dir, current.index_dir, current.embedding_model, current.embedding_backend)
+    
+    def reload_index(self):
+        """Sync the index with the data directory (or reopen the newest published snapshot) and swap it in.
+        
+        Blocks the calling thread; the current snapshot keeps serving until the swap.
+        """
+        if self.qa_chain is None:
+            raise Exception("RAG system not initialized")
+        
+        self.reload_status.update(status="reloading", started=time.time(), finished=None, error=None)
+        signature = None
+        try:
+            store = self._new_index_store()
+            self._reload_store = store
+            signature = store.source_signature()
+            vectorstore = store.load_or_build(self.embeddings)
+            self._swap_snapshot(vectorstore, store, signature)
+            self.reload_status.update(status="ok", finished=time.time())
+            logger.info(f"Index reloaded: generation {self.snapshot.generation}, {vectorstore.index.ntotal} chunks")
+        except Exception as e:
+            logger.error(f"Index reload failed, still serving generation {self.snapshot.generation}: {str(e)}")
+            self.reload_status.update(status="failed", finished=time.time(), error=str(e))
+            # The watcher retries once the source changes again, not on every poll
+            if signature is not None:
+                self._source_signature = signature
+        finally:
+            self._reload_store = None
+    
+    def request_reload(self) -> dict:
+        """Reload in the background. A request during a reload queues exactly one more run."""
+        with self._reload_lock:
+            if self._reload_thread is not None:
+                self._reload_pending = True
+            else:
+                self._reload_thread = threading.Thread(target=self._reload_loop, name="rag-reload", daemon=True)
+                self._reload_thread.start()
+        return self.reload_status_view()
+    
+    def _reload_loop(self):
+        while True:
+            self.reload_index()
+            with self._reload_lock:
+                if not self._reload_pending:
+                    self._reload_thread = None
+                    return
+                self._reload_pending = False
+    
+    def reload_status_view(self) -> dict:
+        """Reload state for `/ready` and `/admin/reload`, with index progress while reloading."""
+        store = self._reload_store
+        return dict(self.reload_status, pending=self._reload_pending, progress=store.progress if store else None)
+    
+    def start_reload_watcher(self, interval: float = RELOAD_POLL_SECONDS):
+        """Poll the index source and reload when it changes (PDFs in data/, or a newly published snapshot)."""
+        if self._watcher_thread is not None:
+            return
+        
+        def watch():
+            while True:
+                time.sleep(interval)
+                try:
+                    changed = self.index_store.source_signature() != self._source_signature
+                except OSError as e:
+                    logger.warning(f"Reload watcher could not check the index source: {e}")
+                    continue
+                if changed and self._reload_thread is None:
+                    logger.info("Index source changed, reloading")
+                    self.request_reload()
+        
+        self._watcher_thread = threading.Thread(target=watch, name="rag-reload-watcher", daemon=True)
+        self._watcher_thread.start()
+    
+    def documents(self) -> list:
+        """PDFs in the snapshot currently being served."""
+        if self.snapshot is None:
+            return []
+        return [
+            {"name": os.path.basename(rel_path), "status": "loaded", "pages": entry.get("pages"),
+             "chunks": len(entry.get("chunk_ids", []))}
+            for rel_path, entry in sorted(self.snapshot.index_store.manifest["files"].items())
+        ]
+    
+    @property
+    def agent(self):
+        """LangGraph ReAct agent over the tools; built on first use since `get_answer` doesn't need it."""
+        if self._agent is None:
+            with self._agent_lock:
+                if self._agent is None:
+                    self._agent = self._build_agent()
+        return self._agent
+    
+    def _build_agent(self):
+        """Define the agent's tools and create the ReAct agent.
+        
+        Tools are coroutines, so when the model requests several in one turn
+        LangGraph's ToolNode runs them concurrently (`agent.ainvoke` / `astream`).
+        They reuse the answer, retrieval and geo caches of the non-agent paths.
+        """
+        from langchain_core.tools import tool
+        from langgraph.prebuilt import create_react_agent
+        
+        if self.llm is None:
+            raise Exception("RAG system not initialized")
     
         # ─── Tools Setup ───────────────────────────────────────────────────
         
         @tool
-        def medical_safety_qa_tool(medical_query: str) -> str:
+        async def medical_safety_qa_tool(medical_query: str) -> str:
             """
             Use this tool to search for medical information, drug safety, pharmaceutical guidelines,
             and health risk assessments. Always use this tool for answering health-related questions.
             """
-            result = self.qa_chain.invoke({"query": medical_query})
-            
-            source_documents = result.get("source_documents", [])
-            self.last_retrieved_sources = []
-            
-            # Compute similarity scores
+            started = time.perf_counter()
             try:
-                query_embedding = np.array(self.embeddings.embed_query(medical_query))
-                for doc in source_documents:
-                    doc_embedding = np.array(self.embeddings.embed_query(doc.page_content[:500]))
-                    # Cosine similarity
-                    cos_sim = float(np.dot(query_embedding, doc_embedding) / 
-                                   (np.linalg.norm(query_embedding) * np.linalg.norm(doc_embedding) + 1e-8))
-                    similarity_score = round(max(0.0, min(1.0, cos_sim)), 4)
-                    
-                    self.last_retrieved_sources.append({
-                        "content": doc.page_content[:300],
-                        "metadata": doc.metadata,
-                        "similarity_score": similarity_score
-                    })
-            except Exception as e:
-                logger.warning(f"Similarity computation failed: {e}")
-                for doc in source_documents:
-                    self.last_retrieved_sources.append({
-                        "content": doc.page_content[:300],
-                        "metadata": doc.metadata,
-                        "similarity_score": None
-                    })
-            
-            # Sort by similarity (highest first)
-            self.last_retrieved_sources.sort(
-                key=lambda x: x.get("similarity_score") or 0, reverse=True
-            )
-                
-            return result["result"]
+                # Same cached retrieve + generate path as /chat
+                result = await self.aget_answer(medical_query)
+                # Sources go to the context of the request that invoked the tool, if any
+                context = current_retrieval_context.get()
+                if context is not None:
+                    context.sources.extend(result["sources"])
+                return result["answer"]
+            finally:
+                record_step("tool", "medical_safety_qa_tool", started)
 
         @tool
-        def find_specialist_doctors(location: str, medical_condition: str = "general") -> str:
+        async def find_specialist_doctors(location: str, medical_condition: str = "general") -> str:
             """
             Finds specialist doctors and healthcare facilities near a given location.
             Uses OpenStreetMap data. Provide the city/area name and the medical condition.
             """
+            started = time.perf_counter()
             try:
                 specialization = detect_specialization(medical_condition)
-                lat, lon = geocode_location(location)
+                lat, lon = await ageocode_location(location)
                 
                 if lat is None or lon is None:
                     return f"Could not find coordinates for '{location}'. Please provide a valid city name."
                 
-                doctors = find_doctors_overpass(lat, lon, specialization)
+                doctors = await afind_doctors_overpass(lat, lon, specialization)
+                context = current_retrieval_context.get()
+                if context is not None:
+                    context.doctors = doctors
                 
                 if not doctors:
                     # Fallback: try Nominatim search
-                    url = "https://nominatim.openstreetmap.org/search"
                     params = {
                         "q": f"{specialization} doctor in {location}",
                         "format": "json",
                         "limit": 5
                     }
-                    headers = {"User-Agent": "TruthTriageHealthApp/1.0"}
-                    response = requests.get(url, params=params, headers=headers, timeout=10)
-                    
-                    if response.status_code == 200 and response.json():
+                    try:
+                        with STAGE_SECONDS.labels("geocode").time():
+                            response = await get_async_client().get(NOMINATIM_URL, params=params, timeout=10)
+                        if response.status_code != 200:
+                            raise RuntimeError(f"Nominatim error: {response.status_code}")
                         data = response.json()
+                    except Exception as e:
+                        STAGE_ERRORS.labels("geocode").inc()
+                        logger.error(f"Nominatim facility search error: {e}")
+                        data = []
+                    
+                    if data:
                         facilities = [f"- {place.get('display_name', 'Unknown')}" for place in data]
                         return (f"Recommended specialist: **{specialization.title()}**\n"
                                 f"Facilities near {location}:\n" + "\n".join(facilities))
@@ -401,18 +536,23 @@ You MUST list ALL medicine names found in the retrieved context. If a medicine n
                 
             except Exception as e:
                 return f"Error finding specialists: {str(e)}"
+            finally:
+                record_step("tool", "find_specialist_doctors", started)
 
         @tool
-        def suggest_medicine(medical_query: str) -> str:
+        async def suggest_medicine(medical_query: str) -> str:
             """
             Use this tool to suggest medicines related to a medical condition.
             Searches verified medical sources for medicine names, dosages, and usage.
             Only returns information found in trusted documents.
             """
+            started = time.perf_counter()
             try:
                 # Search vectorstore for medicine-related content
-                retriever = self.vectorstore.as_retriever(search_kwargs={"k": 5})
-                docs = retriever.invoke(f"medicine treatment for {medical_query}")
+                search_query = f"medicine treatment for {medical_query}"
+                vector = await self._run_blocking(self._embed_query, search_query)
+                hits = (await self._run_blocking(self._retrieve, [search_query], [vector]))[0]
+                docs = [doc for doc, _ in hits]
                 
                 if not docs:
                     return "No medicine information found in verified sources for this query."
@@ -428,15 +568,17 @@ You MUST list ALL medicine names found in the retrieved context. If a medicine n
                         "\n\n---\n\n".join(medicine_texts))
             except Exception as e:
                 return f"Error searching medicines: {str(e)}"
+            finally:
+                record_step("tool", "suggest_medicine", started)
 
         @tool
-        def emergency_call_tool() -> str:
+        async def emergency_call_tool() -> str:
             """
             Place an emergency call to the safety helpline's phone number.
             Use this ONLY if the user expresses suicidal ideation, intent to self-harm,
             or describes a medical emergency requiring immediate life-saving help.
             """
-            print("🚨 INITIATING EMERGENCY PROTOCOL 🚨")
+            logger.warning("Agent invoked the emergency call tool")
             return ("Emergency protocol activated. A crisis support representative is being contacted. "
                     "Please stay on the line or immediately call your local emergency number "
                     "(e.g., 911, 112, 108).")
@@ -448,7 +590,7 @@ You are TruthTriage — a SPECIALIZED medical and pharmaceutical safety AI assis
 You are helpful, thorough, and always provide actionable medical information.
 
 CRITICAL RULES:
-1. Call a tool ONCE per user message, then IMMEDIATELY compose your final detailed response.
+1. Request ALL the tools you need for a user message in ONE turn (they run in parallel), then IMMEDIATELY compose your final detailed response.
 2. NEVER refuse to help. Always use the `medical_safety_qa_tool` to find relevant information.
 3. After getting tool output, present the information clearly with medicine suggestions and specialist recommendations.
 4. Your response MUST be detailed and structured — include risk levels, medicines, specialist type, and precautions.
@@ -467,9 +609,65 @@ When responding after using `medical_safety_qa_tool`:
 """
         
         # Initialize LangGraph Agent
-        self.agent = create_react_agent(custom_llm, tools=tools, state_modifier=system_prompt)
-        self.last_retrieved_sources = []
-        logger.info("RAG Service initialized successfully with all tools.")
+        agent = create_react_agent(self.llm, tools=tools, state_modifier=system_prompt)
+        logger.info("ReAct agent initialized with all tools.")
+        return agent
+    
+    async def aget_agent_answer(self, query: str, max_steps: int = AGENT_MAX_STEPS,
+                                timeout: float = AGENT_TIMEOUT) -> dict:
+        """Answer with the ReAct agent for `/chat/agent`.
+        
+        Runs at most `max_steps` graph steps (LangGraph recursion limit) and
+        `timeout` seconds of wall-clock time; when either cap is hit the last
+        model message is returned and `stopped` says which. Every graph step
+        and tool call is timed in `steps`.
+        """
+        from langchain_core.messages import AIMessage
+        from langgraph.errors import GraphRecursionError
+        
+        if self.qa_chain is None:
+            raise Exception("RAG system not initialized")
+        
+        context = RetrievalContext(query, self.snapshot)
+        messages = []
+        stopped = None
+        
+        async def run():
+            last = time.perf_counter()
+            async for update in self.agent.astream(
+                {"messages": [("user", query)]},
+                config={"recursion_limit": max_steps},
+                stream_mode="updates"
+            ):
+                for node, output in update.items():
+                    new_messages = (output or {}).get("messages", [])
+                    messages.extend(new_messages)
+                    tool_calls = [call["name"] for m in new_messages for call in getattr(m, "tool_calls", None) or []]
+                    record_step("llm" if node == "agent" else node, node, last, tool_calls or None)
+                last = time.perf_counter()
+        
+        # Tools find the request's context through the contextvar, copied into every task the graph spawns
+        token = current_retrieval_context.set(context)
+        try:
+            await asyncio.wait_for(run(), timeout)
+        except asyncio.TimeoutError:
+            stopped = "timeout"
+        except GraphRecursionError:
+            stopped = "max_steps"
+        finally:
+            current_retrieval_context.reset(token)
+        
+        ai_messages = [m for m in messages if isinstance(m, AIMessage) and m.content]
+        if ai_messages:
+            final_response = ai_messages[-1].content
+        else:
+            final_response = "The agent could not complete this query in time. Please try again or use /chat."
+        if stopped:
+            logger.warning(f"Agent stopped early ({stopped}) after {len(context.steps)} steps")
+        
+        result = self._finalize_answer(context, final_response, detect_specialization(query))
+        result.update(steps=context.steps, doctors=context.doctors, stopped=stopped)
+        return result
     
     def get_answer(self, query: str):
         """Get answer using the QA chain directly for reliable, detailed responses."""
@@ -477,8 +675,8 @@ When responding after using `medical_safety_qa_tool`:
         if self.qa_chain is None:
             raise Exception("RAG system not initialized")
             
-        # Clear previous sources
-        self.last_retrieved_sources = []
+        # Request-scoped state: nothing per-request is stored on the shared service
+        context = RetrievalContext(query, self.snapshot)
         
         # Detect specialist type from query
         specialist_type = detect_specialization(query)
@@ -486,193 +684,442 @@ When responding after using `medical_safety_qa_tool`:
         final_response = "I couldn't process that query."
         
         try:
-            # Use QA chain directly — no agent loop, reliable structured output
-            result = self.qa_chain.invoke({"query": query})
-            final_response = result.get("result", "No answer generated.")
+            # Exact or near-duplicate question answered recently: skip retrieval + LLM
+            cached, context.query_embedding = self.answer_cache.lookup(query, self._embed_query)
+            if cached is not None:
+                cached["specialist_type"] = specialist_type
+                return cached
             
-            # Process source documents with similarity scores
-            source_documents = result.get("source_documents", [])
-            if source_documents:
-                query_embedding = np.array(self.embeddings.embed_query(query))
-                
-                for doc in source_documents:
-                    doc_embedding = np.array(self.embeddings.embed_query(doc.page_content[:500]))
-                    cos_sim = float(np.dot(query_embedding, doc_embedding) / 
-                                   (np.linalg.norm(query_embedding) * np.linalg.norm(doc_embedding) + 1e-8))
-                    similarity_score = round(max(0.0, min(1.0, cos_sim)), 4)
-                    
-                    self.last_retrieved_sources.append({
-                        "content": doc.page_content[:300],
-                        "metadata": doc.metadata,
-                        "similarity_score": similarity_score
-                    })
-                
-                # Sort by similarity
-                self.last_retrieved_sources.sort(key=lambda x: x.get("similarity_score", 0), reverse=True)
+            # The query embedding is reused for retrieval; FAISS scores double as source similarity
+            hits = self._retrieve([query], [context.query_embedding], snapshot=context.snapshot)[0]
+            context.sources = self._build_sources(hits)
+            
+            # Use the QA chain's prompt + LLM directly — no agent loop, reliable structured output
+            final_response = self._generate(query, self._build_context(context, query, hits))
                                 
         except Exception as e:
             logger.error(f"QA chain error: {str(e)}")
             final_response = f"Error processing query: {str(e)}"
+            context.query_embedding = None  # never cache failures
 
+        return self._finalize_answer(context, final_response, specialist_type)
+    
+    async def aget_answer(self, query: str):
+        """Async `get_answer`: embedding and FAISS run on the bounded executor, the LLM call is awaited."""
+        
+        if self.qa_chain is None:
+            raise Exception("RAG system not initialized")
+            
+        context = RetrievalContext(query, self.snapshot)
+        specialist_type = detect_specialization(query)
+        
+        final_response = "I couldn't process that query."
+        
+        try:
+            cached, context.query_embedding = await self._run_blocking(
+                self.answer_cache.lookup, query, self._embed_query
+            )
+            if cached is not None:
+                cached["specialist_type"] = specialist_type
+                return cached
+            
+            hits = (await self._run_blocking(
+                self._retrieve, [query], [context.query_embedding], RETRIEVAL_K, context.snapshot
+            ))[0]
+            context.sources = self._build_sources(hits)
+            
+            docs = await self._run_blocking(self._build_context, context, query, hits)
+            final_response = await self._agenerate(query, docs)
+                                
+        except Exception as e:
+            logger.error(f"QA chain error: {str(e)}")
+            final_response = f"Error processing query: {str(e)}"
+            context.query_embedding = None  # never cache failures
+        
+        return self._finalize_answer(context, final_response, specialist_type)
+    
+    def get_answers(self, queries: list) -> list:
+        """Answer many queries at once (sync wrapper around `aget_answers` for scripts)."""
+        return asyncio.run(self.aget_answers(queries))
+    
+    async def aget_answers(self, queries: list, max_concurrency: int = BATCH_LLM_CONCURRENCY) -> list:
+        """Answer a batch of queries for `/chat/batch`.
+        
+        All cache misses are embedded in one batched call and searched with one
+        multi-query FAISS search; LLM calls then fan out with bounded concurrency.
+        Returns one `{"query", "result", "error"}` dict per query, in order; a
+        failing item sets `error` without affecting the others.
+        """
+        
+        if self.qa_chain is None:
+            raise Exception("RAG system not initialized")
+        
+        snapshot = self.snapshot
+        contexts = [RetrievalContext(query, snapshot) for query in queries]
+        items = [{"query": query, "result": None, "error": None} for query in queries]
+        
+        # Exact cache hits need no embedding at all
+        pending = []
+        for i, context in enumerate(contexts):
+            cached = self.answer_cache.get_exact(context.query)
+            if cached is not None:
+                cached["specialist_type"] = detect_specialization(context.query)
+                items[i]["result"] = cached
+            else:
+                pending.append(i)
+        
+        if pending:
+            try:
+                vectors = await self._run_blocking(
+                    self._embed_queries, [contexts[i].query for i in pending]
+                )
+            except Exception as e:
+                logger.error(f"Batch embedding error: {str(e)}")
+                for i in pending:
+                    items[i]["error"] = f"Error processing query: {str(e)}"
+                return items
+            
+            # Semantic cache hits, then one FAISS search for everything left
+            to_search = []
+            for i, vector in zip(pending, vectors):
+                contexts[i].query_embedding = vector
+                cached = self.answer_cache.get_similar(vector)
+                if cached is not None:
+                    cached["specialist_type"] = detect_specialization(contexts[i].query)
+                    items[i]["result"] = cached
+                else:
+                    to_search.append(i)
+            
+            if to_search:
+                try:
+                    all_hits = await self._run_blocking(
+                        self._retrieve,
+                        [contexts[i].query for i in to_search],
+                        [contexts[i].query_embedding for i in to_search],
+                        RETRIEVAL_K,
+                        snapshot,
+                        # Thousands of queries would hold the reranker's single worker and starve /chat
+                        False
+                    )
+                except Exception as e:
+                    logger.error(f"Batch retrieval error: {str(e)}")
+                    for i in to_search:
+                        items[i]["error"] = f"Error processing query: {str(e)}"
+                    return items
+                if self.reranker is not None:
+                    # Not reranked, so keep these answers out of the cache /chat reads from
+                    for i in to_search:
+                        contexts[i].query_embedding = None
+                
+                semaphore = asyncio.Semaphore(max_concurrency)
+                
+                async def answer(i: int, hits: list):
+                    context = contexts[i]
+                    context.sources = self._build_sources(hits)
+                    try:
+                        docs = await self._run_blocking(self._build_context, context, context.query, hits)
+                        async with semaphore:
+                            final_response = await self._agenerate(context.query, docs)
+                        items[i]["result"] = self._finalize_answer(
+                            context, final_response, detect_specialization(context.query)
+                        )
+                    except Exception as e:
+                        logger.error(f"Batch item {i} error: {str(e)}")
+                        items[i]["error"] = f"Error processing query: {str(e)}"
+                
+                await asyncio.gather(*(answer(i, hits) for i, hits in zip(to_search, all_hits)))
+        
+        return items
+    
+    async def astream_answer(self, query: str):
+        """Stream an answer as events for `/chat/stream`.
+        
+        Yields a `sources` event (retrieved sources + specialist type) as soon as
+        retrieval finishes, then `token` events as the LLM produces them, and a
+        final `done` event with the extracted medicines. Failures yield `error`.
+        """
+        
+        if self.qa_chain is None:
+            raise Exception("RAG system not initialized")
+        
+        context = RetrievalContext(query, self.snapshot)
+        specialist_type = detect_specialization(query)
+        
+        try:
+            cached, context.query_embedding = await self._run_blocking(
+                self.answer_cache.lookup, query, self._embed_query
+            )
+            if cached is not None:
+                yield {"type": "sources", "sources": cached["sources"], "specialist_type": specialist_type}
+                yield {"type": "token", "content": cached["answer"]}
+                yield {"type": "done", "medicines": cached["medicines"], "usage": cached.get("usage")}
+                return
+            
+            hits = (await self._run_blocking(
+                self._retrieve, [query], [context.query_embedding], RETRIEVAL_K, context.snapshot
+            ))[0]
+            context.sources = self._build_sources(hits)
+            docs = await self._run_blocking(self._build_context, context, query, hits)
+        except Exception as e:
+            logger.error(f"Retrieval error: {str(e)}")
+            yield {"type": "error", "detail": f"Error processing query: {str(e)}"}
+            return
+        
+        yield {"type": "sources", "sources": context.sources, "specialist_type": specialist_type}
+        
+        answer_parts = []
+        started = time.perf_counter()
+        try:
+            prompt = self._format_prompt(query, docs)
+            async for chunk in self.llm.astream(prompt):
+                if chunk.content:
+                    if not answer_parts:
+                        STAGE_SECONDS.labels("llm_first_token").observe(time.perf_counter() - started)
+                    answer_parts.append(chunk.content)
+                    yield {"type": "token", "content": chunk.content}
+        except Exception as e:
+            STAGE_ERRORS.labels("llm").inc()
+            logger.error(f"LLM streaming error: {str(e)}")
+            yield {"type": "error", "detail": f"Error processing query: {str(e)}"}
+            context.query_embedding = None  # never cache partial answers
+        STAGE_SECONDS.labels("llm").observe(time.perf_counter() - started)
+        
+        result = self._finalize_answer(context, "".join(answer_parts), specialist_type)
+        yield {"type": "done", "medicines": result["medicines"], "usage": result["usage"]}
+    
+    def _format_prompt(self, query: str, docs: list) -> str:
+        """Render the QA prompt exactly as the `stuff` chain would."""
+        context = "\n\n".join(doc.page_content for doc in docs)
+        return self.prompt.format(context=context, question=query)
+    
+    @timed("build_context")
+    def _build_context(self, context: "RetrievalContext", query: str, hits: list) -> list:
+        """Fit the retrieved chunks into the context token budget and record token usage."""
+        lexical_index = context.snapshot.lexical_index if context.snapshot else None
+        docs, usage = build_context(query, hits, lexical_index)
+        usage["prompt_tokens"] = estimate_tokens(self._format_prompt(query, docs))
+        context.usage = usage
+        return docs
+    
+    def _finalize_answer(self, context: "RetrievalContext", final_response: str, specialist_type: str) -> dict:
+        """Attach medicines to a generated answer and store it in the answer cache."""
         # Parse medicine suggestions from the response text
         medicines = self._extract_medicines(final_response)
         
         # Fallback: extract medicines directly from source documents
-        if not medicines and self.last_retrieved_sources:
-            medicines = self._extract_medicines_from_sources()
+        if not medicines and context.sources:
+            medicines = self._extract_medicines_from_sources(context.sources)
+        
+        if context.usage:
+            for kind in ("retrieved", "context", "prompt"):
+                LLM_TOKENS.labels(kind).inc(context.usage[f"{kind}_tokens"])
+            LLM_TOKENS.labels("completion").inc(estimate_tokens(final_response))
 
-        return {
+        result = {
             "answer": final_response,
-            "sources": self.last_retrieved_sources,
+            "sources": context.sources,
             "medicines": medicines if medicines else None,
-            "specialist_type": specialist_type
+            "specialist_type": specialist_type,
+            "usage": context.usage
         }
+        if context.query_embedding is not None:
+            self.answer_cache.put(
+                context.query, context.query_embedding, result,
+                fingerprint=context.snapshot.cache_fingerprint if context.snapshot else None
+            )
+        return result
+    
+    async def _run_blocking(self, func, *args):
+        """Run CPU-bound work (embedding, FAISS search) on the bounded executor."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, func, *args)
+    
+    @timed("embed_query")
+    def _embed_query(self, query: str) -> list:
+        return self.embeddings.embed_query(query)
+    
+    @timed("embed_query_batch")
+    def _embed_queries(self, queries: list) -> list:
+        return self.embeddings.embed_documents(queries)
+    
+    def _dense_search(self, snapshot: IndexSnapshot, query_vectors, k: int) -> list:
+        """One FAISS search for a batch of query vectors.
+        
+        Returns, per query, (faiss_id, similarity_score) pairs best first, using the
+        distances FAISS computed during the search instead of re-embedding chunks.
+        """
+        vectors = np.asarray(query_vectors, dtype=np.float32)
+        if vectors.ndim == 1:
+            vectors = vectors.reshape(1, -1)
+        
+        vectorstore = snapshot.vectorstore
+        distances, indices = vectorstore.index.search(vectors, k)
+        
+        return [
+            [
+                (int(i), similarity_from_distance(distance, vectorstore.distance_strategy))
+                for distance, i in zip(row_distances, row_indices)
+                if i != -1  # fewer than k vectors in the index
+            ]
+            for row_distances, row_indices in zip(distances, indices)
+        ]
+    
+    def _doc_at(self, snapshot: IndexSnapshot, faiss_id: int):
+        vectorstore = snapshot.vectorstore
+        return vectorstore.docstore.search(vectorstore.index_to_docstore_id[faiss_id])
+    
+    def _search_by_vectors(self, query_vectors, k: int = RETRIEVAL_K, snapshot: IndexSnapshot = None) -> list:
+        """Dense-only search. Returns one list of (Document, similarity_score) pairs per query."""
+        snapshot = snapshot or self.snapshot
+        return [
+            [(self._doc_at(snapshot, i), score) for i, score in hits]
+            for hits in self._dense_search(snapshot, query_vectors, k)
+        ]
+    
+    def _retrieve(self, queries: list, query_vectors, k: int = RETRIEVAL_K, snapshot: IndexSnapshot = None,
+                  rerank: bool = True) -> list:
+        """Retrieve k chunks per query: hybrid candidates, reranked by the cross-encoder if enabled.
+        
+        With reranking, `RERANK_CANDIDATES` candidates are fetched per query and
+        the cross-encoder picks the best k. Returns one list of
+        (Document, similarity_score) pairs per query, best first. Searches
+        `snapshot`, or the current index if none is given.
+        """
+        snapshot = snapshot or self.snapshot
+        if self.reranker is None or not rerank:
+            return self._retrieve_candidates(snapshot, queries, query_vectors, k)
+        candidates = self._retrieve_candidates(snapshot, queries, query_vectors, max(k, RERANK_CANDIDATES))
+        with STAGE_SECONDS.labels("rerank").time():
+            return self.reranker.rerank(queries, candidates, k)
     
+    @timed("retrieve")
+    def _retrieve_candidates(self, snapshot: IndexSnapshot, queries: list, query_vectors, k: int = RETRIEVAL_K) -> list:
+        """Hybrid retrieval: FAISS and BM25 candidates fused with reciprocal-rank fusion.
+        
+        Exact drug names, brands and doses that MiniLM embeds poorly are caught by
+        BM25, so a small k still finds them. Returns one list of
+        (Document, similarity_score) pairs per query, in fused order.
+        """
+        lexical_index = snapshot.lexical_index if HYBRID_SEARCH else None
+        if lexical_index is None:
+            return self._search_by_vectors(query_vectors, k, snapshot)
+        
+        n_candidates = k * HYBRID_CANDIDATE_FACTOR
+        vectors = np.asarray(query_vectors, dtype=np.float32).reshape(len(queries), -1)
+        
+        results = []
+        for query, vector, dense_hits in zip(queries, vectors, self._dense_search(snapshot, vectors, n_candidates)):
+            similarity = dict(dense_hits)
+            lexical_ids = [i for i, _ in lexical_index.search(query, n_candidates)]
+            fused = reciprocal_rank_fusion([list(similarity), lexical_ids], k, rrf_k=RRF_K)
+            
+            # Lexical-only hits have no FAISS distance: score them against their stored vectors
+            missing = [i for i in fused if i not in similarity]
+            if missing:
+                try:
+                    stored = np.vstack([snapshot.vectorstore.index.reconstruct(i) for i in missing])
+                    for i, cos_sim in zip(missing, stored @ vector):
+                        similarity[i] = round(max(0.0, min(1.0, float(cos_sim))), 4)
+                except RuntimeError:  # index type without reconstruct support
+                    pass
+            
+            results.append([(self._doc_at(snapshot, i), similarity.get(i)) for i in fused])
+        return results
+    
+    def _build_sources(self, hits: list) -> list:
+        """Turn retrieval hits into the `Source` dicts returned by the API, best first."""
+        sources = [
+            {
+                "content": doc.page_content[:300],
+                "metadata": doc.metadata,
+                "similarity_score": similarity_score
+            }
+            for doc, similarity_score in hits
+        ]
+        sources.sort(key=lambda x: x.get("similarity_score") or 0, reverse=True)
+        return sources
+    
+    @timed("llm")
+    def _generate(self, query: str, docs: list) -> str:
+        """Run the QA chain's stuff prompt + LLM over already-retrieved documents."""
+        result = self.qa_chain.combine_documents_chain.invoke(
+            {"input_documents": docs, "question": query}
+        )
+        return result.get("output_text", "No answer generated.")
+    
+    @timed("llm")
+    async def _agenerate(self, query: str, docs: list) -> str:
+        """Async `_generate`: awaits the LLM over HTTP instead of blocking a thread."""
+        result = await self.qa_chain.combine_documents_chain.ainvoke(
+            {"input_documents": docs, "question": query}
+        )
+        return result.get("output_text", "No answer generated.")
+    
+    @timed("extract_medicines")
     def _extract_medicines(self, text: str) -> list:
         """Extract medicine names from the response text using multiple patterns."""
         medicines = []
         seen_names = set()
         
-        # Section headers to filter out
-        headers = {'risk level', 'condition analysis', 'recommended specialist',
-                   'suggested medicines', 'precautions', 'recommendation',
-                   'medicine name', 'note', 'important', 'warning', 'low', 
-                   'moderate', 'high', 'query', 'response', 'retrieved context'}
-        
-        # Pattern 1: **MedicineName** — usage
-        pattern1 = r'\*\*([A-Za-z][A-Za-z\s\-\/\(\)0-9]+?)\*\*\s*[—\-–:]+\s*(.+?)(?:\n|$)'
-        for name, usage in re.findall(pattern1, text):
-            name = name.strip()
-            if name.lower() in headers:
-                continue
-            if 2 < len(name) < 60 and name.lower() not in seen_names:
-                seen_names.add(name.lower())
-                medicines.append({
-                    "name": name,
-                    "usage": usage.strip()[:200],
-                    "source": "Verified Sources"
-                })
-        
-        # Pattern 2: - MedicineName: usage or - MedicineName (usage)
-        pattern2 = r'[-•\*]\s+([A-Z][A-Za-z\s\-\/]+?)\s*[:\(]\s*(.+?)(?:\)|\n|$)'
-        for name, usage in re.findall(pattern2, text):
-            name = name.strip()
-            if name.lower() in headers:
-                continue
-            if 2 < len(name) < 60 and name.lower() not in seen_names:
-                seen_names.add(name.lower())
-                medicines.append({
-                    "name": name,
-                    "usage": usage.strip()[:200],
-                    "source": "Verified Sources"
-                })
-        
-        # Pattern 3: numbered list: 1. MedicineName - usage
-        pattern3 = r'\d+\.\s+\*?\*?([A-Z][A-Za-z\s\-\/]+?)\*?\*?\s*[-–—:]\s*(.+?)(?:\n|$)'
-        for name, usage in re.findall(pattern3, text):
-            name = name.strip()
-            if name.lower() in headers:
-                continue
-            if 2 < len(name) < 60 and name.lower() not in seen_names:
-                seen_names.add(name.lower())
-                medicines.append({
-                    "name": name,
-                    "usage": usage.strip()[:200],
-                    "source": "Verified Sources"
-                })
+        for pattern in ANSWER_MEDICINE_PATTERNS:
+            for name, usage in pattern.findall(text):
+                name = name.strip()
+                if name.lower() in ANSWER_SECTION_HEADERS:
+                    continue
+                if 2 < len(name) < 60 and name.lower() not in seen_names:
+                    seen_names.add(name.lower())
+                    medicines.append({
+                        "name": name,
+                        "usage": usage.strip()[:200],
+                        "source": "Verified Sources"
+                    })
         
         return medicines
     
-    def _extract_medicines_from_sources(self) -> list:
+    @timed("extract_medicines_fallback")
+    def _extract_medicines_from_sources(self, sources: list) -> list:
         """Fallback: Extract medicine/drug names directly from retrieved source documents."""
         medicines = []
         seen_names = set()
+        matcher = get_medicine_matcher()
         
-        # Known common medicine names to look for in source text
-        known_medicines = [
-            'paracetamol', 'acetaminophen', 'aspirin', 'ibuprofen', 'naproxen',
-            'diclofenac', 'warfarin', 'heparin', 'metformin', 'insulin',
-            'amoxicillin', 'azithromycin', 'ciprofloxacin', 'doxycycline',
-            'metronidazole', 'cephalexin', 'penicillin', 'erythromycin',
-            'omeprazole', 'pantoprazole', 'ranitidine', 'famotidine',
-            'atorvastatin', 'rosuvastatin', 'simvastatin', 'losartan',
-            'amlodipine', 'enalapril', 'lisinopril', 'ramipril',
-            'metoprolol', 'atenolol', 'propranolol', 'carvedilol',
-            'hydrochlorothiazide', 'furosemide', 'spironolactone',
-            'prednisolone', 'prednisone', 'dexamethasone', 'hydrocortisone',
-            'salbutamol', 'albuterol', 'montelukast', 'fluticasone',
-            'cetirizine', 'loratadine', 'fexofenadine', 'chlorpheniramine',
-            'morphine', 'codeine', 'tramadol', 'fentanyl',
-            'diazepam', 'lorazepam', 'alprazolam', 'clonazepam',
-            'sertraline', 'fluoxetine', 'escitalopram', 'paroxetine',
-            'gabapentin', 'pregabalin', 'carbamazepine', 'valproate',
-            'phenytoin', 'levetiracetam', 'lamotrigine',
-            'levothyroxine', 'carbimazole', 'propylthiouracil',
-            'clopidogrel', 'ticagrelor', 'rivaroxaban', 'apixaban',
-            'enoxaparin', 'dabigatran', 'methotrexate', 'hydroxychloroquine',
-            'sulfasalazine', 'cyclophosphamide', 'azathioprine',
-            'tacrolimus', 'cyclosporine', 'mycophenolate',
-            'ciprofloxacin', 'levofloxacin', 'moxifloxacin',
-            'fluconazole', 'ketoconazole', 'clotrimazole',
-            'acyclovir', 'oseltamivir', 'tenofovir', 'zidovudine',
-            'artemether', 'lumefantrine', 'chloroquine', 'quinine',
-            'albendazole', 'mebendazole', 'ivermectin', 'praziquantel',
-            'ondansetron', 'domperidone', 'metoclopramide', 'loperamide',
-            'digoxin', 'amiodarone', 'verapamil', 'diltiazem',
-            'nitroglycerin', 'isosorbide', 'nifedipine', 'telmisartan',
-            'glimepiride', 'glipizide', 'gliclazide', 'pioglitazone',
-            'sitagliptin', 'vildagliptin', 'empagliflozin', 'dapagliflozin',
-            'vitamin', 'calcium', 'iron', 'folic acid', 'zinc',
-        ]
-        
-        for source in self.last_retrieved_sources:
+        for source in sources:
             content = source.get('content', '')
             if not content:
                 continue
             
             source_name = os.path.basename(source.get('metadata', {}).get('source', 'Unknown'))
-            content_lower = content.lower()
             
-            # Look for known medicine names in source content
-            for med_name in known_medicines:
-                if med_name in content_lower and med_name not in seen_names:
-                    seen_names.add(med_name)
-                    
-                    # Extract context around the medicine name
-                    idx = content_lower.find(med_name)
-                    start = max(0, idx - 20)
-                    end = min(len(content), idx + len(med_name) + 100)
-                    context = content[start:end].strip()
-                    # Clean up context
-                    context = context.replace('\n', ' ').strip()
-                    
-                    medicines.append({
-                        "name": med_name.title(),
-                        "usage": context[:200],
-                        "source": source_name
-                    })
+            # One pass over the content finds every formulary name, with offsets
+            for start, end, _, canonical in matcher.finditer(content):
+                if canonical in seen_names:
+                    continue
+                seen_names.add(canonical)
+                
+                # Extract context around the medicine name
+                context = content[max(0, start - 20):min(len(content), end + 100)]
+                context = context.replace('\n', ' ').strip()
+                
+                medicines.append({
+                    "name": canonical.title(),
+                    "usage": context[:200],
+                    "source": source_name
+                })
             
             # Also look for patterns like "word 500mg" or "word 250 mg"
-            dosage_pattern = r'\b([A-Z][a-z]{3,20})\s*\d+\s*(?:mg|mcg|ml|g|IU)\b'
-            # Skip dosage forms and generic words
-            dosage_form_skip = {
-                'tablet', 'tablets', 'capsule', 'capsules', 'injection', 'injections',
-                'syrup', 'solution', 'suspension', 'cream', 'ointment', 'drops',
-                'oral', 'topical', 'each', 'dose', 'maximum', 'minimum',
-                'adult', 'child', 'children', 'body', 'weight', 'daily',
-                'every', 'once', 'twice', 'three', 'four', 'times',
-                'contains', 'approximately', 'about', 'less', 'more', 'than',
-            }
-            for match in re.findall(dosage_pattern, content):
-                name = match.strip()
-                if (name.lower() not in seen_names 
-                    and name.lower() not in dosage_form_skip
+            for match in DOSAGE_PATTERN.finditer(content):
+                name = match.group(1).strip()
+                # Brands and synonyms dedup against their generic (canonical) formulary name
+                canonical = matcher.lookup(name)
+                key = canonical or name.lower()
+                if (key not in seen_names 
+                    and name.lower() not in DOSAGE_FORM_SKIP
                     and len(name) > 3):
-                    seen_names.add(name.lower())
-                    idx = content.find(name)
+                    seen_names.add(key)
+                    idx = match.start(1)
                     context = content[max(0,idx-20):idx+len(name)+100].replace('\n',' ').strip()
                     medicines.append({
-                        "name": name,
+                        "name": canonical.title() if canonical else name,
                         "usage": context[:200],
                         "source": source_name
                     })
@@ -702,6 +1149,26 @@ When responding after using `medical_safety_qa_tool`:
             "specialization": specialization
         }
 
+    
+    async def afind_doctors(self, query: str, location: str) -> dict:
+        """Async `find_doctors` using the shared httpx client for Nominatim and Overpass."""
+        specialization = detect_specialization(query)
+        lat, lon = await ageocode_location(location)
+        
+        if lat is None or lon is None:
+            return {
+                "doctors": [],
+                "location": location,
+                "specialization": specialization
+            }
+        
+        doctors = await afind_doctors_overpass(lat, lon, specialization)
+        
+        return {
+            "doctors": doctors,
+            "location": location,
+            "specialization": specialization
+        }
 
-# Create a single instance (singleton pattern)
+# Create a single instance (singleton pattern); main.py initializes it in the background
 rag_service = RAGService()
\ No newline at end of file
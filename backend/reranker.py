@@ -0,0 +1,144 @@
+# backend/reranker.py
+
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+import os
+import hashlib
+import threading
+import logging
+from answer_cache import normalize_query
+
+logger = logging.getLogger(__name__)
+
+RERANK = os.environ.get("RERANK", "0") == "1"
+RERANKER_MODEL = os.environ.get("RERANKER_MODEL", "cross-encoder/ms-marco-MiniLM-L-6-v2")
+# Candidates fetched per query and scored by the cross-encoder before keeping the top k
+RERANK_CANDIDATES = int(os.environ.get("RERANK_CANDIDATES", "30"))
+# Wall-clock budget for one rerank call; past it the bi-encoder order is used
+RERANK_TIMEOUT_MS = float(os.environ.get("RERANK_TIMEOUT_MS", "500"))
+RERANK_CACHE_SIZE = int(os.environ.get("RERANK_CACHE_SIZE", "8192"))
+RERANK_MAX_LENGTH = int(os.environ.get("RERANK_MAX_LENGTH", "512"))
+# Pairs per cross-encoder forward pass
+RERANK_BATCH_SIZE = max(1, int(os.environ.get("RERANK_BATCH_SIZE", str(RERANK_CANDIDATES))))
+
+
+def chunk_key(doc) -> str:
+    """Stable id of a chunk: its docstore id (content-addressed), else a hash of its text."""
+    return doc.id or hashlib.sha1(doc.page_content.encode("utf-8")).hexdigest()
+
+
+class CrossEncoderReranker:
+    """Rerank retrieval candidates with a small CPU cross-encoder.
+
+    All uncached (query, chunk) pairs of a call are scored on a dedicated
+    thread, in forward passes of `RERANK_BATCH_SIZE` pairs. Scores are cached per (normalized
+    query, chunk id). If scoring takes longer than the latency budget, or
+    another call's scoring is still running, the candidates keep their
+    bi-encoder order; late scores still land in the cache, so a repeat of the
+    query is reranked.
+    """
+
+    def __init__(self, model_name: str = RERANKER_MODEL, timeout_ms: float = RERANK_TIMEOUT_MS,
+                 cache_size: int = RERANK_CACHE_SIZE):
+        self.model_name = model_name
+        self.timeout = timeout_ms / 1000.0
+        self.cache_size = cache_size
+        self.model = None
+        self.hits = 0
+        self.misses = 0
+        self.timeouts = 0
+        self.errors = 0
+        self.skipped = 0
+        self._cache = OrderedDict()   # (normalized query, chunk id) -> score
+        self._lock = threading.Lock()
+        self._model_lock = threading.Lock()
+        # One inference at a time; calls arriving while it runs skip reranking rather than queue
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="rerank")
+        self._in_flight = None
+
+    def load(self):
+        """Load the cross-encoder (downloaded on first use)."""
+        with self._model_lock:
+            if self.model is None:
+                from sentence_transformers import CrossEncoder
+                self.model = CrossEncoder(self.model_name, max_length=RERANK_MAX_LENGTH, device="cpu")
+                logger.info(f"Loaded reranker {self.model_name}")
+        return self.model
+
+    def _score(self, pairs: list, keys: list) -> list:
+        model = self.load()
+        scores = []
+        # Fixed-size forward passes keep activation memory bounded however many pairs come in
+        for start in range(0, len(pairs), RERANK_BATCH_SIZE):
+            batch = pairs[start:start + RERANK_BATCH_SIZE]
+            scores.extend(float(score) for score in model.predict(batch, batch_size=len(batch), show_progress_bar=False))
+        with self._lock:
+            for key, score in zip(keys, scores):
+                self._cache[key] = score
+                self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return scores
+
+    def rerank(self, queries: list, hit_lists: list, k: int) -> list:
+        """Reorder each query's (Document, similarity) hits by cross-encoder score, keeping k."""
+        scores = [[None] * len(hits) for hits in hit_lists]
+        pairs, keys, slots = [], [], []
+        with self._lock:
+            for qi, (query, hits) in enumerate(zip(queries, hit_lists)):
+                normalized = normalize_query(query)
+                for hi, (doc, _) in enumerate(hits):
+                    key = (normalized, chunk_key(doc))
+                    score = self._cache.get(key)
+                    if score is None:
+                        pairs.append((query, doc.page_content))
+                        keys.append(key)
+                        slots.append((qi, hi))
+                    else:
+                        self._cache.move_to_end(key)
+                        scores[qi][hi] = score
+            self.hits += sum(len(hits) for hits in hit_lists) - len(keys)
+            self.misses += len(keys)
+
+        if pairs:
+            with self._lock:
+                busy = self._in_flight is not None and not self._in_flight.done()
+                if busy:
+                    self.skipped += 1
+                else:
+                    future = self._in_flight = self._executor.submit(self._score, pairs, keys)
+            if busy:
+                # Queuing behind a slow (possibly timed-out) batch would only time out too
+                logger.warning("Reranker busy, using bi-encoder order")
+                return [hits[:k] for hits in hit_lists]
+            try:
+                for (qi, hi), score in zip(slots, future.result(timeout=self.timeout)):
+                    scores[qi][hi] = score
+            except FutureTimeoutError:
+                with self._lock:
+                    self.timeouts += 1
+                logger.warning(f"Reranking {len(pairs)} pairs exceeded {self.timeout * 1000:.0f} ms, using bi-encoder order")
+                return [hits[:k] for hits in hit_lists]
+            except Exception as e:
+                with self._lock:
+                    self.errors += 1
+                logger.error(f"Reranking failed, using bi-encoder order: {e}")
+                return [hits[:k] for hits in hit_lists]
+
+        return [
+            [hits[i] for i in sorted(range(len(hits)), key=lambda i: -query_scores[i])[:k]]
+            for hits, query_scores in zip(hit_lists, scores)
+        ]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "model": self.model_name,
+                "size": len(self._cache),
+                "max_size": self.cache_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "timeouts": self.timeouts,
+                "errors": self.errors,
+                "skipped": self.skipped,
+            }
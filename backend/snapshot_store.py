@@ -0,0 +1,147 @@
+# backend/snapshot_store.py
+
+# Read-only index snapshots shared by every uvicorn worker.
+#
+# `python ingest.py` syncs the index (IndexStore) once and publishes it as
+#   <INDEX_DIR>/snapshots/<name>/  index.faiss, chunks.bin, bm25/, snapshot.json
+# with <INDEX_DIR>/CURRENT naming the live snapshot. With SHARED_INDEX=1 each
+# worker memory-maps the current snapshot instead of loading or building the
+# index itself, so vectors, chunk texts and BM25 postings are held once in the
+# OS page cache however many workers run. Workers switch to a newly published
+# snapshot by themselves with RELOAD_POLL_SECONDS set; POST /admin/reload only
+# reaches the one worker that accepts it.
+
+import os
+import json
+import time
+import shutil
+import logging
+from index_store import INDEX_DIR, DATA_DIR, IndexStore
+from chunk_store import ChunkStore, PositionIds
+from lexical_index import PackedBM25Index
+
+logger = logging.getLogger(__name__)
+
+SHARED_INDEX = os.environ.get("SHARED_INDEX", "0") == "1"
+# Snapshots kept on disk, including the current one (workers may still map older ones)
+KEEP_SNAPSHOTS = int(os.environ.get("KEEP_SNAPSHOTS", "2"))
+
+SNAPSHOTS_DIR_NAME = "snapshots"
+CURRENT_NAME = "CURRENT"
+SNAPSHOT_MANIFEST_NAME = "snapshot.json"
+FAISS_NAME = "index.faiss"
+CHUNKS_NAME = "chunks.bin"
+BM25_DIR_NAME = "bm25"
+
+
+def current_snapshot(index_dir: str = INDEX_DIR) -> str:
+    """Directory of the published snapshot, or None if nothing was published yet."""
+    try:
+        with open(os.path.join(index_dir, CURRENT_NAME), encoding="utf-8") as f:
+            name = f.read().strip()
+    except FileNotFoundError:
+        return None
+    path = os.path.join(index_dir, SNAPSHOTS_DIR_NAME, name)
+    return path if os.path.isdir(path) else None
+
+
+def write_snapshot(index_store, vectorstore, index_dir: str = INDEX_DIR) -> str:
+    """Write the synced index as a new snapshot, then make it current.
+
+    Files go to a temporary directory that is renamed into place, and CURRENT
+    is replaced atomically, so readers never see a partial snapshot.
+    """
+    import faiss
+    snapshots_dir = os.path.join(index_dir, SNAPSHOTS_DIR_NAME)
+    # Names sort in publication order
+    ns = time.time_ns()
+    name = f"{time.strftime('%Y%m%d-%H%M%S', time.localtime(ns // 10**9))}-{ns % 10**9:09d}"
+    path = os.path.join(snapshots_dir, name)
+    tmp_path = path + ".tmp"
+    os.makedirs(tmp_path)
+
+    faiss.write_index(vectorstore.index, os.path.join(tmp_path, FAISS_NAME))
+    ids = [vectorstore.index_to_docstore_id[i] for i in range(vectorstore.index.ntotal)]
+    docs = [vectorstore.docstore.search(doc_id).model_copy(update={"id": doc_id}) for doc_id in ids]
+    ChunkStore.write(os.path.join(tmp_path, CHUNKS_NAME), docs)
+    index_store.lexical_index.save_packed(os.path.join(tmp_path, BM25_DIR_NAME))
+
+    manifest = dict(
+        index_store.manifest,
+        chunks=vectorstore.index.ntotal,
+        distance_strategy=vectorstore.distance_strategy.value,
+        created=time.time(),
+    )
+    with open(os.path.join(tmp_path, SNAPSHOT_MANIFEST_NAME), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    os.rename(tmp_path, path)
+
+    current_tmp = os.path.join(index_dir, CURRENT_NAME + ".tmp")
+    with open(current_tmp, "w", encoding="utf-8") as f:
+        f.write(name)
+    os.replace(current_tmp, os.path.join(index_dir, CURRENT_NAME))
+    logger.info(f"Published index snapshot {name} ({vectorstore.index.ntotal} chunks)")
+
+    prune_snapshots(index_dir, name)
+    return path
+
+
+def prune_snapshots(index_dir: str, current: str, keep: int = KEEP_SNAPSHOTS):
+    """Delete all but the newest `keep` snapshots (never the current one).
+    Workers still mapping a deleted snapshot keep reading it until they close it."""
+    snapshots_dir = os.path.join(index_dir, SNAPSHOTS_DIR_NAME)
+    names = sorted(n for n in os.listdir(snapshots_dir) if not n.endswith(".tmp"))
+    for name in names[:-keep] if keep > 0 else names:
+        if name != current:
+            shutil.rmtree(os.path.join(snapshots_dir, name), ignore_errors=True)
+
+
+class SnapshotStore(IndexStore):
+    """Read-only `IndexStore` serving the current snapshot.
+
+    `load_or_build` never builds: it memory-maps what `ingest.py` published and
+    fails if nothing was published or it was built with another embedding model.
+    """
+
+    def __init__(self, index_dir: str = INDEX_DIR, embedding_model: str = "", data_dir: str = DATA_DIR):
+        super().__init__(data_dir, index_dir, embedding_model)
+        self.snapshot_dir = None
+        self.chunk_store = None
+
+    def source_signature(self) -> str:
+        """The published snapshot: workers reload when `ingest.py` publishes a new one."""
+        return current_snapshot(self.index_dir)
+
+    def load_or_build(self, embeddings):
+        from langchain_community.vectorstores import FAISS
+        from langchain_community.vectorstores.utils import DistanceStrategy
+        from ann_index import read_index_shared
+
+        path = current_snapshot(self.index_dir)
+        if path is None:
+            raise FileNotFoundError(f"No index snapshot in {self.index_dir}; run `python ingest.py` first")
+        with open(os.path.join(path, SNAPSHOT_MANIFEST_NAME), encoding="utf-8") as f:
+            manifest = json.load(f)
+        if manifest["embedding_model"] != self.embedding_model:
+            raise RuntimeError(
+                f"Snapshot was built with embeddings {manifest['embedding_model']!r}, "
+                f"this worker uses {self.embedding_model!r}; re-run `python ingest.py`"
+            )
+
+        index = read_index_shared(os.path.join(path, FAISS_NAME))
+        self.chunk_store = ChunkStore(os.path.join(path, CHUNKS_NAME))
+        self.lexical_index = PackedBM25Index(os.path.join(path, BM25_DIR_NAME))
+        vectorstore = FAISS(
+            embedding_function=embeddings,
+            index=index,
+            docstore=self.chunk_store,
+            index_to_docstore_id=PositionIds(index.ntotal),
+            distance_strategy=DistanceStrategy(manifest["distance_strategy"]),
+        )
+        self.snapshot_dir = path
+        self.manifest = manifest
+
+        pdf_count = len(manifest["files"])
+        self.progress.update(pdfs_total=pdf_count, pdfs_parsed=pdf_count, index_ready=True)
+        logger.info(f"Opened index snapshot {os.path.basename(path)}: {index.ntotal} chunks from {pdf_count} PDFs (mmap)")
+        return vectorstore
@@ -0,0 +1,90 @@
+# backend/specialization.py
+
+from keyword_matcher import KeywordMatcher
+
+# ─── Specialization Mapping ────────────────────────────────────────────────────
+SPECIALIZATION_MAP = {
+    "heart": "cardiologist",
+    "cardiac": "cardiologist",
+    "chest pain": "cardiologist",
+    "blood pressure": "cardiologist",
+    "hypertension": "cardiologist",
+    "skin": "dermatologist",
+    "rash": "dermatologist",
+    "acne": "dermatologist",
+    "bone": "orthopedic",
+    "joint": "orthopedic",
+    "fracture": "orthopedic",
+    "arthritis": "orthopedic",
+    "brain": "neurologist",
+    "nerve": "neurologist",
+    "headache": "neurologist",
+    "migraine": "neurologist",
+    "seizure": "neurologist",
+    "eye": "ophthalmologist",
+    "vision": "ophthalmologist",
+    "ear": "ent",
+    "nose": "ent",
+    "throat": "ent",
+    "child": "pediatrician",
+    "children": "pediatrician",
+    "infant": "pediatrician",
+    "baby": "pediatrician",
+    "kidney": "nephrologist",
+    "urine": "urologist",
+    "diabetes": "endocrinologist",
+    "thyroid": "endocrinologist",
+    "hormone": "endocrinologist",
+    "cancer": "oncologist",
+    "tumor": "oncologist",
+    "lung": "pulmonologist",
+    "breathing": "pulmonologist",
+    "asthma": "pulmonologist",
+    "stomach": "gastroenterologist",
+    "liver": "hepatologist",
+    "digestion": "gastroenterologist",
+    "teeth": "dentist",
+    "dental": "dentist",
+    "tooth": "dentist",
+    "mental": "psychiatrist",
+    "depression": "psychiatrist",
+    "anxiety": "psychiatrist",
+    "pregnancy": "gynecologist",
+    "woman": "gynecologist",
+    "menstrual": "gynecologist",
+    "allergy": "allergist",
+    "fever": "general physician",
+    "cold": "general physician",
+    "cough": "general physician",
+    "infection": "general physician",
+    "pain": "general physician",
+    "medicine": "general physician",
+    "drug": "general physician",
+}
+
+
+GENERAL_SPECIALIZATION = "general physician"
+
+# Compiled once: one linear pass per query regardless of how large the map grows
+_specialization_matcher = KeywordMatcher(SPECIALIZATION_MAP, plurals=True)
+
+
+def detect_specializations(query: str, limit: int = None) -> list:
+    """Rank every specialization mentioned in a query, most specific first.
+    
+    Specialists outrank the general physician, then longer (more specific)
+    keywords win, then earlier mentions.
+    """
+    best = {}
+    for start, end, keyword, spec in _specialization_matcher.finditer(query):
+        rank = (spec == GENERAL_SPECIALIZATION, -len(keyword), start)
+        if spec not in best or rank < best[spec]:
+            best[spec] = rank
+    ranked = sorted(best, key=best.get)
+    return ranked[:limit] if limit else ranked
+
+
+def detect_specialization(query: str) -> str:
+    """Map a medical query to a doctor specialization."""
+    ranked = detect_specializations(query, limit=1)
+    return ranked[0] if ranked else GENERAL_SPECIALIZATION